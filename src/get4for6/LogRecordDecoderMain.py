@@ -0,0 +1,59 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, NoReturn
+import sys
+from get4for6.logger.LogLineRenderer import LogLineRenderer
+from get4for6.logger.LogRecordCodec import LogRecordCodec
+
+
+class LogRecordDecoderMain:
+    """
+    Renders log record files (see the 'log_record_file' option in the configuration file) back into the text format
+     the program logs in by default. The files are decoded in the order they are specified in, so rotated files
+     should be specified from the oldest one to the newest one.
+    """
+
+    _USAGE_EXIT_CODE: Final[int] = 2
+    _ERROR_EXIT_CODE: Final[int] = 1
+    _ERROR_MESSAGE_BANNER: Final[str] = "! ERROR:"
+
+    def main(self) -> None:
+        if len(sys.argv) < 2:
+            print(f"Usage: {sys.argv[0]} <LOG_RECORD_FILE> [LOG_RECORD_FILE ...]", file=sys.stderr, flush=True)
+            sys.exit(self.__class__._USAGE_EXIT_CODE)
+
+        log_line_renderer = LogLineRenderer()
+        for path in sys.argv[1:]:
+            try:
+                with open(path, "rb") as record_file:
+                    for decoded_item in LogRecordCodec.decode_items(record_file):
+                        sys.stdout.write(decoded_item if isinstance(decoded_item, str) else log_line_renderer.render_log_record(decoded_item))
+            except (OSError, ValueError) as e:
+                self._exit_with_error(f"Failed to decode the log record file on path {repr(path)}: {str(e)}")
+
+        sys.stdout.flush()
+
+    def _exit_with_error(self, error_message: str) -> NoReturn:
+        sys.stdout.flush()
+        print(self.__class__._ERROR_MESSAGE_BANNER, error_message, file=sys.stderr, flush=True)
+        sys.exit(self.__class__._ERROR_EXIT_CODE)
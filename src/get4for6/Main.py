@@ -26,11 +26,15 @@ import os
 import asyncio
 from get4for6.Get4For6Constants import Get4For6Constants
 from get4for6.config.Configuration import Configuration
+from get4for6.config.GeneralConfiguration import GeneralConfiguration
 from get4for6.config.TranslationConfiguration import TranslationConfiguration
 from get4for6.config.loader.ConfigurationLoader import ConfigurationLoader
 from get4for6.config.loader.exc.ConfigLoadingFailureBaseExc import ConfigLoadingFailureBaseExc
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.logger.exc.LoggerBaseExc import LoggerBaseExc
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
 from get4for6.di import DI_NS
 from get4for6.di.Get4For6DependencyProvider import Get4For6DependencyProvider
 from get4for6.exc.Get4For6BaseExc import Get4For6BaseExc
@@ -53,10 +57,12 @@ class Main:
         termination_event = self.__class__._generate_asyncio_event_for_signals(Get4For6Constants.TERMINATION_SIGNALS)
         print_map_event = self.__class__._generate_asyncio_event_for_signals(Get4For6Constants.PRINT_MAP_SIGNALS)
 
-        with Logger(Get4For6Constants.LOG_OUTPUT_STREAM, configuration.general.print_debug_messages_from) as logger:
+        with self._create_logger_instance(configuration.general) as logger:
             DI_NS.set_dependency_provider(Get4For6DependencyProvider(
                 configuration=configuration,
                 logger=logger,
+                metrics_registry=MetricsRegistry(),
+                cache_registry=CacheRegistry(),
                 termination_event=termination_event,
                 print_map_event=print_map_event,
                 client_address_mapper=client_address_mapper,
@@ -76,6 +82,20 @@ class Main:
         except ConfigLoadingFailureBaseExc as e:
             self._crash_on_exception(e)
 
+    def _create_logger_instance(self, general_configuration: GeneralConfiguration) -> Logger:
+        try:
+            return Logger(
+                log_to=Get4For6Constants.LOG_OUTPUT_STREAM,
+                log_debug_messages_from=general_configuration.print_debug_messages_from,
+                flush_interval=general_configuration.log_flush_interval,
+                flush_after_bytes=general_configuration.log_flush_after_bytes,
+                summary_interval=general_configuration.log_summary_interval,
+                rate_limiting=general_configuration.log_rate_limiting,
+                record_file=general_configuration.log_record_file
+            )
+        except LoggerBaseExc as e:
+            self._crash_on_exception(e)
+
     def _create_client_address_mapper_instance(self, translation_configuration: TranslationConfiguration) -> ClientAddressMapper:
         return ClientAddressMapper(
             client_allowed_subnets=translation_configuration.client_allowed_subnets,
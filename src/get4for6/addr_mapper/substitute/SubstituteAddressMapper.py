@@ -101,6 +101,61 @@ class SubstituteAddressMapper:
 
         return dynamic_mapper.find_or_create_substitute_assignment_6to4(ipv6_address, mapping_creation_allowed), dynamic_mapper.get_external_cache_lifetime()
 
+    async def map_substitute_4to6_async(self, ipv4_address: ipaddress.IPv4Address, valid_client_ipv4: ipaddress.IPv4Address) -> tuple[ipaddress.IPv6Address, int]:  # (IPv6 address, external cache lifetime)
+        """
+        The coroutine variants of the mapping methods let the DNS module use this class interchangeably with its
+         stand-in in DNS worker processes, whose mapping operations involve IPC. They never suspend.
+
+        :raises SubstituteAssignmentNotFoundExc
+        :raises SubstituteIPv4AddressNotAllowedExc
+        """
+
+        return self.map_substitute_4to6(ipv4_address, valid_client_ipv4)
+
+    async def map_substitute_6to4_async(self, ipv6_address: ipaddress.IPv6Address, valid_client_ipv4: ipaddress.IPv4Address, mapping_creation_allowed: bool) -> tuple[ipaddress.IPv4Address, int]:  # (IPv4 address, external cache lifetime)
+        """
+        :raises SubstituteAssignmentNotFoundExc
+        :raises IPv6AddressNotSubstitutableExc
+        :raises SubstituteAddressSpaceCurrentlyFullExc
+        """
+
+        return self.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed)
+
+    def look_up_mapping(self, ip_address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address], valid_client_ipv4: ipaddress.IPv4Address) -> Optional[tuple[ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]:  # (substitute IPv4 address, IPv6 address, remaining guaranteed lifetime)
+        """
+        Looks up the mapping of a substitute IPv4 address or an IPv6 address as it is seen by the client, using the same
+         indexes as 'map_substitute_4to6()' and 'map_substitute_6to4()' do. However, no mappings or dynamic mappers are
+         created, and no hits are registered, so a mapping can be inspected without affecting its lifetime.
+        Returns None if there is no such mapping. The remaining guaranteed lifetime of static mappings is None.
+        """
+
+        self._perform_fallback_check_of_client_ipv4_validity(valid_client_ipv4)
+
+        try:
+            if isinstance(ip_address, ipaddress.IPv4Address):
+                return ip_address, self._static_mapper.find_substitute_assignment_4to6(ip_address), None
+            return self._static_mapper.find_substitute_assignment_6to4(ip_address), ip_address, None
+        except SubstituteAssignmentNotFoundExc:
+            pass
+
+        dynamic_mapper = self._per_client_dynamic_mappers.get(valid_client_ipv4, None)
+        if dynamic_mapper is None:
+            return None
+
+        return dynamic_mapper.look_up_assignment(ip_address)
+
+    def drop_dynamic_mapper_of_client(self, valid_client_ipv4: ipaddress.IPv4Address) -> Optional[int]:
+        """
+        Forgets all the dynamic mappings of the client; a new, empty dynamic mapper is created for it once it needs one.
+         Returns the number of dropped mappings, or None if the client has had no dynamic mapper.
+        """
+
+        dynamic_mapper = self._per_client_dynamic_mappers.pop(valid_client_ipv4, None)
+        if dynamic_mapper is None:
+            return None
+
+        return dynamic_mapper.get_assignment_count()
+
     def _perform_fallback_check_of_client_ipv4_validity(self, valid_client_ipv4: ipaddress.IPv4Address) -> None:
         # Components calling this mapper MUST ensure that the client IPv4 address they are passing here is allowed.
         #  This check is entirely last-resort, because we want to make absolutely sure that a dynamic mapper cannot be
@@ -126,6 +181,37 @@ class SubstituteAddressMapper:
         self._per_client_dynamic_mappers[valid_client_ipv4] = new_dynamic_mapper
         return new_dynamic_mapper
 
+    def get_static_assignment_count(self) -> int:
+        return self._static_mapper.get_assignment_count()
+
+    def get_dynamic_mapper_count(self) -> int:
+        return len(self._per_client_dynamic_mappers)
+
+    def get_dynamic_assignment_count(self) -> int:
+        return sum(dynamic_mapper.get_assignment_count() for dynamic_mapper in self._per_client_dynamic_mappers.values())
+
     def send_dynamic_mappings_to_generator(self, generator: Generator[None, tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int], None]) -> None:
         for client_ipv4, dynamic_mapper in self._per_client_dynamic_mappers.items():
             dynamic_mapper.send_dynamic_mappings_to_generator(generator, client_ipv4)
+
+    def take_snapshot_of_dynamic_mappings(self) -> list[tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int]]:
+        """
+        Returns the dynamic mappings as (client IPv4, substitute IPv4, IPv6, remaining guaranteed lifetime) tuples.
+
+        The mappings are copied synchronously (i.e. without giving other tasks a chance to modify them), so that the
+         snapshot is consistent even if the caller processes it in the background.
+        """
+
+        dynamic_mappings = []
+
+        collect_dynamic_mappings_generator = self._collect_dynamic_mappings(dynamic_mappings)
+        next(collect_dynamic_mappings_generator)  # Get to the 'yield'
+        self.send_dynamic_mappings_to_generator(collect_dynamic_mappings_generator)
+        del collect_dynamic_mappings_generator
+
+        return dynamic_mappings
+
+    @staticmethod
+    def _collect_dynamic_mappings(dynamic_mappings: list[tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int]]) -> Generator[None, tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int], None]:
+        while True:
+            dynamic_mappings.append((yield))  # The sent tuples are immutable, so they can be stored as they are
@@ -61,6 +61,9 @@ class _DynamicSubstituteAddressMapper:
     def get_external_cache_lifetime(self) -> int:
         return self._external_cache_lifetime
 
+    def get_assignment_count(self) -> int:
+        return len(self._dynamic_map) // 2  # Each assignment is stored under both its IPv4 and IPv6 address
+
     def _generator_of_ipv4s_to_assign(self, substitute_subnets: tuple[ipaddress.IPv4Network, ...], do_not_assign: frozenset[ipaddress.IPv4Address]) -> Iterator[ipaddress.IPv4Address]:
         for subnet in substitute_subnets:
             for address in subnet:
@@ -114,6 +117,19 @@ class _DynamicSubstituteAddressMapper:
 
         return new_assignment_object.ipv4_address
 
+    def look_up_assignment(self, find_by: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> Optional[tuple[ipaddress.IPv4Address, ipaddress.IPv6Address, int]]:  # (IPv4 address, IPv6 address, remaining guaranteed lifetime)
+        """
+        Unlike the 'find_*()' methods, this method does not register a hit of the assignment, so looking at it does not
+         extend its lifetime. Returns None if there is no such assignment.
+        """
+
+        try:
+            assignment_object = self._dynamic_map[find_by]
+        except KeyError:
+            return None
+
+        return assignment_object.ipv4_address, assignment_object.ipv6_address, self._calculate_remaining_guaranteed_lifetime(assignment_object, self._get_current_timestamp())
+
     def _create_and_add_assignment_with_new_ipv4_if_possible(self, valid_ipv6_address: ipaddress.IPv6Address) -> Optional[_DynamicAddressAssignment]:
         if self._iterator_of_ipv4s_to_assign is None:
             return None
@@ -209,6 +225,9 @@ class _DynamicSubstituteAddressMapper:
         if not removed_from_set:
             del self._replacement_queue[key]
 
+    def _calculate_remaining_guaranteed_lifetime(self, assignment_object: _DynamicAddressAssignment, current_timestamp: int) -> int:
+        return max(0, (assignment_object.last_hit_at + self._min_lifetime_after_last_hit) - current_timestamp)
+
     def _get_current_timestamp(self) -> int:
         timestamp = int(time.clock_gettime(time.CLOCK_MONOTONIC_RAW))
         assert (timestamp >= 0)
@@ -220,7 +239,7 @@ class _DynamicSubstituteAddressMapper:
         for set_from_queue in self._replacement_queue.values():  # The replacement queue is ordered, whereas the dynamic map is not
             for map_search_key in set_from_queue:
                 assignment_object = self._dynamic_map[map_search_key]
-                remaining_guaranteed_lifetime = max(0, (assignment_object.last_hit_at + self._min_lifetime_after_last_hit) - current_timestamp)
+                remaining_guaranteed_lifetime = self._calculate_remaining_guaranteed_lifetime(assignment_object, current_timestamp)
 
                 # This approach of sending address assignments into a generator has the advantage of protecting this
                 #  mapper's internal state (mutable instance variables are not exposed to the outside - only
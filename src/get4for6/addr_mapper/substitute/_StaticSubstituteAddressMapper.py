@@ -50,6 +50,9 @@ class _StaticSubstituteAddressMapper:
     def get_external_cache_lifetime(self) -> int:
         return self.__class__._EXTERNAL_CACHE_LIFETIME
 
+    def get_assignment_count(self) -> int:
+        return len(self._static_map_4to6)
+
     def find_substitute_assignment_4to6(self, ipv4_address: ipaddress.IPv4Address) -> ipaddress.IPv6Address:
         """
         :raises SubstituteAssignmentNotFoundExc
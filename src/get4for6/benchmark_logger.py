@@ -0,0 +1,111 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+
+# A development tool which measures the throughput of the logger - run it on two revisions of the program (e.g.
+#  'git stash' / 'git checkout <commit>') to compare the numbers before and after a change to the logger.
+# It measures how many lines per second can be written through 'Logger.write_line_block()' (i.e. how fast the logger
+#  thread is able to write them out), and how many lines out of a burst of debug messages are actually written out
+#  instead of being dropped because of a full log queue. The lines are written into a pipe to 'grep -c', so that the
+#  speed of a terminal does not distort the results.
+#
+# Usage: python3 benchmark_logger.py [number of lines] [number of runs]
+
+
+_DEFAULT_LINE_COUNT = 300000
+_DEFAULT_RUN_COUNT = 3
+_MARKER = "logger-benchmark"
+
+
+def _set_import_paths() -> None:
+    import sys
+    import os.path
+
+    # Remove relative paths from sys.path
+    relative_paths = list(filter(lambda path: (not path.startswith("/")), sys.path))
+    for path_ in relative_paths:
+        sys.path.remove(path_)
+
+    # Add the "src" directory into sys.path
+    src_directory_path = os.path.realpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+    if src_directory_path not in sys.path:
+        sys.path.insert(0, src_directory_path)
+
+
+def _make_logger(log_to):
+    import inspect
+    from get4for6.logger.Logger import Logger
+
+    # Older revisions of the logger do not accept some of these arguments, so only those which it does accept are passed
+    optional_kwargs = {"flush_interval": 0.0, "flush_after_bytes": 0, "summary_interval": 10.0, "rate_limiting": None, "record_file": None}
+    accepted_parameters = inspect.signature(Logger.__init__).parameters
+
+    return Logger(log_to, frozenset({"*"}), **{name: value for name, value in optional_kwargs.items() if name in accepted_parameters})
+
+
+def _run_with_counting_sink(function, line_count: int) -> tuple[float, int]:  # (elapsed seconds, written marked lines)
+    import io
+    import time
+    import subprocess
+
+    grep_process = subprocess.Popen(["grep", "-c", _MARKER], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    log_to = io.TextIOWrapper(grep_process.stdin, encoding="utf-8")
+
+    started_at = time.perf_counter()
+    with _make_logger(log_to) as logger:
+        function(logger, line_count)
+    elapsed = time.perf_counter() - started_at  # Includes the time needed to write out the remaining queued lines
+
+    log_to.close()
+    written_line_count = int(grep_process.stdout.read())
+    grep_process.wait()
+
+    return elapsed, written_line_count
+
+
+def _write_lines_blocking(logger, line_count: int) -> None:
+    for i in range(line_count):
+        logger.write_line_block(f"[2026-01-01 00:00:00 / {i} / DEBUG / dns.query_success] Query SUCCESS: [<DNS example.com. IN A RRset: []>] -> [<DNS example.com. IN A RRset: [<100.100.0.1>]>] {{client: 10.0.0.1}} {_MARKER}")
+
+
+def _write_debug_message_burst(logger, line_count: int) -> None:
+    for i in range(line_count):
+        logger.debug(f"Query SUCCESS: [<DNS example.com. IN A RRset: []>] -> [<DNS example.com. IN A RRset: [<100.100.0.1>]>] {{client: 10.0.0.1}} {_MARKER} {i}", "dns.query_success")
+
+
+def _main() -> None:
+    import sys
+
+    _set_import_paths()
+
+    line_count = (int(sys.argv[1]) if (len(sys.argv) > 1) else _DEFAULT_LINE_COUNT)
+    run_count = (int(sys.argv[2]) if (len(sys.argv) > 2) else _DEFAULT_RUN_COUNT)
+
+    for run_number in range(1, run_count + 1):
+        blocking_elapsed, _ = _run_with_counting_sink(_write_lines_blocking, line_count)
+        _, burst_written_line_count = _run_with_counting_sink(_write_debug_message_burst, line_count)
+
+        print(f"Run #{run_number}: blocking writes: {line_count / blocking_elapsed:,.0f} lines/s; non-blocking burst (debug()): {burst_written_line_count:,} of {line_count:,} lines kept")
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,71 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Callable
+
+
+class CacheRegistry:
+    """
+    Keeps track of the program's caches (e.g. those of the DNS module), so that they can be inspected and flushed at
+     runtime (see the 'admin' module) without the components owning them having to be reachable from the outside.
+    Each process has its own registry; the caches of DNS worker processes are registered in the main process's registry
+     by the 'dnsworkers' module, which reports the numbers of their entries as last sent by the workers.
+    """
+
+    def __init__(self):
+        # Name -> (function returning the number of entries, function clearing the cache)
+        self._caches: Final[dict[str, tuple[Callable[[], int], Callable[[], None]]]] = dict()
+
+    def register_cache(self, name: str, get_entry_count: Callable[[], int], clear: Callable[[], None]) -> None:
+        """
+        A cache registered under an already registered name replaces the previous one.
+        """
+
+        self._caches[name] = (get_entry_count, clear)
+
+    def unregister_cache(self, name: str) -> None:
+        self._caches.pop(name, None)
+
+    def get_entry_counts(self) -> list[tuple[str, int]]:
+        return [(name, get_entry_count()) for name, (get_entry_count, _) in sorted(self._caches.items())]
+
+    def flush_caches(self) -> list[tuple[str, int]]:
+        """
+        Returns the names of the flushed caches, together with the number of entries which have been flushed from them.
+        """
+
+        return [(name, self.flush_cache(name)) for name in sorted(self._caches.keys())]
+
+    def flush_cache(self, name: str) -> Optional[int]:
+        """
+        Returns the number of entries which have been flushed from the cache, or None if there is no such cache.
+        """
+
+        cache = self._caches.get(name)
+        if cache is None:
+            return None
+
+        get_entry_count, clear = cache
+        flushed_entry_count = get_entry_count()
+        clear()
+
+        return flushed_entry_count
@@ -27,6 +27,9 @@ from get4for6.config.TranslationConfiguration import TranslationConfiguration
 from get4for6.config.TundraExternalAddrXlatConfiguration import TundraExternalAddrXlatConfiguration
 from get4for6.config.DNSConfiguration import DNSConfiguration
 from get4for6.config.SimpleAddrQueryConfiguration import SimpleAddrQueryConfiguration
+from get4for6.config.MappingExportConfiguration import MappingExportConfiguration
+from get4for6.config.MetricsConfiguration import MetricsConfiguration
+from get4for6.config.AdminConfiguration import AdminConfiguration
 
 
 @dataclasses.dataclass(frozen=True)
@@ -36,3 +39,6 @@ class Configuration:
     tundra_external_addr_xlat: TundraExternalAddrXlatConfiguration
     dns: Optional[DNSConfiguration]
     simple_addr_query: Optional[SimpleAddrQueryConfiguration]
+    mapping_export: Optional[MappingExportConfiguration]
+    metrics: Optional[MetricsConfiguration]
+    admin: Optional[AdminConfiguration]
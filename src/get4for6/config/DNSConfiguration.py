@@ -23,15 +23,28 @@
 from typing import Optional
 import dataclasses
 from get4for6.config.IPPortPair import IPPortPair
+from get4for6.config.UpstreamServerGroup import UpstreamServerGroup
+from get4for6.config.UpstreamResponseCacheOptions import UpstreamResponseCacheOptions
+from get4for6.config.ClientRateLimitingOptions import ClientRateLimitingOptions
 from get4for6.config.AuxiliaryNamesOptions import AuxiliaryNamesOptions
 
 
 @dataclasses.dataclass(frozen=True)
 class DNSConfiguration:
     listen_on: tuple[IPPortPair, ...]
+    workers: int
     max_simultaneous_queries: int
     tcp_communication_with_client_timeout: float
+    tcp_idle_timeout: float
+    tcp_max_queries_in_flight_per_connection: int
     upstream_servers: tuple[IPPortPair, ...]  # May be empty!
     upstream_query_timeout: float
+    upstream_query_hedging_delay: float  # 0 = hedging disabled
+    conditional_forwarding: tuple[UpstreamServerGroup, ...]
+    edns_udp_payload_size: int
+    upstream_response_cache: Optional[UpstreamResponseCacheOptions]
+    synthesized_answer_cache_max_entries: int
+    reverse_name_cache_max_entries: int
     max_newly_assigned_substitute_addrs_per_response: int
+    client_rate_limiting: Optional[ClientRateLimitingOptions]
     auxiliary_names: Optional[AuxiliaryNamesOptions]
@@ -20,9 +20,17 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+from typing import Optional
 import dataclasses
+from get4for6.config.LogRateLimitingOptions import LogRateLimitingOptions
+from get4for6.config.LogRecordFileOptions import LogRecordFileOptions
 
 
 @dataclasses.dataclass(frozen=True)
 class GeneralConfiguration:
     print_debug_messages_from: frozenset[str]
+    log_flush_interval: float  # 0 = the log is flushed after each write
+    log_flush_after_bytes: int  # 0 = no size threshold
+    log_summary_interval: float
+    log_rate_limiting: Optional[LogRateLimitingOptions]
+    log_record_file: Optional[LogRecordFileOptions]
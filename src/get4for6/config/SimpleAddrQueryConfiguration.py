@@ -28,3 +28,6 @@ from get4for6.config.IPPortPair import IPPortPair
 class SimpleAddrQueryConfiguration:
     listen_on_binary: tuple[IPPortPair, ...]
     listen_on_plaintext: tuple[IPPortPair, ...]
+    listen_on_unix: tuple[str, ...]
+    listen_on_tcp: tuple[IPPortPair, ...]
+    max_simultaneous_connections: int
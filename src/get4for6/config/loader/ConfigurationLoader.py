@@ -29,18 +29,36 @@ from datalidator.exc.DatalidatorExc import DatalidatorExc
 from datalidator.blueprints.impl.ObjectBlueprint import ObjectBlueprint
 from get4for6.config.Configuration import Configuration
 from get4for6.config.GeneralConfiguration import GeneralConfiguration
+from get4for6.config.LogRateLimitingOptions import LogRateLimitingOptions
+from get4for6.config.LogRecordFileOptions import LogRecordFileOptions
 from get4for6.config.TranslationConfiguration import TranslationConfiguration
 from get4for6.config.TundraExternalAddrXlatConfiguration import TundraExternalAddrXlatConfiguration
 from get4for6.config.DNSConfiguration import DNSConfiguration
 from get4for6.config.SimpleAddrQueryConfiguration import SimpleAddrQueryConfiguration
+from get4for6.config.MappingExportConfiguration import MappingExportConfiguration
+from get4for6.config.MetricsConfiguration import MetricsConfiguration
+from get4for6.config.AdminConfiguration import AdminConfiguration
+from get4for6.config.PeriodicFileExportOptions import PeriodicFileExportOptions
+from get4for6.config.UpstreamServerGroup import UpstreamServerGroup
+from get4for6.config.UpstreamResponseCacheOptions import UpstreamResponseCacheOptions
+from get4for6.config.ClientRateLimitingOptions import ClientRateLimitingOptions
 from get4for6.config.AuxiliaryNamesOptions import AuxiliaryNamesOptions
 from get4for6.config.DynamicSubstituteAddrAssigningOptions import DynamicSubstituteAddrAssigningOptions
 from get4for6.config.loader._ConfigurationModel import _ConfigurationModel
 from get4for6.config.loader._GeneralConfigurationModel import _GeneralConfigurationModel
+from get4for6.config.loader._LogRateLimitingModel import _LogRateLimitingModel
+from get4for6.config.loader._LogRecordFileModel import _LogRecordFileModel
 from get4for6.config.loader._TranslationConfigurationModel import _TranslationConfigurationModel
 from get4for6.config.loader._TundraExternalAddrXlatConfigurationModel import _TundraExternalAddrXlatConfigurationModel
 from get4for6.config.loader._DNSConfigurationModel import _DNSConfigurationModel
 from get4for6.config.loader._SimpleAddrQueryConfigurationModel import _SimpleAddrQueryConfigurationModel
+from get4for6.config.loader._MappingExportConfigurationModel import _MappingExportConfigurationModel
+from get4for6.config.loader._MetricsConfigurationModel import _MetricsConfigurationModel
+from get4for6.config.loader._AdminConfigurationModel import _AdminConfigurationModel
+from get4for6.config.loader._PeriodicFileExportModel import _PeriodicFileExportModel
+from get4for6.config.loader._ConditionalForwardingGroupModel import _ConditionalForwardingGroupModel
+from get4for6.config.loader._UpstreamResponseCacheModel import _UpstreamResponseCacheModel
+from get4for6.config.loader._ClientRateLimitingModel import _ClientRateLimitingModel
 from get4for6.config.loader._AuxiliaryNamesModel import _AuxiliaryNamesModel
 from get4for6.config.loader._DynamicSubstituteAddrAssigningModel import _DynamicSubstituteAddrAssigningModel
 from get4for6.config.loader._IPPortPairListBlueprint import _IPPortPairListBlueprint
@@ -102,12 +120,41 @@ class ConfigurationLoader:
             translation=self._load_translation_config_from_datalidator_model(model.translation),
             tundra_external_addr_xlat=self._load_tundra_external_addr_xlat_config_from_datalidator_model(model.tundra_external_addr_xlat),
             dns=self._optionally_load_dns_config_from_datalidator_model(model.dns),
-            simple_addr_query=self._optionally_load_simple_addr_query_config_from_datalidator_model(model.simple_addr_query)
+            simple_addr_query=self._optionally_load_simple_addr_query_config_from_datalidator_model(model.simple_addr_query),
+            mapping_export=self._optionally_load_mapping_export_config_from_datalidator_model(model.mapping_export),
+            metrics=self._optionally_load_metrics_config_from_datalidator_model(model.metrics),
+            admin=self._optionally_load_admin_config_from_datalidator_model(model.admin)
         )
 
     def _load_general_config_from_datalidator_model(self, generic_model: _GeneralConfigurationModel) -> GeneralConfiguration:
         return GeneralConfiguration(
-            print_debug_messages_from=frozenset(generic_model.print_debug_messages_from)
+            print_debug_messages_from=frozenset(generic_model.print_debug_messages_from),
+            log_flush_interval=generic_model.log_flush_interval,
+            log_flush_after_bytes=generic_model.log_flush_after_bytes,
+            log_summary_interval=generic_model.log_summary_interval,
+            log_rate_limiting=self._optionally_load_log_rate_limiting_options_from_datalidator_model(generic_model.log_rate_limiting),
+            log_record_file=self._optionally_load_log_record_file_options_from_datalidator_model(generic_model.log_record_file)
+        )
+
+    def _optionally_load_log_rate_limiting_options_from_datalidator_model(self, optional_log_rate_limiting_model: Optional[_LogRateLimitingModel]) -> Optional[LogRateLimitingOptions]:
+        if optional_log_rate_limiting_model is None:
+            return None
+
+        return LogRateLimitingOptions(
+            messages_per_second=optional_log_rate_limiting_model.messages_per_second,
+            message_burst=optional_log_rate_limiting_model.message_burst
+        )
+
+    def _optionally_load_log_record_file_options_from_datalidator_model(self, optional_log_record_file_model: Optional[_LogRecordFileModel]) -> Optional[LogRecordFileOptions]:
+        if optional_log_record_file_model is None:
+            return None
+
+        return LogRecordFileOptions(
+            path=optional_log_record_file_model.path,
+            format=optional_log_record_file_model.format,
+            rotate_after_bytes=optional_log_record_file_model.rotate_after_bytes,
+            rotate_interval=optional_log_record_file_model.rotate_interval,
+            keep_rotated_files=optional_log_record_file_model.keep_rotated_files
         )
 
     def _load_translation_config_from_datalidator_model(self, translation_model: _TranslationConfigurationModel) -> TranslationConfiguration:
@@ -132,11 +179,21 @@ class ConfigurationLoader:
 
         return DNSConfiguration(
             listen_on=tuple(optional_dns_model.listen_on),
+            workers=optional_dns_model.workers,
             max_simultaneous_queries=optional_dns_model.max_simultaneous_queries,
             tcp_communication_with_client_timeout=optional_dns_model.tcp_communication_with_client_timeout,
+            tcp_idle_timeout=optional_dns_model.tcp_idle_timeout,
+            tcp_max_queries_in_flight_per_connection=optional_dns_model.tcp_max_queries_in_flight_per_connection,
             upstream_servers=tuple(optional_dns_model.upstream_servers),
             upstream_query_timeout=optional_dns_model.upstream_query_timeout,
+            upstream_query_hedging_delay=optional_dns_model.upstream_query_hedging_delay,
+            conditional_forwarding=tuple(self._load_upstream_server_group_from_datalidator_model(group_model) for group_model in optional_dns_model.conditional_forwarding),
+            edns_udp_payload_size=optional_dns_model.edns_udp_payload_size,
+            upstream_response_cache=self._optionally_load_upstream_response_cache_options_from_datalidator_model(optional_dns_model.upstream_response_cache),
+            synthesized_answer_cache_max_entries=optional_dns_model.synthesized_answer_cache_max_entries,
+            reverse_name_cache_max_entries=optional_dns_model.reverse_name_cache_max_entries,
             max_newly_assigned_substitute_addrs_per_response=optional_dns_model.max_newly_assigned_substitute_addrs_per_response,
+            client_rate_limiting=self._optionally_load_client_rate_limiting_options_from_datalidator_model(optional_dns_model.client_rate_limiting),
             auxiliary_names=self._optionally_load_auxiliary_names_options_from_datalidator_model(optional_dns_model.auxiliary_names)
         )
 
@@ -146,7 +203,46 @@ class ConfigurationLoader:
 
         return SimpleAddrQueryConfiguration(
             listen_on_binary=tuple(optional_simple_addr_query_model.listen_on_binary),
-            listen_on_plaintext=tuple(optional_simple_addr_query_model.listen_on_plaintext)
+            listen_on_plaintext=tuple(optional_simple_addr_query_model.listen_on_plaintext),
+            listen_on_unix=tuple(optional_simple_addr_query_model.listen_on_unix),
+            listen_on_tcp=tuple(optional_simple_addr_query_model.listen_on_tcp),
+            max_simultaneous_connections=optional_simple_addr_query_model.max_simultaneous_connections
+        )
+
+    def _optionally_load_mapping_export_config_from_datalidator_model(self, optional_mapping_export_model: Optional[_MappingExportConfigurationModel]) -> Optional[MappingExportConfiguration]:
+        if optional_mapping_export_model is None:
+            return None
+
+        return MappingExportConfiguration(
+            format=optional_mapping_export_model.format,
+            listen_on_unix=tuple(optional_mapping_export_model.listen_on_unix),
+            periodic_file_export=self._optionally_load_periodic_file_export_options_from_datalidator_model(optional_mapping_export_model.periodic_file_export)
+        )
+
+    def _optionally_load_periodic_file_export_options_from_datalidator_model(self, optional_periodic_file_export_model: Optional[_PeriodicFileExportModel]) -> Optional[PeriodicFileExportOptions]:
+        if optional_periodic_file_export_model is None:
+            return None
+
+        return PeriodicFileExportOptions(
+            path=optional_periodic_file_export_model.path,
+            interval=optional_periodic_file_export_model.interval
+        )
+
+    def _optionally_load_metrics_config_from_datalidator_model(self, optional_metrics_model: Optional[_MetricsConfigurationModel]) -> Optional[MetricsConfiguration]:
+        if optional_metrics_model is None:
+            return None
+
+        return MetricsConfiguration(
+            listen_on_unix=tuple(optional_metrics_model.listen_on_unix),
+            listen_on_tcp=tuple(optional_metrics_model.listen_on_tcp)
+        )
+
+    def _optionally_load_admin_config_from_datalidator_model(self, optional_admin_model: Optional[_AdminConfigurationModel]) -> Optional[AdminConfiguration]:
+        if optional_admin_model is None:
+            return None
+
+        return AdminConfiguration(
+            listen_on_unix=tuple(optional_admin_model.listen_on_unix)
         )
 
     def _optionally_load_dynamic_substitute_addr_assigning_options_from_datalidator_model(self, optional_dynamic_substitute_addr_assigning_model: Optional[_DynamicSubstituteAddrAssigningModel]) -> Optional[DynamicSubstituteAddrAssigningOptions]:
@@ -157,6 +253,36 @@ class ConfigurationLoader:
             min_lifetime_after_last_hit=optional_dynamic_substitute_addr_assigning_model.min_lifetime_after_last_hit
         )
 
+    def _load_upstream_server_group_from_datalidator_model(self, conditional_forwarding_group_model: _ConditionalForwardingGroupModel) -> UpstreamServerGroup:
+        return UpstreamServerGroup(
+            domains=tuple(conditional_forwarding_group_model.domains),
+            upstream_servers=tuple(conditional_forwarding_group_model.upstream_servers),
+            upstream_query_timeout=conditional_forwarding_group_model.upstream_query_timeout,
+            upstream_query_hedging_delay=conditional_forwarding_group_model.upstream_query_hedging_delay
+        )
+
+    def _optionally_load_upstream_response_cache_options_from_datalidator_model(self, optional_upstream_response_cache_model: Optional[_UpstreamResponseCacheModel]) -> Optional[UpstreamResponseCacheOptions]:
+        if optional_upstream_response_cache_model is None:
+            return None
+
+        return UpstreamResponseCacheOptions(
+            max_entries=optional_upstream_response_cache_model.max_entries,
+            prefetch_after_hits=optional_upstream_response_cache_model.prefetch_after_hits,
+            prefetch_when_remaining_ttl_fraction=optional_upstream_response_cache_model.prefetch_when_remaining_ttl_fraction,
+            serve_stale_for=optional_upstream_response_cache_model.serve_stale_for
+        )
+
+    def _optionally_load_client_rate_limiting_options_from_datalidator_model(self, optional_client_rate_limiting_model: Optional[_ClientRateLimitingModel]) -> Optional[ClientRateLimitingOptions]:
+        if optional_client_rate_limiting_model is None:
+            return None
+
+        return ClientRateLimitingOptions(
+            queries_per_second=optional_client_rate_limiting_model.queries_per_second,
+            query_burst=optional_client_rate_limiting_model.query_burst,
+            new_substitute_addr_assignments_per_minute=optional_client_rate_limiting_model.new_substitute_addr_assignments_per_minute,
+            new_substitute_addr_assignment_burst=optional_client_rate_limiting_model.new_substitute_addr_assignment_burst
+        )
+
     def _optionally_load_auxiliary_names_options_from_datalidator_model(self, optional_auxiliary_names_model: Optional[_AuxiliaryNamesModel]) -> Optional[AuxiliaryNamesOptions]:
         if optional_auxiliary_names_model is None:
             return None
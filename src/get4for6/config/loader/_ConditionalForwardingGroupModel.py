@@ -0,0 +1,73 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from datalidator.blueprints.extras.ObjectModel import ObjectModel
+from datalidator.blueprints.impl.StringBlueprint import StringBlueprint
+from datalidator.blueprints.impl.ListBlueprint import ListBlueprint
+from datalidator.blueprints.impl.TimeIntervalBlueprint import TimeIntervalBlueprint
+from datalidator.filters.impl.StringStripFilter import StringStripFilter
+from datalidator.filters.impl.StringLowercaseFilter import StringLowercaseFilter
+from datalidator.validators.impl.StringMatchesRegexValidator import StringMatchesRegexValidator
+from datalidator.validators.impl.SequenceIsNotEmptyValidator import SequenceIsNotEmptyValidator
+from datalidator.validators.impl.SequenceHasAllItemsUniqueValidator import SequenceHasAllItemsUniqueValidator
+from datalidator.validators.impl.NumberMinimumValueValidator import NumberMinimumValueValidator
+from datalidator.validators.impl.NumberMaximumValueValidator import NumberMaximumValueValidator
+from get4for6.config.loader._IPPortPairListBlueprint import _IPPortPairListBlueprint
+
+
+class _ConditionalForwardingGroupModel(ObjectModel):
+    domains = ListBlueprint(
+        item_blueprint=StringBlueprint(
+            filters=(
+                StringStripFilter(tag="domains"),
+                StringLowercaseFilter(tag="domains")
+            ),
+            validators=(
+                StringMatchesRegexValidator(r'^([0-9a-z_-]+\.)+\Z', tag="domains"),
+            ),
+            tag="domains"
+        ),
+        validators=(
+            SequenceIsNotEmptyValidator(tag="domains"),
+            SequenceHasAllItemsUniqueValidator(tag="domains")
+        ),
+        tag="domains"
+    )
+
+    upstream_servers = _IPPortPairListBlueprint(
+        validators=(SequenceIsNotEmptyValidator(tag="upstream_servers"),),
+        tag="upstream_servers"
+    )
+    upstream_query_timeout = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(0.05, tag="upstream_query_timeout"),  # 50 ms
+            NumberMaximumValueValidator(10.0, tag="upstream_query_timeout")
+        ),
+        tag="upstream_query_timeout"
+    )
+    upstream_query_hedging_delay = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(0.0, tag="upstream_query_hedging_delay"),
+            NumberMaximumValueValidator(10.0, tag="upstream_query_hedging_delay")
+        ),
+        tag="upstream_query_hedging_delay"
+    )
@@ -30,6 +30,11 @@ from get4for6.config.loader._TundraExternalAddrXlatConfigurationValidator import
 from get4for6.config.loader._DNSConfigurationModel import _DNSConfigurationModel
 from get4for6.config.loader._SimpleAddrQueryConfigurationModel import _SimpleAddrQueryConfigurationModel
 from get4for6.config.loader._SimpleAddrQueryConfigurationValidator import _SimpleAddrQueryConfigurationValidator
+from get4for6.config.loader._MappingExportConfigurationModel import _MappingExportConfigurationModel
+from get4for6.config.loader._MappingExportConfigurationValidator import _MappingExportConfigurationValidator
+from get4for6.config.loader._MetricsConfigurationModel import _MetricsConfigurationModel
+from get4for6.config.loader._MetricsConfigurationValidator import _MetricsConfigurationValidator
+from get4for6.config.loader._AdminConfigurationModel import _AdminConfigurationModel
 from get4for6.config.loader._PassDictFurtherIfEnabledBlueprint import _PassDictFurtherIfEnabledBlueprint
 
 
@@ -75,3 +80,36 @@ class _ConfigurationModel(ObjectModel):
         return_if_disabled=None,
         tag="simple_addr_query"
     )
+
+    mapping_export = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _MappingExportConfigurationModel,
+            validators=(
+                _MappingExportConfigurationValidator(tag="mapping_export"),
+            ),
+            tag="mapping_export"
+        ),
+        return_if_disabled=None,
+        tag="mapping_export"
+    )
+
+    metrics = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _MetricsConfigurationModel,
+            validators=(
+                _MetricsConfigurationValidator(tag="metrics"),
+            ),
+            tag="metrics"
+        ),
+        return_if_disabled=None,
+        tag="metrics"
+    )
+
+    admin = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _AdminConfigurationModel,
+            tag="admin"
+        ),
+        return_if_disabled=None,
+        tag="admin"
+    )
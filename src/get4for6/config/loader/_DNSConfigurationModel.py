@@ -24,12 +24,17 @@ from datalidator.blueprints.extras.ObjectModel import ObjectModel
 from datalidator.blueprints.impl.ObjectBlueprint import ObjectBlueprint
 from datalidator.blueprints.impl.IntegerBlueprint import IntegerBlueprint
 from datalidator.blueprints.impl.TimeIntervalBlueprint import TimeIntervalBlueprint
+from datalidator.blueprints.impl.ListBlueprint import ListBlueprint
 from datalidator.validators.impl.SequenceIsNotEmptyValidator import SequenceIsNotEmptyValidator
 from datalidator.validators.impl.IntegerIsPositiveValidator import IntegerIsPositiveValidator
 from datalidator.validators.impl.NumberMinimumValueValidator import NumberMinimumValueValidator
 from datalidator.validators.impl.NumberMaximumValueValidator import NumberMaximumValueValidator
 from get4for6.config.loader._IPPortPairListBlueprint import _IPPortPairListBlueprint
 from get4for6.config.loader._PassDictFurtherIfEnabledBlueprint import _PassDictFurtherIfEnabledBlueprint
+from get4for6.config.loader._ConditionalForwardingGroupModel import _ConditionalForwardingGroupModel
+from get4for6.config.loader._ConditionalForwardingGroupListValidator import _ConditionalForwardingGroupListValidator
+from get4for6.config.loader._UpstreamResponseCacheModel import _UpstreamResponseCacheModel
+from get4for6.config.loader._ClientRateLimitingModel import _ClientRateLimitingModel
 from get4for6.config.loader._AuxiliaryNamesModel import _AuxiliaryNamesModel
 
 
@@ -38,6 +43,13 @@ class _DNSConfigurationModel(ObjectModel):
         validators=(SequenceIsNotEmptyValidator(tag="listen_on"),),
         tag="listen_on"
     )
+    workers = IntegerBlueprint(
+        validators=(
+            IntegerIsPositiveValidator(tag="workers"),
+            NumberMaximumValueValidator(256, tag="workers")
+        ),
+        tag="workers"
+    )
     max_simultaneous_queries = IntegerBlueprint(
         validators=(IntegerIsPositiveValidator(tag="max_simultaneous_queries"),),
         tag="max_simultaneous_queries"
@@ -49,6 +61,20 @@ class _DNSConfigurationModel(ObjectModel):
         ),
         tag="tcp_communication_with_client_timeout"
     )
+    tcp_idle_timeout = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(0.05, tag="tcp_idle_timeout"),  # 50 ms
+            NumberMaximumValueValidator(300.0, tag="tcp_idle_timeout")  # 5 min
+        ),
+        tag="tcp_idle_timeout"
+    )
+    tcp_max_queries_in_flight_per_connection = IntegerBlueprint(
+        validators=(
+            IntegerIsPositiveValidator(tag="tcp_max_queries_in_flight_per_connection"),
+            NumberMaximumValueValidator(65535, tag="tcp_max_queries_in_flight_per_connection")  # The number of DNS message IDs
+        ),
+        tag="tcp_max_queries_in_flight_per_connection"
+    )
 
     upstream_servers = _IPPortPairListBlueprint(tag="upstream_servers")
     upstream_query_timeout = TimeIntervalBlueprint(
@@ -58,12 +84,59 @@ class _DNSConfigurationModel(ObjectModel):
         ),
         tag="upstream_query_timeout"
     )
+    upstream_query_hedging_delay = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(0.0, tag="upstream_query_hedging_delay"),
+            NumberMaximumValueValidator(10.0, tag="upstream_query_hedging_delay")
+        ),
+        tag="upstream_query_hedging_delay"
+    )
+    conditional_forwarding = ListBlueprint(
+        item_blueprint=ObjectBlueprint(
+            _ConditionalForwardingGroupModel,
+            tag="conditional_forwarding"
+        ),
+        validators=(_ConditionalForwardingGroupListValidator(tag="conditional_forwarding"),),
+        tag="conditional_forwarding"
+    )
+    edns_udp_payload_size = IntegerBlueprint(
+        validators=(
+            NumberMinimumValueValidator(512, tag="edns_udp_payload_size"),  # RFC 6891, section 6.2.5
+            NumberMaximumValueValidator(4096, tag="edns_udp_payload_size")
+        ),
+        tag="edns_udp_payload_size"
+    )
+    upstream_response_cache = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _UpstreamResponseCacheModel,
+            tag="upstream_response_cache"
+        ),
+        return_if_disabled=None,
+        tag="upstream_response_cache"
+    )
+    synthesized_answer_cache_max_entries = IntegerBlueprint(
+        validators=(IntegerIsPositiveValidator(tag="synthesized_answer_cache_max_entries"),),
+        tag="synthesized_answer_cache_max_entries"
+    )
+    reverse_name_cache_max_entries = IntegerBlueprint(
+        validators=(IntegerIsPositiveValidator(tag="reverse_name_cache_max_entries"),),
+        tag="reverse_name_cache_max_entries"
+    )
 
     max_newly_assigned_substitute_addrs_per_response = IntegerBlueprint(
         validators=(IntegerIsPositiveValidator(tag="max_newly_assigned_substitute_addrs_per_response"),),
         tag="max_newly_assigned_substitute_addrs_per_response"
     )
 
+    client_rate_limiting = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _ClientRateLimitingModel,
+            tag="client_rate_limiting"
+        ),
+        return_if_disabled=None,
+        tag="client_rate_limiting"
+    )
+
     auxiliary_names = _PassDictFurtherIfEnabledBlueprint(
         pass_to_blueprint=ObjectBlueprint(
             _AuxiliaryNamesModel,
@@ -21,11 +21,20 @@
 
 
 from datalidator.blueprints.extras.ObjectModel import ObjectModel
+from datalidator.blueprints.impl.ObjectBlueprint import ObjectBlueprint
 from datalidator.blueprints.impl.ListBlueprint import ListBlueprint
 from datalidator.blueprints.impl.StringBlueprint import StringBlueprint
+from datalidator.blueprints.impl.IntegerBlueprint import IntegerBlueprint
+from datalidator.blueprints.impl.TimeIntervalBlueprint import TimeIntervalBlueprint
 from datalidator.filters.impl.StringStripFilter import StringStripFilter
 from datalidator.filters.impl.ListDeduplicateItemsFilter import ListDeduplicateItemsFilter
 from datalidator.validators.impl.SequenceIsNotEmptyValidator import SequenceIsNotEmptyValidator
+from datalidator.validators.impl.IntegerIsZeroOrPositiveValidator import IntegerIsZeroOrPositiveValidator
+from datalidator.validators.impl.NumberMinimumValueValidator import NumberMinimumValueValidator
+from datalidator.validators.impl.NumberMaximumValueValidator import NumberMaximumValueValidator
+from get4for6.config.loader._LogRateLimitingModel import _LogRateLimitingModel
+from get4for6.config.loader._LogRecordFileModel import _LogRecordFileModel
+from get4for6.config.loader._PassDictFurtherIfEnabledBlueprint import _PassDictFurtherIfEnabledBlueprint
 
 
 class _GeneralConfigurationModel(ObjectModel):
@@ -38,3 +47,37 @@ class _GeneralConfigurationModel(ObjectModel):
         filters=(ListDeduplicateItemsFilter(tag="print_debug_messages_from"),),
         tag="print_debug_messages_from"
     )
+    log_flush_interval = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(0.0, tag="log_flush_interval"),
+            NumberMaximumValueValidator(60.0, tag="log_flush_interval")
+        ),
+        tag="log_flush_interval"
+    )
+    log_flush_after_bytes = IntegerBlueprint(
+        validators=(IntegerIsZeroOrPositiveValidator(tag="log_flush_after_bytes"),),
+        tag="log_flush_after_bytes"
+    )
+    log_summary_interval = TimeIntervalBlueprint(
+        validators=(
+            NumberMinimumValueValidator(1.0, tag="log_summary_interval"),
+            NumberMaximumValueValidator(86400.0, tag="log_summary_interval")
+        ),
+        tag="log_summary_interval"
+    )
+    log_rate_limiting = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _LogRateLimitingModel,
+            tag="log_rate_limiting"
+        ),
+        return_if_disabled=None,
+        tag="log_rate_limiting"
+    )
+    log_record_file = _PassDictFurtherIfEnabledBlueprint(
+        pass_to_blueprint=ObjectBlueprint(
+            _LogRecordFileModel,
+            tag="log_record_file"
+        ),
+        return_if_disabled=None,
+        tag="log_record_file"
+    )
@@ -21,9 +21,24 @@
 
 
 from datalidator.blueprints.extras.ObjectModel import ObjectModel
+from datalidator.blueprints.impl.IntegerBlueprint import IntegerBlueprint
+from datalidator.blueprints.impl.ListBlueprint import ListBlueprint
+from datalidator.blueprints.impl.UnixFilesystemPathBlueprint import UnixFilesystemPathBlueprint
+from datalidator.validators.impl.IntegerIsPositiveValidator import IntegerIsPositiveValidator
+from datalidator.validators.impl.SequenceHasAllItemsUniqueValidator import SequenceHasAllItemsUniqueValidator
 from get4for6.config.loader._IPPortPairListBlueprint import _IPPortPairListBlueprint
 
 
 class _SimpleAddrQueryConfigurationModel(ObjectModel):
     listen_on_binary = _IPPortPairListBlueprint(tag="listen_on_binary")
     listen_on_plaintext = _IPPortPairListBlueprint(tag="listen_on_plaintext")
+    listen_on_unix = ListBlueprint(
+        item_blueprint=UnixFilesystemPathBlueprint(tag="listen_on_unix"),
+        validators=(SequenceHasAllItemsUniqueValidator(tag="listen_on_unix"),),
+        tag="listen_on_unix"
+    )
+    listen_on_tcp = _IPPortPairListBlueprint(tag="listen_on_tcp")
+    max_simultaneous_connections = IntegerBlueprint(
+        validators=(IntegerIsPositiveValidator(tag="max_simultaneous_connections"),),
+        tag="max_simultaneous_connections"
+    )
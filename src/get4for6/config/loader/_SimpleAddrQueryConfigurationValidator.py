@@ -26,5 +26,5 @@ from get4for6.config.loader._SimpleAddrQueryConfigurationModel import _SimpleAdd
 
 class _SimpleAddrQueryConfigurationValidator(DefaultValidatorImplBase[_SimpleAddrQueryConfigurationModel]):
     def _validate(self, data: _SimpleAddrQueryConfigurationModel) -> None:
-        if (not data.listen_on_binary) and (not data.listen_on_plaintext):
-            raise self._generate_data_validation_failed_exc("Both 'listen_on_binary' and 'listen_on_plaintext' are empty!")
+        if (not data.listen_on_binary) and (not data.listen_on_plaintext) and (not data.listen_on_unix) and (not data.listen_on_tcp):
+            raise self._generate_data_validation_failed_exc("All of 'listen_on_binary', 'listen_on_plaintext', 'listen_on_unix' and 'listen_on_tcp' are empty!")
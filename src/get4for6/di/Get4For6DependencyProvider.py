@@ -26,6 +26,8 @@ import asyncio
 from sidein.providers.DependencyProviderInterface import DependencyProviderInterface
 from get4for6.config.Configuration import Configuration
 from get4for6.logger.Logger import Logger
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
 from get4for6.di.exc.InvalidGet4For6DependencyRequestedExc import InvalidGet4For6DependencyRequestedExc
 from get4for6.addr_mapper.client.ClientAddressMapper import ClientAddressMapper
 from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
@@ -35,6 +37,8 @@ from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAd
 class Get4For6DependencyProvider(DependencyProviderInterface):
     configuration: Configuration
     logger: Logger
+    metrics_registry: MetricsRegistry
+    cache_registry: CacheRegistry
     termination_event: asyncio.Event
     print_map_event: asyncio.Event
     client_address_mapper: ClientAddressMapper
@@ -0,0 +1,91 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Hashable
+from get4for6.helpers.TimeHelpers import TimeHelpers
+
+
+class KeyedTokenBuckets:
+    """
+    A set of token buckets, one per key (e.g. a client or a log facility). To keep the state compact, each bucket is
+     stored as a (tokens, timestamp) tuple, and it is created (full) only once a token is taken from it.
+    """
+
+    def __init__(self, tokens_per_second: float, burst: int, max_tracked_keys: Optional[int]):
+        """
+        If more buckets than 'max_tracked_keys' are tracked, the completely refilled ones are forgotten (they are
+         indistinguishable from buckets which have not been created yet); if that does not help, all of them are, so
+         that the memory usage stays bounded even when a huge number of keys is in use. If 'max_tracked_keys' is None,
+         the buckets are never forgotten, which is suitable only for small and fixed sets of keys.
+        """
+
+        self._tokens_per_second: Final[float] = tokens_per_second
+        self._burst: Final[float] = float(burst)
+        self._max_tracked_keys: Final[Optional[int]] = max_tracked_keys
+        self._buckets: Final[dict[Hashable, tuple[float, float]]] = dict()  # Key -> (tokens, timestamp)
+
+    def take_token(self, key: Hashable) -> bool:
+        """
+        Returns False if the key's bucket is empty, i.e. if the rate limit has been exceeded.
+        """
+
+        current_timestamp = TimeHelpers.get_monotonic_timestamp()
+
+        try:
+            tokens = self._get_refilled_tokens(self._buckets[key], current_timestamp)
+        except KeyError:
+            tokens = self._burst
+            if (self._max_tracked_keys is not None) and (len(self._buckets) >= self._max_tracked_keys):
+                self._remove_refilled_buckets(current_timestamp)
+
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, current_timestamp)
+            return False
+
+        self._buckets[key] = ((tokens - 1.0), current_timestamp)
+        return True
+
+    def return_token(self, key: Hashable) -> None:
+        """
+        Gives back a token taken by 'take_token()' for something which has not been done in the end.
+        """
+
+        try:
+            bucket = self._buckets[key]
+        except KeyError:
+            return  # The bucket has been forgotten in the meantime, i.e. it is full
+
+        current_timestamp = TimeHelpers.get_monotonic_timestamp()
+        self._buckets[key] = (min(self._burst, (self._get_refilled_tokens(bucket, current_timestamp) + 1.0)), current_timestamp)
+
+    def _get_refilled_tokens(self, bucket: tuple[float, float], current_timestamp: float) -> float:
+        tokens, timestamp = bucket
+
+        return min(self._burst, tokens + ((current_timestamp - timestamp) * self._tokens_per_second))
+
+    def _remove_refilled_buckets(self, current_timestamp: float) -> None:
+        refilled_keys = [key for key, bucket in self._buckets.items() if self._get_refilled_tokens(bucket, current_timestamp) >= self._burst]
+        for key in refilled_keys:
+            del self._buckets[key]
+
+        if len(self._buckets) >= self._max_tracked_keys:
+            self._buckets.clear()
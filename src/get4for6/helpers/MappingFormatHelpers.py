@@ -0,0 +1,48 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import ipaddress
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class MappingFormatHelpers(UninstantiableClassMixin):
+    """
+    Formats substitute address mappings for humans, so that they look the same wherever they are printed out (i.e. in
+     the printed map and in the admin interface's output).
+    """
+
+    _STATIC_MAPPING_PATTERN: Final[str] = "{mapping_ipv4} <-> {mapping_ipv6}"
+    _DYNAMIC_MAPPING_PATTERN: Final[str] = "{mapping_ipv4} <-> {mapping_ipv6} ... {lifetime_info}"
+    _LIFETIME_INFO_REMAINING_PATTERN: Final[str] = "remaining guaranteed lifetime: {remaining_guaranteed_lifetime} seconds"
+    _LIFETIME_INFO_MAY_BE_REPLACED: Final[str] = "may be replaced"
+
+    @classmethod
+    def format_static_mapping(cls, mapping_ipv4: ipaddress.IPv4Address, mapping_ipv6: ipaddress.IPv6Address) -> str:
+        return cls._STATIC_MAPPING_PATTERN.format(mapping_ipv4=mapping_ipv4, mapping_ipv6=mapping_ipv6)
+
+    @classmethod
+    def format_dynamic_mapping(cls, mapping_ipv4: ipaddress.IPv4Address, mapping_ipv6: ipaddress.IPv6Address, remaining_guaranteed_lifetime: int) -> str:
+        lifetime_info = (cls._LIFETIME_INFO_REMAINING_PATTERN.format(remaining_guaranteed_lifetime=remaining_guaranteed_lifetime) if (remaining_guaranteed_lifetime > 0) else cls._LIFETIME_INFO_MAY_BE_REPLACED)
+
+        return cls._DYNAMIC_MAPPING_PATTERN.format(mapping_ipv4=mapping_ipv4, mapping_ipv6=mapping_ipv6, lifetime_info=lifetime_info)
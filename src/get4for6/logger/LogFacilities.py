@@ -30,6 +30,7 @@ class LogFacilities(UninstantiableClassMixin):
 
     LOGGER_START: Final[str] = "logger.start"
     LOGGER_STOP: Final[str] = "logger.stop"
+    LOGGER_SUMMARY: Final[str] = "logger.summary"
 
     MODULE_START: Final[str] = "module.start"
     MODULE_STOP: Final[str] = "module.stop"
@@ -48,11 +49,14 @@ class LogFacilities(UninstantiableClassMixin):
     DNS: Final[str] = "dns"
     DNS_SERVER_START: Final[str] = "dns.server_start"
     DNS_SERVER_STOP: Final[str] = "dns.server_stop"
+    DNS_WORKER_START: Final[str] = "dns.worker_start"
+    DNS_WORKER_STOP: Final[str] = "dns.worker_stop"
     DNS_CLIENT_UNEXPECTED_EXCEPTION: Final[str] = "dns.client_unexpected_exception"
     DNS_CLIENT_UNEXPECTED_DNS_EXCEPTION: Final[str] = "dns.client_unexpected_dns_exception"
     DNS_CLIENT_INVALID_IP: Final[str] = "dns.client_invalid_ip"
     DNS_CLIENT_INVALID_MESSAGE: Final[str] = "dns.client_invalid_message"
     DNS_CLIENT_LIMIT_REACHED: Final[str] = "dns.client_limit_reached"
+    DNS_CLIENT_RATE_LIMITED: Final[str] = "dns.client_rate_limited"
     DNS_QUERY_SUCCESS: Final[str] = "dns.query_success"
     DNS_QUERY_ERROR: Final[str] = "dns.query_error"
 
@@ -60,7 +64,29 @@ class LogFacilities(UninstantiableClassMixin):
     SAQ_SERVER_START: Final[str] = "simple_addr_query.server_start"
     SAQ_SERVER_STOP: Final[str] = "simple_addr_query.server_stop"
     SAQ_CLIENT_UNEXPECTED_EXCEPTION: Final[str] = "simple_addr_query.client_unexpected_exception"
+    SAQ_CLIENT_CONNECT: Final[str] = "simple_addr_query.client_connect"
+    SAQ_CLIENT_DISCONNECT: Final[str] = "simple_addr_query.client_disconnect"
+    SAQ_CLIENT_LIMIT_REACHED: Final[str] = "simple_addr_query.client_limit_reached"
     SAQ_CLIENT_INVALID_IP: Final[str] = "simple_addr_query.client_invalid_ip"
     SAQ_CLIENT_INVALID_MESSAGE: Final[str] = "simple_addr_query.client_invalid_message"
     SAQ_QUERY_SUCCESS: Final[str] = "simple_addr_query.query_success"
     SAQ_QUERY_ERROR: Final[str] = "simple_addr_query.query_error"
+
+    EXPORT: Final[str] = "mapping_export"
+    EXPORT_SERVER_START: Final[str] = "mapping_export.server_start"
+    EXPORT_SERVER_STOP: Final[str] = "mapping_export.server_stop"
+    EXPORT_CLIENT_UNEXPECTED_EXCEPTION: Final[str] = "mapping_export.client_unexpected_exception"
+    EXPORT_SUCCESS: Final[str] = "mapping_export.success"
+
+    METRICS: Final[str] = "metrics"
+    METRICS_SERVER_START: Final[str] = "metrics.server_start"
+    METRICS_SERVER_STOP: Final[str] = "metrics.server_stop"
+    METRICS_CLIENT_UNEXPECTED_EXCEPTION: Final[str] = "metrics.client_unexpected_exception"
+
+    ADMIN: Final[str] = "admin"
+    ADMIN_SERVER_START: Final[str] = "admin.server_start"
+    ADMIN_SERVER_STOP: Final[str] = "admin.server_stop"
+    ADMIN_CLIENT_UNEXPECTED_EXCEPTION: Final[str] = "admin.client_unexpected_exception"
+    ADMIN_CLIENT_CONNECT: Final[str] = "admin.client_connect"
+    ADMIN_CLIENT_DISCONNECT: Final[str] = "admin.client_disconnect"
+    ADMIN_COMMAND: Final[str] = "admin.command"
@@ -0,0 +1,58 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import os
+import time
+
+
+class LogLineRenderer:
+    """
+    Renders log records - (UNIX timestamp, sequence number, level, facility, message) tuples - into the text format
+     used by the logger. It is used both by the logger thread and by the log record file decoder.
+    """
+
+    _TIMESTAMP_FORMAT: Final[str] = "%Y-%m-%d %H:%M:%S"
+    _LINE_SEPARATOR: Final[str] = os.linesep
+
+    def __init__(self):
+        # The timestamp is rendered only when the second changes, as strftime() is expensive compared to the rest of
+        #  the formatting.
+        self._cached_timestamp_second: int = -1
+        self._cached_rendered_timestamp: str = ""
+
+    def render_log_record(self, log_record: tuple[float, int, str, str, str]) -> str:
+        """
+        The returned line ends with a line separator.
+        """
+
+        unix_timestamp, sequence_number, level, facility, message = log_record
+
+        return f"[{self._render_timestamp(unix_timestamp)} / {sequence_number} / {level} / {facility}] {message}{self.__class__._LINE_SEPARATOR}"
+
+    def _render_timestamp(self, unix_timestamp: float) -> str:
+        timestamp_second = int(unix_timestamp)
+        if timestamp_second != self._cached_timestamp_second:
+            self._cached_rendered_timestamp = time.strftime(self.__class__._TIMESTAMP_FORMAT, time.localtime(timestamp_second))
+            self._cached_timestamp_second = timestamp_second
+
+        return self._cached_rendered_timestamp
@@ -0,0 +1,183 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Union, Iterator, BinaryIO
+import struct
+import json
+import itertools
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+from get4for6.exc.ThisShouldNeverHappenExc import ThisShouldNeverHappenExc
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class LogRecordCodec(UninstantiableClassMixin):
+    # Log record files contain two kinds of items: log records - (UNIX timestamp, sequence number, level, facility,
+    #  message) tuples - and already formatted text (e.g. the address mappings printed out on SIGUSR1), which is
+    #  stored verbatim.
+    # The binary format consists of a header (magic bytes, format version) followed by length-prefixed items; each item
+    #  starts with its kind (0 = log record, 1 = text). Log records continue with a fixed-size part (timestamp as
+    #  a double, sequence number, length of level, length of facility), followed by the UTF-8-encoded level, facility
+    #  and message. All integers are in network byte order.
+    # The JSON format consists of JSON objects separated by newlines.
+
+    _BINARY_MAGIC: Final[bytes] = b"G46L"
+    _BINARY_VERSION: Final[int] = 1
+    _BINARY_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!4sB")  # Magic bytes, format version
+    _BINARY_LENGTH_PREFIX_STRUCT: Final[struct.Struct] = struct.Struct("!I")
+    _BINARY_KIND_STRUCT: Final[struct.Struct] = struct.Struct("!B")
+    _BINARY_RECORD_STRUCT: Final[struct.Struct] = struct.Struct("!BdQBH")  # Kind, timestamp, sequence number, length of level, length of facility
+    _BINARY_KIND_LOG_RECORD: Final[int] = 0
+    _BINARY_KIND_TEXT: Final[int] = 1
+
+    @classmethod
+    def encode_file_header(cls, record_format: str) -> bytes:
+        if record_format == "binary":
+            return cls._BINARY_HEADER_STRUCT.pack(cls._BINARY_MAGIC, cls._BINARY_VERSION)
+        elif record_format == "jsonl":
+            return b""
+
+        raise ThisShouldNeverHappenExc(f"Invalid log record format: {repr(record_format)}")
+
+    # This method runs in the logger thread!
+    @classmethod
+    def encode_logged_items(cls, logged_items: list[Union[str, tuple, list[tuple]]], record_format: str) -> bytes:
+        """
+        See '_LoggerThread' for the types of the logged items.
+        """
+
+        if record_format == "binary":
+            encode_item = cls._encode_item_as_binary
+        elif record_format == "jsonl":
+            encode_item = cls._encode_item_as_jsonl
+        else:
+            raise ThisShouldNeverHappenExc(f"Invalid log record format: {repr(record_format)}")
+
+        encoded_parts = []
+        for logged_item in logged_items:
+            if isinstance(logged_item, list):
+                encoded_parts.extend(encode_item(log_record) for log_record in logged_item)
+            else:
+                encoded_parts.append(encode_item(logged_item))
+
+        return b"".join(encoded_parts)
+
+    @classmethod
+    def _encode_item_as_binary(cls, logged_item: Union[str, tuple[float, int, str, str, str]]) -> bytes:
+        if isinstance(logged_item, str):
+            encoded_item = cls._BINARY_KIND_STRUCT.pack(cls._BINARY_KIND_TEXT) + logged_item.encode("utf-8", errors="replace")
+        else:
+            unix_timestamp, sequence_number, level, facility, message = logged_item
+            encoded_level = level.encode("utf-8", errors="replace")
+            encoded_facility = facility.encode("utf-8", errors="replace")
+            encoded_item = (
+                cls._BINARY_RECORD_STRUCT.pack(cls._BINARY_KIND_LOG_RECORD, unix_timestamp, sequence_number, len(encoded_level), len(encoded_facility))
+                + encoded_level + encoded_facility + message.encode("utf-8", errors="replace")
+            )
+
+        return cls._BINARY_LENGTH_PREFIX_STRUCT.pack(len(encoded_item)) + encoded_item
+
+    @classmethod
+    def _encode_item_as_jsonl(cls, logged_item: Union[str, tuple[float, int, str, str, str]]) -> bytes:
+        if isinstance(logged_item, str):
+            json_object = {"kind": "text", "text": logged_item}
+        else:
+            unix_timestamp, sequence_number, level, facility, message = logged_item
+            json_object = {"kind": "record", "timestamp": unix_timestamp, "sequence_number": sequence_number, "level": level, "facility": facility, "message": message}
+
+        return (json.dumps(json_object) + "\n").encode("ascii")
+
+    @classmethod
+    def decode_items(cls, record_file: BinaryIO) -> Iterator[Union[str, tuple[float, int, str, str, str]]]:
+        """
+        Yields log records and texts stored in the file; its format is detected automatically.
+
+        :raises ValueError
+        """
+
+        header = record_file.read(cls._BINARY_HEADER_STRUCT.size)
+        if (len(header) == cls._BINARY_HEADER_STRUCT.size) and header.startswith(cls._BINARY_MAGIC):
+            magic, version = cls._BINARY_HEADER_STRUCT.unpack(header)
+            if version != cls._BINARY_VERSION:
+                raise ValueError(f"Unsupported binary format version: {version}")
+
+            yield from cls._decode_binary_items(record_file)
+        else:
+            yield from cls._decode_jsonl_items(header, record_file)
+
+    @classmethod
+    def _decode_binary_items(cls, record_file: BinaryIO) -> Iterator[Union[str, tuple[float, int, str, str, str]]]:
+        while True:
+            length_prefix = record_file.read(cls._BINARY_LENGTH_PREFIX_STRUCT.size)
+            if len(length_prefix) == 0:
+                return
+
+            if len(length_prefix) != cls._BINARY_LENGTH_PREFIX_STRUCT.size:
+                raise ValueError("The file ends with a truncated item!")
+
+            item_length = cls._BINARY_LENGTH_PREFIX_STRUCT.unpack(length_prefix)[0]
+            encoded_item = record_file.read(item_length)
+            if (len(encoded_item) != item_length) or (item_length < cls._BINARY_KIND_STRUCT.size):
+                raise ValueError("The file ends with a truncated item!")
+
+            yield cls._decode_binary_item(encoded_item)
+
+    @classmethod
+    def _decode_binary_item(cls, encoded_item: bytes) -> Union[str, tuple[float, int, str, str, str]]:
+        kind = cls._BINARY_KIND_STRUCT.unpack_from(encoded_item)[0]
+        if kind == cls._BINARY_KIND_TEXT:
+            return encoded_item[cls._BINARY_KIND_STRUCT.size:].decode("utf-8", errors="replace")
+
+        if (kind != cls._BINARY_KIND_LOG_RECORD) or (len(encoded_item) < cls._BINARY_RECORD_STRUCT.size):
+            raise ValueError(f"Invalid item (kind: {kind})!")
+
+        _, unix_timestamp, sequence_number, level_length, facility_length = cls._BINARY_RECORD_STRUCT.unpack_from(encoded_item)
+        facility_offset = (cls._BINARY_RECORD_STRUCT.size + level_length)
+        message_offset = (facility_offset + facility_length)
+        if message_offset > len(encoded_item):
+            raise ValueError("Invalid item (the level and facility do not fit into it)!")
+
+        return (
+            unix_timestamp,
+            sequence_number,
+            encoded_item[cls._BINARY_RECORD_STRUCT.size:facility_offset].decode("utf-8", errors="replace"),
+            encoded_item[facility_offset:message_offset].decode("utf-8", errors="replace"),
+            encoded_item[message_offset:].decode("utf-8", errors="replace")
+        )
+
+    @classmethod
+    def _decode_jsonl_items(cls, already_read_bytes: bytes, record_file: BinaryIO) -> Iterator[Union[str, tuple[float, int, str, str, str]]]:
+        first_line = (already_read_bytes + record_file.readline())
+        if len(first_line) == 0:
+            return  # The file is empty
+
+        for encoded_line in itertools.chain((first_line,), record_file):
+            if not encoded_line.endswith(b"\n"):
+                raise ValueError("The file ends with a truncated item!")
+
+            try:
+                json_object = json.loads(encoded_line)
+                if json_object["kind"] == "text":
+                    yield str(json_object["text"])
+                else:
+                    yield float(json_object["timestamp"]), int(json_object["sequence_number"]), str(json_object["level"]), str(json_object["facility"]), str(json_object["message"])
+            except (ValueError, TypeError, KeyError) as e:
+                raise ValueError(f"Invalid item: {str(e)}")
@@ -20,44 +20,88 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Final, Optional, TextIO
+from typing import Final, Optional, Callable, TextIO, Sequence
 import os
-import datetime
+import time
+import asyncio
 import queue
+from get4for6.config.LogRateLimitingOptions import LogRateLimitingOptions
+from get4for6.config.LogRecordFileOptions import LogRecordFileOptions
+from get4for6.etc.KeyedTokenBuckets import KeyedTokenBuckets
+from get4for6.helpers.TimeHelpers import TimeHelpers
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.logger._LogSinkIface import _LogSinkIface
+from get4for6.logger._LogTextStreamSink import _LogTextStreamSink
+from get4for6.logger._LogRecordFileSink import _LogRecordFileSink
 from get4for6.logger._LoggerThread import _LoggerThread
 
 
 class Logger:
     _LOG_QUEUE_SIZE: Final[int] = 1024
-    _TIMESTAMP_FORMAT: Final[str] = "%Y-%m-%d %H:%M:%S"
     _LINE_SEPARATOR: Final[str] = os.linesep
-
-    def __init__(self, log_to: TextIO, log_debug_messages_from: frozenset[str]):
-        self._log_to: Final[TextIO] = log_to
-        self._log_debug_messages_from: Final[frozenset[str]] = log_debug_messages_from
+    _FULL_QUEUE_RETRY_INTERVAL: Final[float] = 0.01
+
+    def __init__(self, log_to: TextIO, log_debug_messages_from: frozenset[str], flush_interval: float, flush_after_bytes: int, summary_interval: float, rate_limiting: Optional[LogRateLimitingOptions], record_file: Optional[LogRecordFileOptions]):
+        """
+        If 'record_file' is not None, the log is written into the record file instead of 'log_to'.
+
+        :raises FailedToOpenLogRecordFileExc
+        """
+
+        self._log_sink: Final[_LogSinkIface] = (
+            _LogRecordFileSink(record_file) if (record_file is not None) else _LogTextStreamSink(log_to)
+        )
+        self._log_debug_messages_from: frozenset[str] = log_debug_messages_from  # Can be changed at runtime (see the 'admin' module)
+        self._debug_messages_from_listeners: Final[list[Callable[[frozenset[str]], None]]] = []
+        self._flush_interval: Final[float] = flush_interval
+        self._flush_after_bytes: Final[int] = flush_after_bytes
+        self._summary_interval: Final[float] = summary_interval
+        self._rate_limiting_token_buckets: Final[Optional[KeyedTokenBuckets]] = (
+            # Since the number of log facilities is small and fixed, the buckets (one per facility) are never forgotten
+            KeyedTokenBuckets(rate_limiting.messages_per_second, rate_limiting.message_burst, max_tracked_keys=None) if (rate_limiting is not None) else None
+        )
 
         self._thread: Optional[_LoggerThread] = None
         self._log_queue: Final[queue.Queue] = queue.Queue(self.__class__._LOG_QUEUE_SIZE)
         self._message_sequence_number: int = 1
 
+        # Facility -> number of messages; the counts are reported (and reset) by a summary emitted periodically.
+        self._suppressed_message_counts: Final[dict[str, int]] = dict()
+        self._dropped_message_counts: Final[dict[str, int]] = dict()
+        self._last_summary_at: float = TimeHelpers.get_monotonic_timestamp()
+        self._summary_timer: Optional[asyncio.TimerHandle] = None
+
     def __enter__(self):
         assert (self._thread is None)
 
-        self._thread = _LoggerThread(self._log_queue, self._log_to)
+        self._thread = _LoggerThread(self._log_queue, self._log_sink, self._flush_interval, self._flush_after_bytes)
         self._thread.start()
         self.debug("Logger thread has been started.", LogFacilities.LOGGER_START)
 
+        # The summary is emitted by a timer, so that it is not held back until something else gets logged. Without a
+        #  running event loop (e.g. in 'benchmark_logger.py'), the summary is emitted only when the logger is stopped.
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            self._schedule_summary()
+
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         assert (self._thread is not None)
 
+        if self._summary_timer is not None:
+            self._summary_timer.cancel()
+            self._summary_timer = None
+
         try:
             if not self._thread.is_alive():
                 return  # The thread has already died
 
             self.debug("Logger thread is being stopped.", LogFacilities.LOGGER_STOP)
+            self._emit_summary(blocking=True)
             self._log_queue.put(None)  # Signal the thread that we want to terminate it
             self._thread.join()
         finally:
@@ -79,28 +123,124 @@ class Logger:
         if self._thread is None:
             return
 
-        if ("*" in self._log_debug_messages_from) or (facility in self._log_debug_messages_from):
-            self._log("DEBUG", facility, message)
+        if not self.is_debug_enabled_for(facility):
+            return
+
+        # Only debug messages are rate-limited, so that a noisy facility cannot crowd out warnings and the like.
+        if (self._rate_limiting_token_buckets is not None) and (not self._rate_limiting_token_buckets.take_token(facility)):
+            self._suppressed_message_counts[facility] = self._suppressed_message_counts.get(facility, 0) + 1
+            return
+
+        self._log("DEBUG", facility, message)
+
+    def is_debug_enabled_for(self, facility: str) -> bool:
+        """
+        Can be used to avoid doing expensive work whose only purpose is to produce a debug message which would be
+         thrown away anyway.
+        """
+
+        return ("*" in self._log_debug_messages_from) or (facility in self._log_debug_messages_from)
+
+    def get_debug_messages_from(self) -> frozenset[str]:
+        return self._log_debug_messages_from
+
+    def set_debug_messages_from(self, log_debug_messages_from: frozenset[str]) -> None:
+        self._log_debug_messages_from = log_debug_messages_from
+
+        for listener in tuple(self._debug_messages_from_listeners):
+            listener(log_debug_messages_from)
+
+    def add_debug_messages_from_listener(self, listener: Callable[[frozenset[str]], None]) -> None:
+        """
+        The listener gets called with the new facilities each time they are changed using 'set_debug_messages_from()'
+         (this is how the changes get forwarded to the DNS worker processes' loggers).
+        """
+
+        self._debug_messages_from_listeners.append(listener)
+
+    def remove_debug_messages_from_listener(self, listener: Callable[[frozenset[str]], None]) -> None:
+        self._debug_messages_from_listeners.remove(listener)
 
     def _log(self, level: str, facility: str, message: str) -> None:
-        current_timestamp = datetime.datetime.now().strftime(self.__class__._TIMESTAMP_FORMAT)
-        logged_line = f"[{current_timestamp} / {self._message_sequence_number} / {level} / {facility}] {message}"
+        # The line is formatted in the logger thread, so only a small tuple (a log record) is put into the queue here.
+        try:
+            self._log_queue.put_nowait(self._make_log_record(level, facility, message))
+        except queue.Full:
+            self._dropped_message_counts[facility] = self._dropped_message_counts.get(facility, 0) + 1
+
+    def _make_log_record(self, level: str, facility: str, message: str) -> tuple[float, int, str, str, str]:
+        log_record = (time.time(), self._message_sequence_number, level, facility, message)
 
         self._message_sequence_number += 1
 
-        self.write_line_nonblock(logged_line)
+        return log_record
 
-    def write_line_nonblock(self, written_line: str) -> None:
-        if self._thread is None:
+    def _schedule_summary(self) -> None:
+        self._summary_timer = asyncio.get_running_loop().call_later(self._summary_interval, self._handle_summary_timer)
+
+    def _handle_summary_timer(self) -> None:
+        self._emit_summary(blocking=False)
+        self._schedule_summary()
+
+    def _emit_summary(self, blocking: bool) -> None:
+        current_timestamp = TimeHelpers.get_monotonic_timestamp()
+        if (not self._suppressed_message_counts) and (not self._dropped_message_counts):
+            self._last_summary_at = current_timestamp
             return
 
+        elapsed_seconds = (current_timestamp - self._last_summary_at)
+        summary_records = [
+            self._make_log_record("WARN", LogFacilities.LOGGER_SUMMARY, f"Suppressed {count:,} {facility} lines in last {elapsed_seconds:.0f} s (rate limit exceeded).")
+            for facility, count in sorted(self._suppressed_message_counts.items())
+        ] + [
+            self._make_log_record("WARN", LogFacilities.LOGGER_SUMMARY, f"Dropped {count:,} {facility} lines in last {elapsed_seconds:.0f} s (log queue full).")
+            for facility, count in sorted(self._dropped_message_counts.items())
+        ]
+
+        try:
+            self._log_queue.put(summary_records, block=blocking)  # A list of records is written as a single block
+        except queue.Full:
+            return  # The counts are kept, and the summary is retried later
+
+        self._suppressed_message_counts.clear()
+        self._dropped_message_counts.clear()
+        self._last_summary_at = current_timestamp
+
+    def write_line_nonblock(self, written_line: str) -> bool:
+        """
+        Returns False if the line has been discarded, as the log queue is full.
+        """
+
+        if self._thread is None:
+            return False
+
         try:
             self._log_queue.put_nowait(written_line + self.__class__._LINE_SEPARATOR)
         except queue.Full:
-            pass  # If the 'log_to' queue is clogged, strings are silently discarded when putting them there in non-blocking mode
+            return False  # If the 'log_to' queue is clogged, strings are discarded when putting them there in non-blocking mode
+
+        return True
 
     def write_line_block(self, written_line: str) -> None:
         if self._thread is None:
             return
 
         self._log_queue.put(written_line + self.__class__._LINE_SEPARATOR)
+
+    async def write_lines_async(self, written_lines: Sequence[str]) -> None:
+        """
+        Puts the lines into the log queue as a single item. If the queue is full, the coroutine waits (without blocking
+         the event loop) until there is free space in it.
+        """
+
+        if self._thread is None:
+            return
+
+        written_block = "".join((written_line + self.__class__._LINE_SEPARATOR) for written_line in written_lines)
+        while True:
+            try:
+                self._log_queue.put_nowait(written_block)
+            except queue.Full:
+                await asyncio.sleep(self.__class__._FULL_QUEUE_RETRY_INTERVAL)
+            else:
+                return
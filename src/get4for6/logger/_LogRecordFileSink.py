@@ -0,0 +1,142 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, BinaryIO, Union
+import os
+from get4for6.config.LogRecordFileOptions import LogRecordFileOptions
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.logger.LogRecordCodec import LogRecordCodec
+from get4for6.logger.exc.FailedToOpenLogRecordFileExc import FailedToOpenLogRecordFileExc
+from get4for6.logger._LogSinkIface import _LogSinkIface
+
+
+class _LogRecordFileSink(_LogSinkIface):
+    """
+    Writes the log as binary or JSON records (see 'LogRecordCodec') directly into a file, which is rotated when it
+     reaches the configured size or age. Rotated files get numeric suffixes - '.1' is the newest one.
+    """
+
+    _BUFFER_SIZE: Final[int] = (1024 * 1024)
+
+    def __init__(self, options: LogRecordFileOptions):
+        """
+        :raises FailedToOpenLogRecordFileExc
+        """
+
+        self._options: Final[LogRecordFileOptions] = options
+
+        self._record_file: Optional[BinaryIO] = None
+        self._written_length: int = 0
+        self._opened_at: float = 0.0
+
+        # Each run of the program starts with a new file, so that records in different formats are never mixed in one
+        #  file, and a file is never appended to after a possible crash in the middle of writing an item.
+        try:
+            if os.path.exists(self._options.path) and (os.path.getsize(self._options.path) > 0):
+                self._rotate_files()
+            self._open_record_file()
+        except OSError as e:
+            raise FailedToOpenLogRecordFileExc(self._options.path, str(e))
+
+    def _open_record_file(self) -> None:
+        """
+        :raises OSError
+        """
+
+        self._record_file = open(self._options.path, "wb", buffering=self.__class__._BUFFER_SIZE)
+        self._written_length = 0
+        self._opened_at = TimeHelpers.get_monotonic_timestamp()
+
+        self._write_to_record_file(LogRecordCodec.encode_file_header(self._options.format))
+
+    def _rotate_files(self) -> None:
+        """
+        :raises OSError
+        """
+
+        oldest_path = f"{self._options.path}.{self._options.keep_rotated_files}"
+        if os.path.exists(oldest_path):
+            os.unlink(oldest_path)
+
+        for suffix in range(self._options.keep_rotated_files - 1, 0, -1):
+            rotated_path = f"{self._options.path}.{suffix}"
+            if os.path.exists(rotated_path):
+                os.replace(rotated_path, f"{self._options.path}.{suffix + 1}")
+
+        os.replace(self._options.path, f"{self._options.path}.1")
+
+    def write_logged_items(self, logged_items: list[Union[str, tuple, list[tuple]]]) -> int:
+        if self._record_file is None:
+            return 0  # The file could not be reopened after the last rotation
+
+        encoded_block = LogRecordCodec.encode_logged_items(logged_items, self._options.format)
+        self._write_to_record_file(encoded_block)
+
+        if self._is_rotation_due():
+            self._close_record_file()
+            try:
+                self._rotate_files()
+                self._open_record_file()
+            except OSError:
+                pass  # It does not really matter if some log messages get lost due to errors
+
+        return len(encoded_block)
+
+    def _write_to_record_file(self, encoded_block: bytes) -> None:
+        try:
+            self._record_file.write(encoded_block)
+        except OSError:
+            pass  # It does not really matter if some log messages get lost due to errors
+
+        self._written_length += len(encoded_block)
+
+    def _is_rotation_due(self) -> bool:
+        if (self._options.rotate_after_bytes > 0) and (self._written_length >= self._options.rotate_after_bytes):
+            return True
+
+        if self._options.rotate_interval > 0.0:
+            return (TimeHelpers.get_monotonic_timestamp() - self._opened_at) >= self._options.rotate_interval
+
+        return False
+
+    def flush(self) -> None:
+        if self._record_file is None:
+            return
+
+        try:
+            self._record_file.flush()
+        except OSError:
+            pass  # It does not really matter if some log messages get lost due to errors
+
+    def close(self) -> None:
+        self._close_record_file()
+
+    def _close_record_file(self) -> None:
+        if self._record_file is None:
+            return
+
+        try:
+            self._record_file.close()
+        except OSError:
+            pass  # It does not really matter if some log messages get lost due to errors
+
+        self._record_file = None
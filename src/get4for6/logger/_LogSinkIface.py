@@ -0,0 +1,46 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Union
+import abc
+
+
+class _LogSinkIface(metaclass=abc.ABCMeta):
+    # The methods of sinks run in the logger thread! Errors are not propagated to the caller, as it does not really
+    #  matter if some log messages get lost due to them.
+
+    @abc.abstractmethod
+    def write_logged_items(self, logged_items: list[Union[str, tuple, list[tuple]]]) -> int:
+        """
+        Writes the items (see '_LoggerThread' for their types) using a single write, and returns the length of the
+         written data.
+        """
+
+        raise NotImplementedError(self.__class__.write_logged_items.__qualname__)
+
+    @abc.abstractmethod
+    def flush(self) -> None:
+        raise NotImplementedError(self.__class__.flush.__qualname__)
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError(self.__class__.close.__qualname__)
@@ -0,0 +1,62 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, TextIO, Union
+from get4for6.logger.LogLineRenderer import LogLineRenderer
+from get4for6.logger._LogSinkIface import _LogSinkIface
+
+
+class _LogTextStreamSink(_LogSinkIface):
+    """
+    Writes the log as text into a stream (usually the standard output), which is not owned by the sink.
+    """
+
+    def __init__(self, log_to: TextIO):
+        self._log_to: Final[TextIO] = log_to
+        self._log_line_renderer: Final[LogLineRenderer] = LogLineRenderer()
+
+    def write_logged_items(self, logged_items: list[Union[str, tuple, list[tuple]]]) -> int:
+        rendered_parts = []
+        for logged_item in logged_items:
+            if isinstance(logged_item, str):
+                rendered_parts.append(logged_item)
+            elif isinstance(logged_item, list):
+                rendered_parts.extend(self._log_line_renderer.render_log_record(log_record) for log_record in logged_item)
+            else:
+                rendered_parts.append(self._log_line_renderer.render_log_record(logged_item))
+
+        rendered_block = "".join(rendered_parts)
+        try:
+            self._log_to.write(rendered_block)
+        except (OSError, EOFError):
+            pass  # It does not really matter if some log messages get lost due to errors
+
+        return len(rendered_block)
+
+    def flush(self) -> None:
+        try:
+            self._log_to.flush()
+        except (OSError, EOFError):
+            pass  # It does not really matter if some log messages get lost due to errors
+
+    def close(self) -> None:
+        pass  # The stream is not owned by the sink
@@ -20,9 +20,11 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Final, TextIO
+from typing import Final, Optional
 import queue
 import threading
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.logger._LogSinkIface import _LogSinkIface
 
 
 class _LoggerThread(threading.Thread):
@@ -30,26 +32,81 @@ class _LoggerThread(threading.Thread):
     #  a possibly clogged stream (e.g. a pipe leading to a slow SSH connection) until it accepts a string.
     # The option of implementing an asyncio-based logger was considered, but it is not viable as it would have to rely
     #  on direct watching of file descriptors and non-blocking writes, which do not work with some types of streams.
+    # Everything that has been queued up is written using a single write, so that the thread is able to keep up with
+    #  bursts of log messages (otherwise, the queue would fill up and the messages would be dropped).
+    # Log records (tuples) are formatted (or encoded) here by the sink as well, so that the main thread does not have
+    #  to spend its time on it. The queue may contain:
+    #  - a log record: (UNIX timestamp, sequence number, level, facility, message)
+    #  - a list of log records, which are written as a single block
+    #  - an already formatted string (which ends with a line separator), which is written as-is
+    #  - None, which is a signal that the thread shall terminate
 
-    def __init__(self, log_queue: queue.Queue, log_to: TextIO):
+    def __init__(self, log_queue: queue.Queue, log_sink: _LogSinkIface, flush_interval: float, flush_after_bytes: int):
         threading.Thread.__init__(self, name="LoggerThread", daemon=True)
 
         self._log_queue: Final[queue.Queue] = log_queue
-        self._log_to: Final[TextIO] = log_to
+        self._log_sink: Final[_LogSinkIface] = log_sink
+        self._flush_interval: Final[float] = flush_interval  # 0 = the stream is flushed after each write
+        self._flush_after_bytes: Final[int] = flush_after_bytes  # 0 = the stream is flushed only when the interval elapses
+
+        self._unflushed_length: int = 0
+        self._last_flushed_at: float = TimeHelpers.get_monotonic_timestamp()
 
     # This method runs in the logger thread!
     def run(self) -> None:
         while True:
-            logged_line = self._log_queue.get()
+            logged_items = self._wait_for_logged_items()
+            if logged_items is None:  # The flush interval has elapsed without anything being logged
+                self._flush_log_stream()
+                continue
+
+            # None is a signal that we want to terminate; the items queued up before it are still written.
+            terminate = (None in logged_items)
+            if terminate:
+                logged_items = logged_items[:logged_items.index(None)]
 
-            if logged_line is None:  # This is a signal that we want to terminate
+            if logged_items:
+                self._unflushed_length += self._log_sink.write_logged_items(logged_items)
+
+            if terminate:
+                self._flush_log_stream()
+                self._log_sink.close()
                 break
 
-            self._write_logged_line(logged_line)
+            if self._is_flush_due():
+                self._flush_log_stream()
 
-    def _write_logged_line(self, logged_line: str) -> None:
+    def _wait_for_logged_items(self) -> Optional[list]:
         try:
-            self._log_to.write(logged_line)
-            self._log_to.flush()
-        except (OSError, EOFError):
-            pass  # It does not really matter if some log messages get lost due to errors
+            logged_items = [self._log_queue.get(timeout=self._get_time_until_flush_is_due())]
+        except queue.Empty:
+            return None
+
+        while True:
+            try:
+                logged_items.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return logged_items
+
+    def _get_time_until_flush_is_due(self) -> Optional[float]:
+        if (self._flush_interval <= 0.0) or (self._unflushed_length == 0):
+            return None  # Wait indefinitely
+
+        return max(0.0, (self._last_flushed_at + self._flush_interval) - TimeHelpers.get_monotonic_timestamp())
+
+    def _is_flush_due(self) -> bool:
+        if self._flush_interval <= 0.0:
+            return True
+
+        if (self._flush_after_bytes > 0) and (self._unflushed_length >= self._flush_after_bytes):
+            return True
+
+        return (TimeHelpers.get_monotonic_timestamp() - self._last_flushed_at) >= self._flush_interval
+
+    def _flush_log_stream(self) -> None:
+        self._log_sink.flush()
+
+        self._unflushed_length = 0
+        self._last_flushed_at = TimeHelpers.get_monotonic_timestamp()
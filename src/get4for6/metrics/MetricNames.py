@@ -0,0 +1,37 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import final, Final
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+
+
+@final
+class MetricNames(UninstantiableClassMixin):
+    XAX_REQUESTS: Final[str] = "get4for6_xax_requests_total"
+    DNS_QUERIES: Final[str] = "get4for6_dns_queries_total"
+    DNS_UPSTREAM_QUERY_DURATION: Final[str] = "get4for6_dns_upstream_query_duration_seconds"
+    DNS_UPSTREAM_POOL_SOCKETS: Final[str] = "get4for6_dns_upstream_pool_sockets"
+    DNS_UPSTREAM_POOL_PENDING_QUERIES: Final[str] = "get4for6_dns_upstream_pool_pending_queries"
+    LIMIT_REJECTIONS: Final[str] = "get4for6_limit_rejections_total"
+    STATIC_ASSIGNMENTS: Final[str] = "get4for6_static_assignments"
+    DYNAMIC_MAPPERS: Final[str] = "get4for6_dynamic_mappers"
+    DYNAMIC_ASSIGNMENTS: Final[str] = "get4for6_dynamic_assignments"
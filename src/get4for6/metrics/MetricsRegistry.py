@@ -0,0 +1,102 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Callable, Iterable, Any
+from get4for6.exc.ThisShouldNeverHappenExc import ThisShouldNeverHappenExc
+from get4for6.metrics.MetricNames import MetricNames
+from get4for6.metrics._MetricCounter import _MetricCounter
+from get4for6.metrics._MetricHistogram import _MetricHistogram
+from get4for6.metrics._MetricGauge import _MetricGauge
+
+
+class MetricsRegistry:
+    """
+    Holds the program's metrics: integer counters and fixed-bucket histograms, which are updated by the data path,
+     and gauges, whose values are collected from their owners only when the metrics are rendered. Since the program
+     is single-threaded, no locking is needed, and updating a metric costs only a couple of dictionary operations.
+    Each process has its own registry. The DNS worker processes periodically send snapshots of their registries to the
+     main process, whose registry adds the values from the latest snapshot of each of them to its own values when the
+     metrics are rendered.
+    """
+
+    _DURATION_BUCKET_UPPER_BOUNDS: Final[tuple[float, ...]] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._counters: Final[dict[str, _MetricCounter]] = {
+            MetricNames.XAX_REQUESTS: _MetricCounter(MetricNames.XAX_REQUESTS, "Tundra-XAX translation requests by message type and outcome.", ("message_type", "outcome")),
+            MetricNames.DNS_QUERIES: _MetricCounter(MetricNames.DNS_QUERIES, "Answered DNS queries by query type and response code.", ("qtype", "rcode")),
+            MetricNames.LIMIT_REJECTIONS: _MetricCounter(MetricNames.LIMIT_REJECTIONS, "Queries and connections rejected because a simultaneity limit had been reached.", ("limit",))
+        }
+        self._histograms: Final[dict[str, _MetricHistogram]] = {
+            MetricNames.DNS_UPSTREAM_QUERY_DURATION: _MetricHistogram(MetricNames.DNS_UPSTREAM_QUERY_DURATION, "Durations of queries sent to upstream DNS servers.", ("transport", "outcome"), self.__class__._DURATION_BUCKET_UPPER_BOUNDS)
+        }
+        self._gauges: Final[dict[str, _MetricGauge]] = dict()
+        self._foreign_snapshots: Final[dict[str, dict[str, list[tuple[tuple[str, ...], Any]]]]] = dict()  # Source -> (metric name -> metric values)
+
+    def increment_counter(self, name: str, label_values: tuple[str, ...] = (), amount: int = 1) -> None:
+        self._counters[name].increment(label_values, amount)
+
+    def observe_histogram(self, name: str, value: float, label_values: tuple[str, ...] = ()) -> None:
+        self._histograms[name].observe(label_values, value)
+
+    def register_gauge(self, name: str, help_text: str, label_names: tuple[str, ...], collect_values: Callable[[], Iterable[tuple[tuple[str, ...], int]]]) -> None:
+        """
+        'collect_values' is called each time the metrics are rendered, and shall return (label values, value) pairs.
+         A gauge registered under an already registered name replaces the previous one.
+        """
+
+        if (name in self._counters) or (name in self._histograms):
+            raise ThisShouldNeverHappenExc(f"The metric name {repr(name)} is already used by a counter or histogram!")
+
+        self._gauges[name] = _MetricGauge(name, help_text, label_names, collect_values)
+
+    def take_snapshot(self) -> dict[str, list[tuple[tuple[str, ...], Any]]]:
+        """
+        Returns the current values of all the metrics in a JSON-serializable form, so that they can be merged into
+         another process's registry using 'set_foreign_snapshot()'.
+        """
+
+        return {name: metric.get_values() for name, metric in (tuple(self._counters.items()) + tuple(self._histograms.items()) + tuple(self._gauges.items()))}
+
+    def set_foreign_snapshot(self, source: str, snapshot: dict[str, list[tuple[tuple[str, ...], Any]]]) -> None:
+        """
+        Replaces the previous snapshot from 'source' (e.g. a DNS worker process). The snapshot is kept even if the
+         source stops sending them, so that the rendered counters never go backwards.
+
+        :raises ValueError: If the snapshot is malformed.
+        """
+
+        try:
+            self._foreign_snapshots[source] = {str(name): [(tuple(str(label_value) for label_value in label_values), value) for label_values, value in values] for name, values in snapshot.items()}
+        except (TypeError, ValueError, AttributeError):
+            raise ValueError("The metrics snapshot is malformed!")
+
+    def render_prometheus_text(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+
+        rendered_lines = []
+        for name, metric in (tuple(self._counters.items()) + tuple(self._histograms.items()) + tuple(self._gauges.items())):
+            rendered_lines.extend(metric.render([foreign_snapshot.get(name, ()) for foreign_snapshot in self._foreign_snapshots.values()]))
+
+        return "".join((rendered_line + "\n") for rendered_line in rendered_lines)
@@ -0,0 +1,57 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Callable, Iterable
+from get4for6.metrics._MetricRenderingHelpers import _MetricRenderingHelpers
+
+
+class _MetricGauge:
+    """
+    The values of gauges are not kept up to date by the data path - they are collected from their owners only when
+     the metrics are rendered.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], collect_values: Callable[[], Iterable[tuple[tuple[str, ...], int]]]):
+        self._name: Final[str] = name
+        self._help_text: Final[str] = help_text
+        self._label_names: Final[tuple[str, ...]] = label_names
+        self._collect_values: Final[Callable[[], Iterable[tuple[tuple[str, ...], int]]]] = collect_values  # Returns (label values, value) pairs
+
+    def get_values(self) -> list[tuple[tuple[str, ...], int]]:
+        return list(self._collect_values())
+
+    def render(self, foreign_values: Iterable[Iterable[tuple[tuple[str, ...], int]]]) -> list[str]:
+        """
+        'foreign_values' are the values of the same gauge in other processes (see 'MetricsRegistry'), which are added
+         to this gauge's own values.
+        """
+
+        values = dict()
+        for value_list in ((self._collect_values(),) + tuple(foreign_values)):
+            for label_values, value in value_list:
+                values[label_values] = values.get(label_values, 0) + value
+
+        rendered_lines = _MetricRenderingHelpers.render_header(self._name, self._help_text, "gauge")
+        for label_values, value in sorted(values.items()):
+            rendered_lines.append(f"{self._name}{_MetricRenderingHelpers.render_labels(self._label_names, label_values)} {value}")
+
+        return rendered_lines
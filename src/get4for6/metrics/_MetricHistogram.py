@@ -0,0 +1,84 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Iterable
+import bisect
+from get4for6.metrics._MetricRenderingHelpers import _MetricRenderingHelpers
+
+
+class _MetricHistogram:
+    """
+    The buckets are fixed, so that an observation costs only a binary search and a few additions. Each bucket counts
+     only the observations falling into it (the last one being the "+Inf" bucket); the counts are made cumulative
+     when the histogram is rendered.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], bucket_upper_bounds: tuple[float, ...]):
+        self._name: Final[str] = name
+        self._help_text: Final[str] = help_text
+        self._label_names: Final[tuple[str, ...]] = label_names
+        self._bucket_upper_bounds: Final[tuple[float, ...]] = bucket_upper_bounds
+        self._values: Final[dict[tuple[str, ...], tuple[list[int], list[float]]]] = dict()  # Label values -> (bucket counts, [sum of observations])
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        try:
+            bucket_counts, observation_sum = self._values[label_values]
+        except KeyError:
+            bucket_counts, observation_sum = self._values[label_values] = ([0] * (len(self._bucket_upper_bounds) + 1), [0.0])
+
+        bucket_counts[bisect.bisect_left(self._bucket_upper_bounds, value)] += 1
+        observation_sum[0] += value
+
+    def get_values(self) -> list[tuple[tuple[str, ...], tuple[list[int], float]]]:  # (label values, (bucket counts, sum of observations))
+        return [(label_values, (list(bucket_counts), observation_sum[0])) for label_values, (bucket_counts, observation_sum) in self._values.items()]
+
+    def render(self, foreign_values: Iterable[Iterable[tuple[tuple[str, ...], tuple[list[int], float]]]]) -> list[str]:
+        """
+        'foreign_values' are the values of the same histogram in other processes (see 'MetricsRegistry'), which are
+         added to this histogram's own values.
+        """
+
+        values = dict(self.get_values())
+        for foreign_value_list in foreign_values:
+            for label_values, (bucket_counts, observation_sum) in foreign_value_list:
+                if len(bucket_counts) != (len(self._bucket_upper_bounds) + 1):
+                    continue
+
+                try:
+                    own_bucket_counts, own_observation_sum = values[label_values]
+                except KeyError:
+                    values[label_values] = (list(bucket_counts), observation_sum)
+                else:
+                    values[label_values] = ([(own_count + count) for own_count, count in zip(own_bucket_counts, bucket_counts)], (own_observation_sum + observation_sum))
+
+        rendered_lines = _MetricRenderingHelpers.render_header(self._name, self._help_text, "histogram")
+        for label_values, (bucket_counts, observation_sum) in sorted(values.items()):
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip((tuple(repr(bound) for bound in self._bucket_upper_bounds) + ("+Inf",)), bucket_counts):
+                cumulative_count += bucket_count
+                rendered_lines.append(f"{self._name}_bucket{_MetricRenderingHelpers.render_labels((self._label_names + ('le',)), (label_values + (upper_bound,)))} {cumulative_count}")
+
+            rendered_labels = _MetricRenderingHelpers.render_labels(self._label_names, label_values)
+            rendered_lines.append(f"{self._name}_sum{rendered_labels} {repr(observation_sum)}")
+            rendered_lines.append(f"{self._name}_count{rendered_labels} {cumulative_count}")
+
+        return rendered_lines
@@ -0,0 +1,82 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import asyncio
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.modules.ModuleIface import ModuleIface
+from get4for6.modules.exc.FailedToStartServerExc import FailedToStartServerExc
+from get4for6.modules.exc.FailedToStopServerExc import FailedToStopServerExc
+from get4for6.modules.m_admin._AdminClientHandler import _AdminClientHandler
+
+
+class AdminModule(ModuleIface):
+    _SERVICE: Final[str] = "admin"
+    _BUFFER_SIZE_LIMIT: Final[int] = 4096
+
+    async def run(self) -> None:
+        await self._run()
+
+    @DI_NS.inject_dependencies("termination_event", "logger")  # The 'run()' method has no arguments in 'ModuleIface'
+    async def _run(self, termination_event: asyncio.Event, logger: Logger) -> None:
+        unix_servers = await self._start_servers()
+
+        logger.info(f"Listening on Unix sockets {repr([unix_path for _, unix_path in unix_servers])}.", LogFacilities.ADMIN)
+        await termination_event.wait()
+
+        await self._stop_servers(unix_servers)
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    async def _start_servers(self, configuration: Configuration, logger: Logger) -> list[tuple[asyncio.base_events.Server, str]]:
+        unix_servers = []
+        for unix_path in configuration.admin.listen_on_unix:
+            try:
+                new_unix_server = await asyncio.start_unix_server(
+                    client_connected_cb=self._client_connected,
+                    path=unix_path,
+                    limit=self.__class__._BUFFER_SIZE_LIMIT,
+                    start_serving=True
+                )
+            except OSError as e:
+                raise FailedToStartServerExc.unix(self.__class__._SERVICE, unix_path, str(e))
+            else:
+                unix_servers.append((new_unix_server, unix_path))
+                logger.debug(f"Unix socket server on {repr(unix_path)} has been started.", LogFacilities.ADMIN_SERVER_START)
+
+        return unix_servers
+
+    @DI_NS.inject_dependencies("logger")
+    async def _stop_servers(self, unix_servers: list[tuple[asyncio.base_events.Server, str]], logger: Logger) -> None:
+        for unix_server, unix_path in unix_servers:
+            try:
+                unix_server.close()
+                await unix_server.wait_closed()
+            except OSError as e:
+                raise FailedToStopServerExc.unix(self.__class__._SERVICE, unix_path, str(e))
+            else:
+                logger.debug(f"Unix socket server on {repr(unix_path)} has been stopped.", LogFacilities.ADMIN_SERVER_STOP)
+
+    async def _client_connected(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await _AdminClientHandler(reader=reader, writer=writer).handle_client()
@@ -0,0 +1,99 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import asyncio
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.modules.m_admin._AdminCommandExecutor import _AdminCommandExecutor
+from get4for6.modules.m_admin._AdminCommandFailedInternalExc import _AdminCommandFailedInternalExc
+
+
+class _AdminClientHandler:
+    # The protocol is line-based, so that it can be used interactively (e.g. using "socat - UNIX-CONNECT:<path>"): each
+    #  command is a single line, and the lines of its output are followed by a line saying either "OK", or "ERROR: " and
+    #  the reason why the command has failed. Empty lines are ignored.
+
+    _QUIT_COMMAND: Final[str] = "quit"
+    _SUCCESS_LINE: Final[str] = "OK"
+    _ERROR_LINE_PATTERN: Final[str] = "ERROR: {reason}"
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader: Final[asyncio.StreamReader] = reader
+        self._writer: Final[asyncio.StreamWriter] = writer
+
+    @DI_NS.inject_dependencies("logger")
+    async def handle_client(self, logger: Logger) -> None:
+        try:
+            await self._handle_client()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"An unexpected exception occurred while handling an admin client --> {e.__class__.__name__}: {str(e)}", LogFacilities.ADMIN_CLIENT_UNEXPECTED_EXCEPTION)
+
+    @DI_NS.inject_dependencies("logger")
+    async def _handle_client(self, logger: Logger) -> None:
+        logger.debug("A new admin client has connected.", LogFacilities.ADMIN_CLIENT_CONNECT)
+
+        try:
+            await self._handle_commands()
+        except (OSError, EOFError, ValueError):  # If an error occurs (incl. a too long line), the client will be disconnected
+            pass
+        finally:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except (OSError, EOFError):  # If an error occurs, assume that the connection has already been closed
+                pass
+
+            logger.debug("An admin client has disconnected.", LogFacilities.ADMIN_CLIENT_DISCONNECT)
+
+    @DI_NS.inject_dependencies("logger")
+    async def _handle_commands(self, logger: Logger) -> None:
+        """
+        :raises ValueError
+        """
+
+        command_executor = _AdminCommandExecutor()
+
+        while True:
+            command_line_bytes = await self._reader.readline()  # Raises 'ValueError' if the line is too long
+            if not command_line_bytes:  # EOF
+                return
+
+            command_line = command_line_bytes.decode("utf-8", errors="replace").strip()
+            if not command_line:
+                continue
+            if command_line.lower() == self.__class__._QUIT_COMMAND:
+                return
+
+            logger.debug(f"Executing an admin command: {repr(command_line)}", LogFacilities.ADMIN_COMMAND)
+            try:
+                output_lines = command_executor.execute_command(command_line)
+            except _AdminCommandFailedInternalExc as e:
+                output_lines = [self.__class__._ERROR_LINE_PATTERN.format(reason=str(e))]
+            else:
+                output_lines.append(self.__class__._SUCCESS_LINE)
+
+            self._writer.write("".join((output_line + "\n") for output_line in output_lines).encode("utf-8"))
+            await self._writer.drain()
@@ -0,0 +1,189 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Callable, Union
+import ipaddress
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.helpers.IPHelpers import IPHelpers
+from get4for6.helpers.MappingFormatHelpers import MappingFormatHelpers
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
+from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
+from get4for6.modules.m_admin._AdminCommandFailedInternalExc import _AdminCommandFailedInternalExc
+
+
+class _AdminCommandExecutor:
+    # Each command is carried out synchronously, i.e. without giving other tasks a chance to run in the meantime, so
+    #  it always sees (and leaves behind) a consistent state. For this reason, none of the commands may iterate over
+    #  all the mappings - single mappings are looked up using the same indexes as the data path uses.
+
+    _HELP_LINES: Final[tuple[str, ...]] = (
+        "help                                 - print out this help",
+        "lookup <client IPv4> <IPv4 or IPv6>  - look up the client's mapping of a substitute IPv4 or an IPv6 address",
+        "stats                                - print out the sizes of the mappers and caches, and the metrics",
+        "flush-caches                         - flush all the caches (e.g. the DNS module's ones)",
+        "drop-client <client IPv4>            - drop the client's dynamic mapper (i.e. all its dynamic mappings)",
+        "debug show                           - print out the facilities from which debug messages are logged",
+        "debug set|add|remove [facility ...]  - change the facilities from which debug messages are logged",
+        "quit                                 - close the connection"
+    )
+
+    _STATIC_MAPPING_PATTERN: Final[str] = "Static mapping: {mapping}"
+    _DYNAMIC_MAPPING_PATTERN: Final[str] = "Dynamic mapping: {mapping}"
+
+    # '*' makes the logger log debug messages from all facilities (see 'Logger.is_debug_enabled_for()')
+    _VALID_DEBUG_FACILITIES: Final[frozenset[str]] = frozenset({"*"} | {value for name, value in vars(LogFacilities).items() if name.isupper()})
+
+    def execute_command(self, command_line: str) -> list[str]:
+        """
+        Returns the lines of the command's output.
+
+        :raises _AdminCommandFailedInternalExc
+        """
+
+        command_parts = command_line.split()
+        if not command_parts:
+            raise _AdminCommandFailedInternalExc("The command is empty!")
+
+        command_name, command_args = command_parts[0].lower(), command_parts[1:]
+        try:
+            command_function = self._get_command_functions()[command_name]
+        except KeyError:
+            raise _AdminCommandFailedInternalExc(f"Unknown command: {repr(command_name)} (see 'help')")
+
+        return command_function(command_args)
+
+    def _get_command_functions(self) -> dict[str, Callable[[list[str]], list[str]]]:
+        return {
+            "help": self._execute_help,
+            "lookup": self._execute_lookup,
+            "stats": self._execute_stats,
+            "flush-caches": self._execute_flush_caches,
+            "drop-client": self._execute_drop_client,
+            "debug": self._execute_debug
+        }
+
+    def _execute_help(self, command_args: list[str]) -> list[str]:
+        self._check_number_of_args(command_args, 0)
+
+        return list(self.__class__._HELP_LINES)
+
+    @DI_NS.inject_dependencies("substitute_address_mapper")
+    def _execute_lookup(self, command_args: list[str], substitute_address_mapper: SubstituteAddressMapper) -> list[str]:
+        self._check_number_of_args(command_args, 2)
+
+        client_ipv4 = self._parse_client_ipv4(command_args[0])
+        ip_address = self._parse_ip_address(command_args[1])
+
+        mapping = substitute_address_mapper.look_up_mapping(ip_address, client_ipv4)
+        if mapping is None:
+            raise _AdminCommandFailedInternalExc(f"The client {client_ipv4} has no mapping of {ip_address}!")
+
+        mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime = mapping
+        if remaining_guaranteed_lifetime is None:
+            return [self.__class__._STATIC_MAPPING_PATTERN.format(mapping=MappingFormatHelpers.format_static_mapping(mapping_ipv4, mapping_ipv6))]
+
+        return [self.__class__._DYNAMIC_MAPPING_PATTERN.format(mapping=MappingFormatHelpers.format_dynamic_mapping(mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime))]
+
+    @DI_NS.inject_dependencies("substitute_address_mapper", "cache_registry", "metrics_registry")
+    def _execute_stats(self, command_args: list[str], substitute_address_mapper: SubstituteAddressMapper, cache_registry: CacheRegistry, metrics_registry: MetricsRegistry) -> list[str]:
+        self._check_number_of_args(command_args, 0)
+
+        output_lines = [
+            f"Static mappings: {substitute_address_mapper.get_static_assignment_count()}",
+            f"Dynamic mappers: {substitute_address_mapper.get_dynamic_mapper_count()}",
+            f"Dynamic mappings: {substitute_address_mapper.get_dynamic_assignment_count()}"
+        ]
+        output_lines.extend(f"Cache {repr(name)}: {entry_count} entries" for name, entry_count in cache_registry.get_entry_counts())
+        output_lines.extend(metrics_registry.render_prometheus_text().splitlines())
+
+        return output_lines
+
+    @DI_NS.inject_dependencies("cache_registry", "logger")
+    def _execute_flush_caches(self, command_args: list[str], cache_registry: CacheRegistry, logger: Logger) -> list[str]:
+        self._check_number_of_args(command_args, 0)
+
+        flushed_caches = cache_registry.flush_caches()
+        logger.info(f"The caches {repr([name for name, _ in flushed_caches])} have been flushed by an admin.", LogFacilities.ADMIN)
+
+        return [f"Flushed {entry_count} entries from the cache {repr(name)}." for name, entry_count in flushed_caches]
+
+    @DI_NS.inject_dependencies("substitute_address_mapper", "logger")
+    def _execute_drop_client(self, command_args: list[str], substitute_address_mapper: SubstituteAddressMapper, logger: Logger) -> list[str]:
+        self._check_number_of_args(command_args, 1)
+
+        client_ipv4 = self._parse_client_ipv4(command_args[0])
+
+        dropped_mapping_count = substitute_address_mapper.drop_dynamic_mapper_of_client(client_ipv4)
+        if dropped_mapping_count is None:
+            raise _AdminCommandFailedInternalExc(f"The client {client_ipv4} has no dynamic mapper!")
+
+        logger.info(f"The dynamic mapper of the client {client_ipv4} ({dropped_mapping_count} mappings) has been dropped by an admin.", LogFacilities.ADMIN)
+
+        return [f"Dropped the dynamic mapper of the client {client_ipv4} with {dropped_mapping_count} mappings."]
+
+    @DI_NS.inject_dependencies("logger")
+    def _execute_debug(self, command_args: list[str], logger: Logger) -> list[str]:
+        if not command_args:
+            raise _AdminCommandFailedInternalExc("The 'debug' command requires a subcommand (see 'help')!")
+
+        subcommand, facilities = command_args[0].lower(), frozenset(command_args[1:])
+        current_facilities = logger.get_debug_messages_from()
+
+        if subcommand == "show":
+            self._check_number_of_args(command_args, 1)
+        elif subcommand in ("set", "add", "remove"):
+            # Facilities are only validated when they are being enabled, so that a misspelled one can still be removed
+            unknown_facilities = (facilities - self.__class__._VALID_DEBUG_FACILITIES) if (subcommand != "remove") else frozenset()
+            if unknown_facilities:
+                raise _AdminCommandFailedInternalExc(f"Unknown debug message facilities: {repr(sorted(unknown_facilities))}")
+
+            new_facilities = {"set": facilities, "add": (current_facilities | facilities), "remove": (current_facilities - facilities)}[subcommand]
+            logger.set_debug_messages_from(new_facilities)
+            logger.info(f"Debug messages are now logged from {repr(sorted(new_facilities))} (changed by an admin).", LogFacilities.ADMIN)
+        else:
+            raise _AdminCommandFailedInternalExc(f"Unknown 'debug' subcommand: {repr(subcommand)} (see 'help')")
+
+        return [f"Debug messages are logged from: {repr(sorted(logger.get_debug_messages_from()))}"]
+
+    @staticmethod
+    def _check_number_of_args(command_args: list[str], expected_number_of_args: int) -> None:
+        if len(command_args) != expected_number_of_args:
+            raise _AdminCommandFailedInternalExc(f"The command expects {expected_number_of_args} arguments, but {len(command_args)} have been provided!")
+
+    @DI_NS.inject_dependencies("configuration")
+    def _parse_client_ipv4(self, ip_string: str, configuration: Configuration) -> ipaddress.IPv4Address:
+        client_ipv4 = IPHelpers.parse_client_ipv4_from_string_and_validate_it(ip_string, configuration)
+        if client_ipv4 is None:
+            raise _AdminCommandFailedInternalExc(f"{repr(ip_string)} is not an allowed client IPv4 address!")
+
+        return client_ipv4
+
+    @staticmethod
+    def _parse_ip_address(ip_string: str) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+        try:
+            return ipaddress.ip_address(ip_string)
+        except ValueError:
+            raise _AdminCommandFailedInternalExc(f"{repr(ip_string)} is not a valid IP address!")
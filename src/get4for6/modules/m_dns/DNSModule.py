@@ -20,7 +20,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Final
+from typing import Final, Optional
 import asyncio
 import threading
 from get4for6.config.Configuration import Configuration
@@ -31,9 +31,12 @@ from get4for6.logger.LogFacilities import LogFacilities
 from get4for6.modules.ModuleIface import ModuleIface
 from get4for6.modules.exc.FailedToStartServerExc import FailedToStartServerExc
 from get4for6.modules.exc.FailedToStopServerExc import FailedToStopServerExc
+from get4for6.modules.udp.DrainingDatagramTransport import DrainingDatagramTransport
 from get4for6.modules.m_dns._DNSDatagramProtocol import _DNSDatagramProtocol
 from get4for6.modules.m_dns._DNSTCPClientHandler import _DNSTCPClientHandler
 from get4for6.modules.m_dns._DNSUDPClientHandlerDispatcher import _DNSUDPClientHandlerDispatcher
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState  # noqa
+from get4for6.modules.m_dns._dns_qh._DNSClientRateLimiter import _DNSClientRateLimiter  # noqa
 
 
 class DNSModule(ModuleIface):
@@ -43,6 +46,14 @@ class DNSModule(ModuleIface):
     @DI_NS.inject_dependencies("configuration")
     def __init__(self, configuration: Configuration):
         self._max_simultaneous_queries_semaphore: Final[threading.BoundedSemaphore] = threading.BoundedSemaphore(value=configuration.dns.max_simultaneous_queries)
+        self._query_handler_shared_state: Final[DNSQueryHandlerSharedState] = DNSQueryHandlerSharedState()
+
+    def get_client_rate_limiter(self) -> Optional[_DNSClientRateLimiter]:
+        """
+        Returns None if client rate limiting is not enabled.
+        """
+
+        return self._query_handler_shared_state.get_client_rate_limiter()
 
     async def run(self) -> None:
         await self._run()
@@ -55,25 +66,28 @@ class DNSModule(ModuleIface):
         await termination_event.wait()
 
         await self._stop_servers(tcp_udp_servers)
+        self._query_handler_shared_state.close()
 
     @DI_NS.inject_dependencies("configuration", "logger")
     async def _start_servers(self, configuration: Configuration, logger: Logger) -> list[tuple[asyncio.base_events.Server, asyncio.DatagramTransport, _DNSDatagramProtocol, asyncio.Task, IPPortPair]]:
-        loop = asyncio.get_running_loop()
         tcp_udp_servers = []
 
+        # When there are multiple DNS worker processes, each of them (including the main process) binds its own sockets
+        #  to the same addresses, and the kernel distributes the incoming datagrams and connections among them.
+        reuse_port = (configuration.dns.workers > 1)
+
         for ip_port_pair in configuration.dns.listen_on:
             # UDP
             try:
-                transport, protocol = await loop.create_datagram_endpoint(
-                    protocol_factory=lambda: _DNSDatagramProtocol(),
-                    local_addr=(str(ip_port_pair.ip_address), ip_port_pair.port),
-                    remote_addr=None,
-                    allow_broadcast=False
+                transport, protocol = await DrainingDatagramTransport.create_endpoint(
+                    protocol_factory=lambda: _DNSDatagramProtocol(self._query_handler_shared_state),
+                    ip_port_pair=ip_port_pair,
+                    reuse_port=reuse_port
                 )
             except OSError as f:
                 raise FailedToStartServerExc.udp(self.__class__._SERVICE, ip_port_pair, str(f))
             else:
-                new_dispatcher_task = asyncio.create_task(_DNSUDPClientHandlerDispatcher(transport, protocol, self._max_simultaneous_queries_semaphore).run())  # noqa
+                new_dispatcher_task = asyncio.create_task(_DNSUDPClientHandlerDispatcher(transport, protocol, self._max_simultaneous_queries_semaphore, self._query_handler_shared_state).run())  # noqa
 
             # TCP
             try:
@@ -82,6 +96,7 @@ class DNSModule(ModuleIface):
                     host=str(ip_port_pair.ip_address),
                     port=ip_port_pair.port,
                     limit=self.__class__._BUFFER_SIZE_LIMIT,
+                    reuse_port=reuse_port,
                     start_serving=True
                 )
             except OSError as e:
@@ -117,5 +132,6 @@ class DNSModule(ModuleIface):
         await _DNSTCPClientHandler(
             reader=reader,
             writer=writer,
-            max_simultaneous_queries_semaphore=self._max_simultaneous_queries_semaphore
+            max_simultaneous_queries_semaphore=self._max_simultaneous_queries_semaphore,
+            query_handler_shared_state=self._query_handler_shared_state
         ).handle_client()
@@ -21,29 +21,67 @@
 
 
 from typing import Final, Optional
+import ipaddress
 import asyncio
 from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.helpers.IPHelpers import IPHelpers
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandler import DNSQueryHandler  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSReceivedQuery import DNSReceivedQuery  # noqa
 
 
 class _DNSDatagramProtocol(asyncio.DatagramProtocol):
     @DI_NS.inject_dependencies("configuration")
-    def __init__(self, configuration: Configuration):
+    def __init__(self, query_handler_shared_state: DNSQueryHandlerSharedState, configuration: Configuration):
+        self._query_handler_shared_state: Final[DNSQueryHandlerSharedState] = query_handler_shared_state
         self._pending_queries: Final[asyncio.Queue] = asyncio.Queue(maxsize=configuration.dns.max_simultaneous_queries)
 
+        self._transport: Optional[asyncio.DatagramTransport] = None
         self._close_exc: Optional[Exception] = None
         self._close_exc_available_event: Final[asyncio.Event] = asyncio.Event()
 
     def connection_made(self, transport: asyncio.DatagramTransport) -> None:
-        pass  # The transport is not needed in this class
+        self._transport = transport
 
-    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+    @DI_NS.inject_dependencies("logger")
+    def datagram_received(self, data: bytes, addr: tuple[str, int], logger: Logger) -> None:
         try:
-            self._pending_queries.put_nowait((data, addr))
+            self._handle_received_datagram(data, addr)
+        except Exception as e:
+            logger.warning(f"An unexpected exception occurred while handling a UDP DNS client --> {e.__class__.__name__}: {str(e)}", LogFacilities.DNS_CLIENT_UNEXPECTED_EXCEPTION)
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    def _handle_received_datagram(self, data: bytes, addr: tuple[str, int], configuration: Configuration, logger: Logger) -> None:
+        # Validate the client's IPv4 address before spending time and resources carrying out the query
+        valid_client_ipv4 = IPHelpers.parse_client_ipv4_from_string_and_validate_it(addr[0], configuration)
+        if valid_client_ipv4 is None:
+            logger.debug(f"{repr(addr[0])} is not a valid client IPv4 address!", LogFacilities.DNS_CLIENT_INVALID_IP)
+            return
+
+        # Clients which exceed their rate limit are not answered at all - the query is dropped before it is parsed
+        client_rate_limiter = self._query_handler_shared_state.get_client_rate_limiter()
+        if (client_rate_limiter is not None) and (not client_rate_limiter.is_query_allowed(valid_client_ipv4)):
+            logger.debug(f"The client {valid_client_ipv4} has exceeded its query rate limit!", LogFacilities.DNS_CLIENT_RATE_LIMITED)
+            return
+
+        # Queries which can be answered from the auxiliary zone or from the caches are answered right away, without
+        #  going through the queue and a worker of '_DNSUDPClientHandlerDispatcher'.
+        received_query = DNSReceivedQuery(data)
+        response_bytes = DNSQueryHandler(self._query_handler_shared_state).handle_query_without_io(received_query=received_query, valid_client_ipv4=valid_client_ipv4, over_tcp=False)
+        if response_bytes is not None:
+            self._transport.sendto(response_bytes, addr)  # Does not raise, 'error_received' is called instead
+            return
+
+        try:
+            # The already parsed query is handed over, so that the worker does not need to parse it again
+            self._pending_queries.put_nowait((received_query, addr, valid_client_ipv4))
         except asyncio.QueueFull:
             pass  # Can be safely ignored
 
-    async def wait_for_query_to_be_received(self) -> tuple[bytes, tuple[str, int]]:  # (data, addr)
+    async def wait_for_query_to_be_received(self) -> tuple[DNSReceivedQuery, tuple[str, int], ipaddress.IPv4Address]:  # (received_query, addr, valid_client_ipv4)
         return await self._pending_queries.get()
 
     def error_received(self, exc: Exception) -> None:
@@ -28,15 +28,20 @@ from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
 from get4for6.helpers.IPHelpers import IPHelpers
 from get4for6.modules.m_dns._dns_qh.DNSQueryHandler import DNSQueryHandler  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSReceivedQuery import DNSReceivedQuery  # noqa
 
 
 class _DNSTCPClientHandler:
-    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_simultaneous_queries_semaphore: threading.BoundedSemaphore):
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_simultaneous_queries_semaphore: threading.BoundedSemaphore, query_handler_shared_state: DNSQueryHandlerSharedState):
         self._reader: Final[asyncio.StreamReader] = reader
         self._writer: Final[asyncio.StreamWriter] = writer
         self._max_simultaneous_queries_semaphore: Final[threading.BoundedSemaphore] = max_simultaneous_queries_semaphore
+        self._query_handler_shared_state: Final[DNSQueryHandlerSharedState] = query_handler_shared_state
 
     @DI_NS.inject_dependencies("logger")
     async def handle_client(self, logger: Logger) -> None:
@@ -72,50 +77,105 @@ class _DNSTCPClientHandler:
         # If the client's IPv4 is valid, proceed further
         await self._handle_client_with_valid_ipv4(valid_client_ipv4)
 
+    @DI_NS.inject_dependencies("configuration")
+    async def _handle_client_with_valid_ipv4(self, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration) -> None:
+        # As per RFC 7766, multiple queries may be received over a single connection, and they are resolved
+        #  concurrently ("pipelining"), with each response being sent back as soon as it is ready (i.e. possibly out of
+        #  order - the client matches the responses to its queries using their message IDs).
+        in_flight_query_tasks = set()
+        try:
+            while True:
+                # Backpressure - no further queries are read from the client until some of the in-flight ones finish
+                while len(in_flight_query_tasks) >= configuration.dns.tcp_max_queries_in_flight_per_connection:
+                    await asyncio.wait(in_flight_query_tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                query_bytes = await self._receive_query_via_tcp(in_flight_query_tasks)
+                if query_bytes is None:
+                    break
+
+                if not self._is_query_allowed_by_client_rate_limiter(valid_client_ipv4):
+                    break
+
+                if not self._acquire_max_simultaneous_queries_semaphore():
+                    break
+
+                new_query_task = asyncio.create_task(self._handle_dns_query(query_bytes, valid_client_ipv4))
+                in_flight_query_tasks.add(new_query_task)
+                new_query_task.add_done_callback(in_flight_query_tasks.discard)
+
+            # The responses to the queries which have already been received are sent back before the connection is
+            #  closed (unless it has already been closed by the client).
+            if len(in_flight_query_tasks) > 0:
+                await asyncio.wait(in_flight_query_tasks)
+        finally:
+            for in_flight_query_task in in_flight_query_tasks:
+                in_flight_query_task.cancel()
+
     @DI_NS.inject_dependencies("logger")
-    async def _handle_client_with_valid_ipv4(self, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> None:
+    def _is_query_allowed_by_client_rate_limiter(self, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> bool:
+        client_rate_limiter = self._query_handler_shared_state.get_client_rate_limiter()
+        if (client_rate_limiter is not None) and (not client_rate_limiter.is_query_allowed(valid_client_ipv4)):
+            # A client which exceeds its rate limit is disconnected, without its query being parsed
+            logger.debug(f"The client {valid_client_ipv4} has exceeded its query rate limit!", LogFacilities.DNS_CLIENT_RATE_LIMITED)
+            return False
+
+        return True
+
+    @DI_NS.inject_dependencies("logger", "metrics_registry")
+    def _acquire_max_simultaneous_queries_semaphore(self, logger: Logger, metrics_registry: MetricsRegistry) -> bool:
         if not self._max_simultaneous_queries_semaphore.acquire(blocking=False, timeout=None):
             # If it is not possible to serve the client due to the max simultaneous query limit being reached, disconnect the client
+            metrics_registry.increment_counter(MetricNames.LIMIT_REJECTIONS, ("dns_simultaneous_queries",))
             logger.debug("It is currently not possible to answer DNS queries, as the maximum simultaneous query limit has been reached!", LogFacilities.DNS_CLIENT_LIMIT_REACHED)
-            return
+            return False
 
+        return True
+
+    async def _handle_dns_query(self, query_bytes: bytes, valid_client_ipv4: ipaddress.IPv4Address) -> None:
         try:
-            await self._handle_dns_query(valid_client_ipv4)
+            await self._handle_dns_query_with_semaphore_acquired(query_bytes, valid_client_ipv4)
         finally:
             self._max_simultaneous_queries_semaphore.release()
 
-    @DI_NS.inject_dependencies("configuration")
-    async def _handle_dns_query(self, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration) -> None:
+    @DI_NS.inject_dependencies("configuration", "logger")
+    async def _handle_dns_query_with_semaphore_acquired(self, query_bytes: bytes, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration, logger: Logger) -> None:
         try:
-            query_bytes = await asyncio.wait_for(self._receive_query_via_tcp(), timeout=configuration.dns.tcp_communication_with_client_timeout)
-        except asyncio.TimeoutError:
-            return
+            response_bytes = await DNSQueryHandler(self._query_handler_shared_state).handle_query(received_query=DNSReceivedQuery(query_bytes), valid_client_ipv4=valid_client_ipv4, over_tcp=True)
+            if response_bytes is None:
+                return
 
-        if query_bytes is None:
-            return
-
-        response_bytes = await DNSQueryHandler().handle_query(query_bytes=query_bytes, valid_client_ipv4=valid_client_ipv4, over_tcp=True)
-        if response_bytes is None:
-            return
-
-        try:
-            await asyncio.wait_for(self._send_response_via_tcp(response_bytes), timeout=configuration.dns.tcp_communication_with_client_timeout)
-        except asyncio.TimeoutError:
+            try:
+                await asyncio.wait_for(self._send_response_via_tcp(response_bytes), timeout=configuration.dns.tcp_communication_with_client_timeout)
+            except asyncio.TimeoutError:
+                self._writer.close()  # A client which does not read its responses is disconnected
+        except asyncio.CancelledError:
             pass
+        except Exception as e:
+            # Since the queries are handled in separate tasks, their unexpected exceptions are logged here
+            logger.warning(f"An unexpected exception occurred while handling a TCP DNS client --> {e.__class__.__name__}: {str(e)}", LogFacilities.DNS_CLIENT_UNEXPECTED_EXCEPTION)
 
-    async def _receive_query_via_tcp(self) -> Optional[bytes]:
-        try:
-            length_bytes = await self._reader.readexactly(2)
-        except (OSError, EOFError):
-            return None
+    @DI_NS.inject_dependencies("configuration")
+    async def _receive_query_via_tcp(self, in_flight_query_tasks: set[asyncio.Task], configuration: Configuration) -> Optional[bytes]:
+        # The connection is closed once it has been idle (= no query has been received from the client or resolved for
+        #  it) for the configured time.
+        while True:
+            try:
+                length_bytes = await asyncio.wait_for(self._reader.readexactly(2), timeout=configuration.dns.tcp_idle_timeout)
+            except asyncio.TimeoutError:
+                if len(in_flight_query_tasks) == 0:
+                    return None
+                continue  # 'readexactly()' does not consume any data if it is cancelled before it returns
+            except (OSError, EOFError):
+                return None
+            break
 
         length = int.from_bytes(length_bytes, byteorder="big", signed=False)
         if length == 0:
             return None
 
         try:
-            return await self._reader.readexactly(length)
-        except (OSError, EOFError):
+            return await asyncio.wait_for(self._reader.readexactly(length), timeout=configuration.dns.tcp_communication_with_client_timeout)
+        except (asyncio.TimeoutError, OSError, EOFError):
             return None
 
     async def _send_response_via_tcp(self, response_bytes: bytes) -> None:
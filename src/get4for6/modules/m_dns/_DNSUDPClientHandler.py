@@ -24,56 +24,55 @@ from typing import Final
 import ipaddress
 import asyncio
 import threading
-from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
-from get4for6.helpers.IPHelpers import IPHelpers
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
 from get4for6.modules.m_dns._dns_qh.DNSQueryHandler import DNSQueryHandler  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState  # noqa
+from get4for6.modules.m_dns._dns_qh.DNSReceivedQuery import DNSReceivedQuery  # noqa
 
 
 class _DNSUDPClientHandler:
-    def __init__(self, transport: asyncio.DatagramTransport, data: bytes, addr: tuple[str, int], max_simultaneous_queries_semaphore: threading.BoundedSemaphore):
+    """
+    Unlike the TCP client handler, a single instance of this class is used to handle many clients, one at a time.
+    """
+
+    def __init__(self, transport: asyncio.DatagramTransport, max_simultaneous_queries_semaphore: threading.BoundedSemaphore, query_handler_shared_state: DNSQueryHandlerSharedState):
         self._transport: Final[asyncio.DatagramTransport] = transport
-        self._data: Final[bytes] = data
-        self._addr: Final[tuple[str, int]] = addr
         self._max_simultaneous_queries_semaphore: Final[threading.BoundedSemaphore] = max_simultaneous_queries_semaphore
+        self._query_handler_shared_state: Final[DNSQueryHandlerSharedState] = query_handler_shared_state
 
     @DI_NS.inject_dependencies("logger")
-    async def handle_client(self, logger: Logger) -> None:
+    async def handle_client(self, received_query: DNSReceivedQuery, addr: tuple[str, int], valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> None:
+        """
+        CONTEXT: 'valid_client_ipv4' has been obtained from 'addr' and validated by '_DNSDatagramProtocol'.
+        """
+
         try:
-            await self._handle_client()
+            await self._handle_client_with_valid_ipv4(received_query, addr, valid_client_ipv4)
         except asyncio.CancelledError:
-            pass
+            raise  # The client handler is cancelled only if the worker which is running it is being cancelled
         except Exception as e:
             logger.warning(f"An unexpected exception occurred while handling a UDP DNS client --> {e.__class__.__name__}: {str(e)}", LogFacilities.DNS_CLIENT_UNEXPECTED_EXCEPTION)
 
-    @DI_NS.inject_dependencies("configuration", "logger")
-    async def _handle_client(self, configuration: Configuration, logger: Logger) -> None:
-        # Validate the client's IPv4 address before spending time and resources carrying out the query
-        valid_client_ipv4 = IPHelpers.parse_client_ipv4_from_string_and_validate_it(self._addr[0], configuration)
-        if valid_client_ipv4 is None:
-            logger.debug(f"{repr(self._addr[0])} is not a valid client IPv4 address!", LogFacilities.DNS_CLIENT_INVALID_IP)
-            return
-
-        # If the client's IPv4 is valid, proceed further
-        await self._handle_client_with_valid_ipv4(valid_client_ipv4)
-
-    @DI_NS.inject_dependencies("logger")
-    async def _handle_client_with_valid_ipv4(self, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> None:
+    @DI_NS.inject_dependencies("logger", "metrics_registry")
+    async def _handle_client_with_valid_ipv4(self, received_query: DNSReceivedQuery, addr: tuple[str, int], valid_client_ipv4: ipaddress.IPv4Address, logger: Logger, metrics_registry: MetricsRegistry) -> None:
         if not self._max_simultaneous_queries_semaphore.acquire(blocking=False, timeout=None):
             # If it is not possible to serve the client due to the max simultaneous query limit being reached, disconnect the client
+            metrics_registry.increment_counter(MetricNames.LIMIT_REJECTIONS, ("dns_simultaneous_queries",))
             logger.debug("It is currently not possible to answer DNS queries, as the maximum simultaneous query limit has been reached!", LogFacilities.DNS_CLIENT_LIMIT_REACHED)
             return
 
         try:
-            await self._handle_dns_query(valid_client_ipv4)
+            await self._handle_dns_query(received_query, addr, valid_client_ipv4)
         finally:
             self._max_simultaneous_queries_semaphore.release()
 
-    async def _handle_dns_query(self, valid_client_ipv4: ipaddress.IPv4Address) -> None:
-        response_bytes = await DNSQueryHandler().handle_query(query_bytes=self._data, valid_client_ipv4=valid_client_ipv4, over_tcp=False)
+    async def _handle_dns_query(self, received_query: DNSReceivedQuery, addr: tuple[str, int], valid_client_ipv4: ipaddress.IPv4Address) -> None:
+        response_bytes = await DNSQueryHandler(self._query_handler_shared_state).handle_query(received_query=received_query, valid_client_ipv4=valid_client_ipv4, over_tcp=False)
         if response_bytes is None:
             return
 
-        self._transport.sendto(response_bytes, self._addr)  # Does not raise, 'error_received' on the protocol object is called instead
+        self._transport.sendto(response_bytes, addr)  # Does not raise, 'error_received' on the protocol object is called instead
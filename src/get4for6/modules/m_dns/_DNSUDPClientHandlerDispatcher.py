@@ -23,36 +23,41 @@
 from typing import Final
 import asyncio
 import threading
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
 from get4for6.modules.m_dns._DNSDatagramProtocol import _DNSDatagramProtocol
 from get4for6.modules.m_dns._DNSUDPClientHandler import _DNSUDPClientHandler
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState  # noqa
 
 
 class _DNSUDPClientHandlerDispatcher:
-    def __init__(self, transport: asyncio.DatagramTransport, protocol: _DNSDatagramProtocol, max_simultaneous_queries_semaphore: threading.BoundedSemaphore):
-        self._transport: Final[asyncio.DatagramTransport] = transport
+    """
+    Queries received over UDP, which cannot be answered right away by '_DNSDatagramProtocol', are handled by a fixed
+     pool of long-lived worker coroutines, so that a new task does not have to be created for each of them.
+    """
+
+    @DI_NS.inject_dependencies("configuration")
+    def __init__(self, transport: asyncio.DatagramTransport, protocol: _DNSDatagramProtocol, max_simultaneous_queries_semaphore: threading.BoundedSemaphore, query_handler_shared_state: DNSQueryHandlerSharedState, configuration: Configuration):
         self._protocol: Final[_DNSDatagramProtocol] = protocol
-        self._max_simultaneous_queries_semaphore: Final[threading.BoundedSemaphore] = max_simultaneous_queries_semaphore
-        self._currently_running_client_handlers: Final[set[asyncio.Task]] = set()
+        self._client_handler: Final[_DNSUDPClientHandler] = _DNSUDPClientHandler(transport, max_simultaneous_queries_semaphore, query_handler_shared_state)
+
+        # Since each worker resolves one query at a time, there is no point in having more of them than the number of
+        #  queries which may be resolved simultaneously.
+        self._worker_count: Final[int] = configuration.dns.max_simultaneous_queries
 
     async def run(self) -> None:
+        workers = [asyncio.create_task(self._run_worker()) for _ in range(self._worker_count)]
         try:
-            await self._run()
+            await asyncio.gather(*workers)
         except asyncio.CancelledError:
             pass
         finally:
-            self._cancel_currently_running_client_handlers()
+            for worker in workers:
+                worker.cancel()
 
-    def _cancel_currently_running_client_handlers(self) -> None:
-        # The set is copied, as it might get changed by done callbacks while cancelling the tasks
-        for client_handler in self._currently_running_client_handlers.copy():
-            client_handler.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-    async def _run(self) -> None:
+    async def _run_worker(self) -> None:
         while True:
-            data, addr = await self._protocol.wait_for_query_to_be_received()
-
-            # Client handlers are essentially fire-and-forget tasks, which, however, get canceled if this dispatcher
-            #  gets canceled
-            new_client_handler = asyncio.create_task(_DNSUDPClientHandler(self._transport, data, addr, self._max_simultaneous_queries_semaphore).handle_client())
-            self._currently_running_client_handlers.add(new_client_handler)
-            new_client_handler.add_done_callback(self._currently_running_client_handlers.remove)
+            received_query, addr, valid_client_ipv4 = await self._protocol.wait_for_query_to_be_received()
+            await self._client_handler.handle_client(received_query, addr, valid_client_ipv4)
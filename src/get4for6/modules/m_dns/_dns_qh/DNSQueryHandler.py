@@ -20,7 +20,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Optional
+from typing import Final, Optional
 import ipaddress
 import dns.message
 import dns.rdataclass
@@ -29,26 +29,48 @@ import dns.opcode
 import dns.rcode
 import dns.exception
 import dns.flags
+from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState
+from get4for6.modules.m_dns._dns_qh.DNSReceivedQuery import DNSReceivedQuery
 from get4for6.modules.m_dns._dns_qh._DNSResolutionFailureInternalExc import _DNSResolutionFailureInternalExc
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+from get4for6.modules.m_dns._dns_qh._DNSWireHelpers import _DNSWireHelpers
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamQuerier import _DNSUpstreamQuerier
 from get4for6.modules.m_dns._dns_qh._DNSForwardQueryResolver import _DNSForwardQueryResolver
 from get4for6.modules.m_dns._dns_qh._DNSReverseQueryResolver import _DNSReverseQueryResolver
 
 
 class DNSQueryHandler:
+    _MAX_UDP_RESPONSE_SIZE_WITHOUT_EDNS: Final[int] = 512  # RFC 1035, section 2.3.4
+
+    def __init__(self, shared_state: DNSQueryHandlerSharedState):
+        self._shared_state: Final[DNSQueryHandlerSharedState] = shared_state
+
     @DI_NS.inject_dependencies("logger")
-    async def handle_query(self, query_bytes: bytes, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, logger: Logger) -> Optional[bytes]:
+    async def handle_query(self, received_query: DNSReceivedQuery, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, logger: Logger) -> Optional[bytes]:
         try:
-            return await self._handle_query(query_bytes, valid_client_ipv4, over_tcp)
+            response_bytes = await self._handle_query(received_query, valid_client_ipv4, over_tcp)
         except dns.exception.DNSException as e:
             logger.warning(f"An unexpected DNS exception occurred while handling a DNS query from {valid_client_ipv4} --> {e.__class__.__name__}: {str(e)}", LogFacilities.DNS_CLIENT_UNEXPECTED_DNS_EXCEPTION)
             return None
 
+        return self._truncate_response_if_necessary(received_query, response_bytes, over_tcp)
+
     @DI_NS.inject_dependencies("logger")
-    async def _handle_query(self, query_bytes: bytes, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, logger: Logger) -> Optional[bytes]:
-        query_msg = self._parse_and_validate_query(query_bytes)
+    async def _handle_query(self, received_query: DNSReceivedQuery, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, logger: Logger) -> Optional[bytes]:
+        # Most queries (e.g. for AAAA, MX, TXT or HTTPS records) do not need any translation, so they are forwarded to
+        #  an upstream server, and their responses back to the client, without being parsed and re-serialized using
+        #  'dnspython'.
+        wire_query = received_query.get_wire_query()
+        if (wire_query is not None) and self._can_query_be_passed_through(wire_query):
+            return await self._handle_pass_through_query(received_query, wire_query, valid_client_ipv4, over_tcp)
+
+        query_msg = received_query.get_query_msg()
         if query_msg is None:
             logger.debug(f"An invalid DNS message has been received from {valid_client_ipv4}!", LogFacilities.DNS_CLIENT_INVALID_MESSAGE)
             return None
@@ -58,32 +80,123 @@ class DNSQueryHandler:
         except _DNSResolutionFailureInternalExc:
             response_msg = self._make_error_response(query_msg)
 
-        self._make_adjustments_to_response_before_sending_it(response_msg)
-        self._log_debug_message_about_query_and_response(query_msg, response_msg, valid_client_ipv4)
+        return self._finish_response(query_msg, response_msg, valid_client_ipv4)
 
-        return response_msg.to_wire()
+    @DI_NS.inject_dependencies("logger")
+    def handle_query_without_io(self, received_query: DNSReceivedQuery, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, logger: Logger) -> Optional[bytes]:
+        """
+        Attempts to answer the query from the auxiliary zone or from the caches, i.e. without performing any I/O, so
+         that the query can be answered synchronously, without the overhead of scheduling a task for it. Returns None if
+         this is not possible; in such case, the query must be handled using 'handle_query()'.
+        """
 
-    def _parse_and_validate_query(self, query_bytes: bytes) -> Optional[dns.message.Message]:
         try:
-            query_msg = dns.message.from_wire(query_bytes)
-        except dns.exception.DNSException:
+            response_bytes = self._handle_query_without_io(received_query, valid_client_ipv4, over_tcp)
+        except dns.exception.DNSException as e:
+            logger.warning(f"An unexpected DNS exception occurred while handling a DNS query from {valid_client_ipv4} --> {e.__class__.__name__}: {str(e)}", LogFacilities.DNS_CLIENT_UNEXPECTED_DNS_EXCEPTION)
+            return None
+
+        return self._truncate_response_if_necessary(received_query, response_bytes, over_tcp)
+
+    def _handle_query_without_io(self, received_query: DNSReceivedQuery, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> Optional[bytes]:
+        # Invalid queries are left to 'handle_query()', so that they are dealt with in the usual way.
+        wire_query = received_query.get_wire_query()
+        if wire_query is None:
+            return None
+
+        if self._can_query_be_passed_through(wire_query):
+            response_bytes = _DNSUpstreamQuerier(self._shared_state).get_cached_upstream_wire_response(wire_query, over_tcp)
+            if response_bytes is None:
+                return None
+
+            response_bytes = self._make_adjustments_to_wire_response_before_sending_it(response_bytes)
+            self._count_answered_pass_through_query(wire_query, response_bytes)
+            self._log_debug_message_about_pass_through_query_and_response(wire_query, response_bytes, valid_client_ipv4)
+
+            return response_bytes
+
+        # Apart from auxiliary names, only 'A' queries can be answered without I/O, so other messages are not parsed
+        auxiliary_zone = self._shared_state.get_auxiliary_zone()
+        if (wire_query.qtype != dns.rdatatype.A) and ((auxiliary_zone is None) or (not auxiliary_zone.contains_name(wire_query.qname))):
+            return None
+
+        query_msg = received_query.get_query_msg()
+        if query_msg is None:
+            return None
+
+        question = query_msg.question[0]
+        if (query_msg.opcode() != dns.opcode.QUERY) or (question.rdclass != dns.rdataclass.IN) or (question.rdtype in (dns.rdatatype.ANY, dns.rdatatype.PTR)):
+            return None  # These queries are not answered by '_DNSForwardQueryResolver' (see '_resolve_dns_query()')
+
+        try:
+            response_msg = _DNSForwardQueryResolver(self._shared_state).resolve_forward_query_without_io(query_msg, valid_client_ipv4, over_tcp)
+        except _DNSResolutionFailureInternalExc:
+            response_msg = self._make_error_response(query_msg)
+
+        if response_msg is None:
             return None
 
+        return self._finish_response(query_msg, response_msg, valid_client_ipv4)
+
+    def _can_query_be_passed_through(self, wire_query: _DNSWireQuery) -> bool:
+        # Queries which are (or might be) invalid, or which would not be answered successfully anyway, are processed in
+        #  the usual way.
         if (
-            (dns.flags.QR in query_msg.flags) or
-            (dns.flags.AA in query_msg.flags) or
-            (dns.flags.TC in query_msg.flags) or
-            (dns.flags.RA in query_msg.flags) or
-            (query_msg.rcode() != 0) or
-            (len(query_msg.question) != 1) or
-            (len(query_msg.answer) != 0) or
-            (len(query_msg.authority) != 0) or
-            (len(query_msg.additional) != 0) or  # dnspython "removes" the EDNS0 'OPT' record from this section, and handles it in a different way
-            query_msg.xfr
+            (wire_query.flags & (dns.flags.QR | dns.flags.AA | dns.flags.TC | dns.flags.RA)) or
+            (not (wire_query.flags & dns.flags.RD)) or
+            (dns.opcode.from_flags(wire_query.flags) != dns.opcode.QUERY) or
+            (dns.rcode.from_flags(wire_query.flags, 0) != dns.rcode.NOERROR) or
+            (wire_query.qclass != dns.rdataclass.IN) or
+            dns.rdatatype.is_metatype(wire_query.qtype)  # ANY, AXFR, IXFR, OPT, ...
         ):
-            return None
+            return False
 
-        return query_msg
+        # Queries for A and PTR records might need to be translated
+        if wire_query.qtype in (dns.rdatatype.A, dns.rdatatype.PTR):
+            return False
+
+        # Queries for auxiliary names are answered by the translator itself
+        auxiliary_zone = self._shared_state.get_auxiliary_zone()
+        if (auxiliary_zone is not None) and auxiliary_zone.contains_name(wire_query.qname):
+            return False
+
+        return True
+
+    async def _handle_pass_through_query(self, received_query: DNSReceivedQuery, wire_query: _DNSWireQuery, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> Optional[bytes]:
+        try:
+            response_bytes = await _DNSUpstreamQuerier(self._shared_state).perform_upstream_wire_query(wire_query, over_tcp)
+        except _DNSResolutionFailureInternalExc:
+            # Since resolution failures should be rare, the error response is generated in the usual way.
+            query_msg = received_query.get_query_msg()
+            if query_msg is None:
+                return None  # The query would have been considered invalid if it had not been passed through
+
+            return self._finish_response(query_msg, self._make_error_response(query_msg), valid_client_ipv4)
+
+        response_bytes = self._make_adjustments_to_wire_response_before_sending_it(response_bytes)
+        self._count_answered_pass_through_query(wire_query, response_bytes)
+        self._log_debug_message_about_pass_through_query_and_response(wire_query, response_bytes, valid_client_ipv4)
+
+        return response_bytes
+
+    def _finish_response(self, query_msg: dns.message.Message, response_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address) -> bytes:
+        self._make_adjustments_to_response_before_sending_it(response_msg)
+        self._count_answered_query(query_msg.question[0].rdtype, response_msg.rcode())
+        self._log_debug_message_about_query_and_response(query_msg, response_msg, valid_client_ipv4)
+
+        return response_msg.to_wire()
+
+    def _count_answered_pass_through_query(self, wire_query: _DNSWireQuery, response_bytes: bytes) -> None:
+        self._count_answered_query(wire_query.qtype, dns.rcode.from_flags(_DNSWireHelpers.get_flags(response_bytes), 0))
+
+    @DI_NS.inject_dependencies("metrics_registry")
+    def _count_answered_query(self, qtype: int, rcode: int, metrics_registry: MetricsRegistry) -> None:
+        try:
+            rcode_str = dns.rcode.to_text(rcode)
+        except ValueError:
+            rcode_str = str(rcode)
+
+        metrics_registry.increment_counter(MetricNames.DNS_QUERIES, (dns.rdatatype.to_text(qtype), rcode_str))
 
     async def _resolve_dns_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> dns.message.Message:
         if query_msg.opcode() != dns.opcode.QUERY:
@@ -100,9 +213,9 @@ class DNSQueryHandler:
             raise _DNSResolutionFailureInternalExc()
 
         if question.rdtype == dns.rdatatype.PTR:
-            return await _DNSReverseQueryResolver().resolve_reverse_query(query_msg, valid_client_ipv4, over_tcp)
+            return await _DNSReverseQueryResolver(self._shared_state).resolve_reverse_query(query_msg, valid_client_ipv4, over_tcp)
 
-        return await _DNSForwardQueryResolver().resolve_forward_query(query_msg, valid_client_ipv4, over_tcp)
+        return await _DNSForwardQueryResolver(self._shared_state).resolve_forward_query(query_msg, valid_client_ipv4, over_tcp)
 
     def _make_error_response(self, query_msg: dns.message.Message) -> dns.message.Message:
         response_msg = dns.message.make_response(query_msg, recursion_available=True)
@@ -110,12 +223,52 @@ class DNSQueryHandler:
 
         return response_msg
 
-    def _make_adjustments_to_response_before_sending_it(self, response_msg: dns.message.Message) -> None:
+    @DI_NS.inject_dependencies("configuration")
+    def _make_adjustments_to_response_before_sending_it(self, response_msg: dns.message.Message, configuration: Configuration) -> None:
         # The translator does not perform DNSSEC validation, it communicates with its upstream servers using an
         #  insecure transport, and makes changes to the DNS responses when it performs translation. Therefore, the
         #  response cannot be considered authentic.
         response_msg.flags &= (~dns.flags.AD)
 
+        # The UDP payload size advertised to the client is this translator's own, not the upstream server's one.
+        if response_msg.edns >= 0:
+            response_msg.use_edns(edns=response_msg.edns, ednsflags=response_msg.ednsflags, payload=configuration.dns.edns_udp_payload_size, options=response_msg.options)
+
+    @DI_NS.inject_dependencies("configuration")
+    def _make_adjustments_to_wire_response_before_sending_it(self, response_bytes: bytes, configuration: Configuration) -> bytes:
+        # The same adjustments as in '_make_adjustments_to_response_before_sending_it()' are made.
+        response_bytes = _DNSWireHelpers.clear_flags(response_bytes, dns.flags.AD)
+
+        return _DNSWireHelpers.replace_edns_payload_size(response_bytes, configuration.dns.edns_udp_payload_size)
+
+    @DI_NS.inject_dependencies("configuration")
+    def _truncate_response_if_necessary(self, received_query: DNSReceivedQuery, response_bytes: Optional[bytes], over_tcp: bool, configuration: Configuration) -> Optional[bytes]:
+        # Responses which do not fit into the client's UDP buffer would be dropped by it (or get fragmented) - they are
+        #  truncated instead, so that the client cheaply retries the query over TCP.
+        if over_tcp or (response_bytes is None):
+            return response_bytes
+
+        max_response_size = self.__class__._MAX_UDP_RESPONSE_SIZE_WITHOUT_EDNS
+        wire_query = received_query.get_wire_query()
+        if (wire_query is not None) and (wire_query.edns >= 0):
+            max_response_size = min(max(wire_query.payload, max_response_size), configuration.dns.edns_udp_payload_size)
+
+        return _DNSWireHelpers.truncate_response(response_bytes, max_response_size)
+
+    @DI_NS.inject_dependencies("logger")
+    def _log_debug_message_about_pass_through_query_and_response(self, wire_query: _DNSWireQuery, response_bytes: bytes, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> None:
+        # The messages are parsed only if the debug message is actually going to be logged.
+        if not (logger.is_debug_enabled_for(LogFacilities.DNS_QUERY_SUCCESS) or logger.is_debug_enabled_for(LogFacilities.DNS_QUERY_ERROR)):
+            return
+
+        try:
+            query_msg = dns.message.from_wire(wire_query.wire)
+            response_msg = dns.message.from_wire(response_bytes)
+        except dns.exception.DNSException:
+            return
+
+        self._log_debug_message_about_query_and_response(query_msg, response_msg, valid_client_ipv4)
+
     @DI_NS.inject_dependencies("logger")
     def _log_debug_message_about_query_and_response(self, query_msg: dns.message.Message, response_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> None:
         question_repr = repr(query_msg.question)
@@ -0,0 +1,145 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Any, Callable
+import asyncio
+import dns.name
+from get4for6.config.Configuration import Configuration
+from get4for6.config.IPPortPair import IPPortPair
+from get4for6.config.UpstreamServerGroup import UpstreamServerGroup
+from get4for6.di import DI_NS
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
+from get4for6.caches.CacheRegistry import CacheRegistry
+from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamServerGroupTrie import _DNSUpstreamServerGroupTrie
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamSocketPool import _DNSUpstreamSocketPool
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamResponseCache import _DNSUpstreamResponseCache
+from get4for6.modules.m_dns._dns_qh._DNSSynthesizedAnswerCache import _DNSSynthesizedAnswerCache
+from get4for6.modules.m_dns._dns_qh._DNSReverseNameCache import _DNSReverseNameCache
+from get4for6.modules.m_dns._dns_qh._DNSAuxiliaryZone import _DNSAuxiliaryZone
+from get4for6.modules.m_dns._dns_qh._DNSClientRateLimiter import _DNSClientRateLimiter
+
+
+class DNSQueryHandlerSharedState:
+    """
+    Holds the state which is shared among all the queries handled by a DNS module instance, i.e. which must outlive
+     individual 'DNSQueryHandler' instances.
+    """
+
+    @DI_NS.inject_dependencies("configuration", "metrics_registry", "cache_registry", "substitute_address_mapper")
+    def __init__(self, configuration: Configuration, metrics_registry: MetricsRegistry, cache_registry: CacheRegistry, substitute_address_mapper: SubstituteAddressMapper):
+        # In DNS worker processes, the mapper is stood in for by an IPC client, whose mapping operations involve I/O
+        self._substitute_address_mapping_possible_without_io: Final[bool] = isinstance(substitute_address_mapper, SubstituteAddressMapper)
+
+        self._upstream_server_group_trie: Final[_DNSUpstreamServerGroupTrie] = _DNSUpstreamServerGroupTrie()
+        self._upstream_socket_pools: Final[dict[IPPortPair, _DNSUpstreamSocketPool]] = dict()
+        for ip_port_pair in (configuration.dns.upstream_servers + tuple(ip_port_pair for group in configuration.dns.conditional_forwarding for ip_port_pair in group.upstream_servers)):
+            if ip_port_pair not in self._upstream_socket_pools:  # The same server may be a member of multiple groups
+                self._upstream_socket_pools[ip_port_pair] = _DNSUpstreamSocketPool(ip_port_pair)
+        self._upstream_response_cache: Final[Optional[_DNSUpstreamResponseCache]] = (
+            _DNSUpstreamResponseCache(configuration.dns.upstream_response_cache) if (configuration.dns.upstream_response_cache is not None) else None
+        )
+        self._synthesized_answer_cache: Final[_DNSSynthesizedAnswerCache] = _DNSSynthesizedAnswerCache(configuration.dns.synthesized_answer_cache_max_entries)
+        self._reverse_name_cache: Final[_DNSReverseNameCache] = _DNSReverseNameCache(configuration.dns.reverse_name_cache_max_entries)
+        self._auxiliary_zone: Final[Optional[_DNSAuxiliaryZone]] = (
+            _DNSAuxiliaryZone(configuration.dns.auxiliary_names) if (configuration.dns.auxiliary_names is not None) else None
+        )
+        # The new substitute address assignments requested by DNS worker processes are rate-limited by the main
+        #  process's rate limiter (see '_SubstituteAddressMapperIPCServer'), so that the limit is shared by all the
+        #  processes; the query limit, on the other hand, applies to each process separately.
+        self._client_rate_limiter: Final[Optional[_DNSClientRateLimiter]] = (
+            _DNSClientRateLimiter(configuration.dns.client_rate_limiting, limit_new_substitute_addr_assignments=self._substitute_address_mapping_possible_without_io) if (configuration.dns.client_rate_limiting is not None) else None
+        )
+        self._in_flight_upstream_queries: Final[dict[Any, asyncio.Task[bytes]]] = dict()
+
+        metrics_registry.register_gauge(
+            MetricNames.DNS_UPSTREAM_POOL_SOCKETS, "UDP sockets in the upstream servers' socket pools.", ("server",),
+            lambda: self._collect_upstream_socket_pool_values(_DNSUpstreamSocketPool.get_socket_count)
+        )
+        metrics_registry.register_gauge(
+            MetricNames.DNS_UPSTREAM_POOL_PENDING_QUERIES, "Queries waiting for a response on the upstream servers' pooled sockets.", ("server",),
+            lambda: self._collect_upstream_socket_pool_values(_DNSUpstreamSocketPool.get_pending_query_count)
+        )
+
+        if self._upstream_response_cache is not None:
+            cache_registry.register_cache("dns_upstream_responses", self._upstream_response_cache.get_entry_count, self._upstream_response_cache.clear)
+        cache_registry.register_cache("dns_synthesized_answers", self._synthesized_answer_cache.get_entry_count, self._synthesized_answer_cache.clear)
+        cache_registry.register_cache("dns_reverse_names", self._reverse_name_cache.get_entry_count, self._reverse_name_cache.clear)
+
+    def get_upstream_server_group(self, qname: dns.name.Name) -> UpstreamServerGroup:
+        """
+        Returns the conditional forwarding group of the longest domain which 'qname' belongs to, or the default group
+         made of the global upstream server options if there is no such group.
+        """
+
+        return self._upstream_server_group_trie.get_upstream_server_group(qname)
+
+    def get_upstream_socket_pool(self, ip_port_pair: IPPortPair) -> _DNSUpstreamSocketPool:
+        return self._upstream_socket_pools[ip_port_pair]
+
+    def get_upstream_response_cache(self) -> Optional[_DNSUpstreamResponseCache]:
+        """
+        Returns None if the upstream response cache is not enabled.
+        """
+
+        return self._upstream_response_cache
+
+    def get_synthesized_answer_cache(self) -> _DNSSynthesizedAnswerCache:
+        return self._synthesized_answer_cache
+
+    def get_reverse_name_cache(self) -> _DNSReverseNameCache:
+        return self._reverse_name_cache
+
+    def get_auxiliary_zone(self) -> Optional[_DNSAuxiliaryZone]:
+        """
+        Returns None if auxiliary names are not enabled.
+        """
+
+        return self._auxiliary_zone
+
+    def get_client_rate_limiter(self) -> Optional[_DNSClientRateLimiter]:
+        """
+        Returns None if client rate limiting is not enabled.
+        """
+
+        return self._client_rate_limiter
+
+    def get_in_flight_upstream_queries(self) -> dict[Any, asyncio.Task[bytes]]:
+        """
+        Maps coalescing keys (see '_DNSUpstreamQuerier') to the tasks performing the corresponding upstream queries.
+        """
+
+        return self._in_flight_upstream_queries
+
+    def is_substitute_address_mapping_possible_without_io(self) -> bool:
+        return self._substitute_address_mapping_possible_without_io
+
+    def _collect_upstream_socket_pool_values(self, get_value: Callable[[_DNSUpstreamSocketPool], int]) -> list[tuple[tuple[str], int]]:
+        return [((f"{ip_port_pair.ip_address}#{ip_port_pair.port}",), get_value(upstream_socket_pool)) for ip_port_pair, upstream_socket_pool in self._upstream_socket_pools.items()]
+
+    def close(self) -> None:
+        for in_flight_upstream_query in self._in_flight_upstream_queries.values():
+            in_flight_upstream_query.cancel()
+
+        for upstream_socket_pool in self._upstream_socket_pools.values():
+            upstream_socket_pool.close()
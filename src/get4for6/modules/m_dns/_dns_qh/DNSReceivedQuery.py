@@ -0,0 +1,85 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import dns.message
+import dns.exception
+import dns.flags
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+from get4for6.modules.m_dns._dns_qh._DNSWireHelpers import _DNSWireHelpers
+
+
+class DNSReceivedQuery:
+    """
+    A DNS query message received from a client. The message is parsed at most once, no matter how many times (and by
+     which parts of 'DNSQueryHandler') it is looked at - this matters mainly for UDP queries which cannot be answered
+     by 'DNSQueryHandler.handle_query_without_io()', and are therefore passed to 'DNSQueryHandler.handle_query()'.
+    """
+
+    def __init__(self, query_bytes: bytes):
+        self._query_bytes: Final[bytes] = query_bytes
+        self._wire_query: Final[Optional[_DNSWireQuery]] = _DNSWireHelpers.parse_query(query_bytes)  # The minimal parse is cheap, and always needed
+        self._query_msg: Optional[dns.message.Message] = None
+        self._query_msg_parsed: bool = False
+
+    def get_query_bytes(self) -> bytes:
+        return self._query_bytes
+
+    def get_wire_query(self) -> Optional[_DNSWireQuery]:
+        """
+        Returns None if the message could not be parsed by '_DNSWireHelpers.parse_query()'.
+        """
+
+        return self._wire_query
+
+    def get_query_msg(self) -> Optional[dns.message.Message]:
+        """
+        Returns None if the message is not a valid DNS query.
+        """
+
+        if not self._query_msg_parsed:
+            self._query_msg = self._parse_and_validate_query()
+            self._query_msg_parsed = True
+
+        return self._query_msg
+
+    def _parse_and_validate_query(self) -> Optional[dns.message.Message]:
+        try:
+            query_msg = dns.message.from_wire(self._query_bytes)
+        except dns.exception.DNSException:
+            return None
+
+        if (
+            (dns.flags.QR in query_msg.flags) or
+            (dns.flags.AA in query_msg.flags) or
+            (dns.flags.TC in query_msg.flags) or
+            (dns.flags.RA in query_msg.flags) or
+            (query_msg.rcode() != 0) or
+            (len(query_msg.question) != 1) or
+            (len(query_msg.answer) != 0) or
+            (len(query_msg.authority) != 0) or
+            (len(query_msg.additional) != 0) or  # dnspython "removes" the EDNS0 'OPT' record from this section, and handles it in a different way
+            query_msg.xfr
+        ):
+            return None
+
+        return query_msg
@@ -25,56 +25,45 @@ import ipaddress
 import dns.message
 import dns.name
 import dns.flags
-import dns.rdata
 import dns.rrset
 import dns.rcode
 import dns.rdataclass
 import dns.rdatatype
-import dns.rdtypes.ANY.SOA
-import dns.rdtypes.ANY.NS
 import dns.rdtypes.IN.A
 import dns.rdtypes.IN.AAAA
-from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
 from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
 from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc import SubstituteIPv4AddressNotAllowedExc
 from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import SubstituteAssignmentNotFoundExc
 from get4for6.addr_mapper.substitute.exc.IPv6AddressNotSubstitutableExc import IPv6AddressNotSubstitutableExc
 from get4for6.addr_mapper.substitute.exc.SubstituteAddressSpaceCurrentlyFullExc import SubstituteAddressSpaceCurrentlyFullExc
+from get4for6.modules.m_dns._dns_qh._DNSAuxiliaryZone import _DNSAuxiliaryZone
+from get4for6.modules.m_dns._dns_qh._DNSClientRateLimiter import _DNSClientRateLimiter
 from get4for6.modules.m_dns._dns_qh._DNSResolutionFailureInternalExc import _DNSResolutionFailureInternalExc
 
 
 class _DNSAuxiliaryNameQueryResolver:
-    _4TO6_SUBDOMAIN: Final[str] = "r"
-    _NS_SUBDOMAIN: Final[str] = "ns"
-    _SOA_EMAIL_PART_BEFORE_DOMAIN: Final[str] = "nobody"
-    _SOA_SERIAL: Final[int] = 1
+    def __init__(self, auxiliary_zone: _DNSAuxiliaryZone, client_rate_limiter: Optional[_DNSClientRateLimiter]):
+        self._auxiliary_zone: Final[_DNSAuxiliaryZone] = auxiliary_zone
+        self._client_rate_limiter: Final[Optional[_DNSClientRateLimiter]] = client_rate_limiter
 
-    @DI_NS.inject_dependencies("configuration")
-    def generate_ipv6_ptr_name(self, ipv6_address: ipaddress.IPv6Address, configuration: Configuration) -> dns.name.Name:
-        """
-        CONTEXT: This method is called only if auxiliary names are enabled.
-        """
-
-        return dns.name.from_text(f"{ipv6_address.exploded.replace(':', '-')}.{configuration.dns.auxiliary_names.domain}")
+    def generate_ipv6_ptr_name(self, ipv6_address: ipaddress.IPv6Address) -> dns.name.Name:
+        return self._auxiliary_zone.make_subdomain(ipv6_address.exploded.replace(":", "-").encode("ascii"))
 
-    @DI_NS.inject_dependencies("configuration")
-    def resolve_auxiliary_name_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration) -> dns.message.Message:
+    async def resolve_auxiliary_name_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address) -> dns.message.Message:
         """
         CONTEXT: 'query_msg' is a valid DNS query message whose 'question' section contains exactly one question with
          rdclass IN, rdtype other than PTR, and qname being equal to the configured-provided auxiliary domain or a
-         subdomain thereof, and whose 'answer', 'authority' and 'additional' sections are empty. This method is called
-         only if auxiliary names are enabled.
+         subdomain thereof, and whose 'answer', 'authority' and 'additional' sections are empty.
         """
 
-        auxiliary_domain = dns.name.from_text(configuration.dns.auxiliary_names.domain)
         question = query_msg.question[0]
 
-        auxiliary_subdomain, extracted_auxiliary_domain = self._safe_name_split(question.name, len(auxiliary_domain.labels))
-        if auxiliary_domain != extracted_auxiliary_domain:
+        auxiliary_subdomain_labels = self._auxiliary_zone.get_subdomain_labels(question.name)
+        if auxiliary_subdomain_labels is None:
             raise _DNSResolutionFailureInternalExc()  # This should never happen
 
-        auxiliary_subdomain_nlabels = len(auxiliary_subdomain.labels)
+        auxiliary_subdomain_nlabels = len(auxiliary_subdomain_labels)
         if auxiliary_subdomain_nlabels == 0:
             # If the queried name has no subdomain, i.e. it is equal to the configured auxiliary domain, respond to SOA
             #  and NS queries with information about the auxiliary name DNS zone, for which is this DNS resolver
@@ -91,20 +80,19 @@ class _DNSAuxiliaryNameQueryResolver:
             #  IPv6 address (whose colons have been replaced with hyphens), which means that the client wants to be
             #  provided with a substitute IPv4 for that address. Since the string "ns" cannot be converted to an IPv6
             #  address, there is no ambiguity.
-            if auxiliary_subdomain.to_text(omit_final_dot=True).lower() == self.__class__._NS_SUBDOMAIN.lower():
+            if self._auxiliary_zone.is_ns_label(auxiliary_subdomain_labels[0]):
                 response_rrset = self._resolve_query_for_ns_ips(question.name, question.rdtype)
             else:
-                response_rrset = self._resolve_6to4_auxiliary_name_query(auxiliary_subdomain, question.name, question.rdtype, valid_client_ipv4)
+                response_rrset = await self._resolve_6to4_auxiliary_name_query(auxiliary_subdomain_labels[0], question.name, question.rdtype, valid_client_ipv4)
         elif auxiliary_subdomain_nlabels == 2:
             # If there are two DNS labels in front of the configured auxiliary domain, check whether the second one
             #  is equal to "r" (= reverse, from the address translator's point of view), which means that the first
             #  label should be considered a substitute IPv4 address (whose dots have been replaced with hyphens), for
             #  which the client wants to get the substituted IPv6 address.
-            ipv4_subdomain, _4to6_subdomain = self._safe_name_split(auxiliary_subdomain, 1)
-            if _4to6_subdomain.to_text(omit_final_dot=True).lower() != self.__class__._4TO6_SUBDOMAIN.lower():
+            if not self._auxiliary_zone.is_4to6_label(auxiliary_subdomain_labels[1]):
                 return self._generate_empty_response_with_soa_record(query_msg, dns.rcode.NXDOMAIN)
 
-            response_rrset = self._resolve_4to6_auxiliary_name_query(ipv4_subdomain, question.name, question.rdtype, valid_client_ipv4)
+            response_rrset = await self._resolve_4to6_auxiliary_name_query(auxiliary_subdomain_labels[0], question.name, question.rdtype, valid_client_ipv4)
         else:
             return self._generate_empty_response_with_soa_record(query_msg, dns.rcode.NXDOMAIN)
 
@@ -120,23 +108,25 @@ class _DNSAuxiliaryNameQueryResolver:
 
         return response_msg
 
-    def _safe_name_split(self, name_to_split: dns.name.Name, depth: int) -> tuple[dns.name.Name, dns.name.Name]:
+    def _decode_address_label(self, label: bytes, replaced_character: str, replacement_character: str) -> str:
         try:
-            return name_to_split.split(depth)
-        except ValueError:
+            return label.decode("ascii").replace(replaced_character, replacement_character)
+        except UnicodeDecodeError:
             raise _DNSResolutionFailureInternalExc()
 
     @DI_NS.inject_dependencies("substitute_address_mapper")
-    def _resolve_4to6_auxiliary_name_query(self, ipv4_subdomain: dns.name.Name, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Optional[dns.rrset.RRset]:
+    async def _resolve_4to6_auxiliary_name_query(self, ipv4_label: bytes, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Optional[dns.rrset.RRset]:
         try:
-            ipv4_address = ipaddress.IPv4Address(ipv4_subdomain.to_text(omit_final_dot=True).replace("-", "."))
+            ipv4_address = ipaddress.IPv4Address(self._decode_address_label(ipv4_label, "-", "."))
         except ValueError:
             raise _DNSResolutionFailureInternalExc()
 
         try:
-            ipv6_address, cache_lifetime = substitute_address_mapper.map_substitute_4to6(ipv4_address, valid_client_ipv4)
+            ipv6_address, cache_lifetime = await substitute_address_mapper.map_substitute_4to6_async(ipv4_address, valid_client_ipv4)
         except (SubstituteAssignmentNotFoundExc, SubstituteIPv4AddressNotAllowedExc):
             raise _DNSResolutionFailureInternalExc()
+        except ConnectionError:  # Raised by the mapper's stand-in in DNS worker processes
+            raise _DNSResolutionFailureInternalExc()
 
         # If the IPv6 address has been successfully acquired, but the client does not ask for it, return None (= send
         #  back an empty NOERROR response)
@@ -154,16 +144,30 @@ class _DNSAuxiliaryNameQueryResolver:
         )
 
     @DI_NS.inject_dependencies("substitute_address_mapper")
-    def _resolve_6to4_auxiliary_name_query(self, ipv6_subdomain: dns.name.Name, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Optional[dns.rrset.RRset]:
+    async def _resolve_6to4_auxiliary_name_query(self, ipv6_label: bytes, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Optional[dns.rrset.RRset]:
         try:
-            ipv6_address = ipaddress.IPv6Address(ipv6_subdomain.to_text(omit_final_dot=True).replace("-", ":"))
+            ipv6_address = ipaddress.IPv6Address(self._decode_address_label(ipv6_label, "-", ":"))
         except ValueError:
             raise _DNSResolutionFailureInternalExc()
 
         try:
-            ipv4_address, cache_lifetime = substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
+            try:
+                ipv4_address, cache_lifetime = await substitute_address_mapper.map_substitute_6to4_async(ipv6_address, valid_client_ipv4, mapping_creation_allowed=(self._client_rate_limiter is None))
+            except SubstituteAssignmentNotFoundExc:
+                # If client rate limiting is enabled, a new assignment is created only if the client has not exceeded
+                #  its limit (an already existing assignment can always be used)
+                if (self._client_rate_limiter is None) or (not self._client_rate_limiter.is_new_substitute_addr_assignment_allowed(valid_client_ipv4)):
+                    raise
+
+                try:
+                    ipv4_address, cache_lifetime = await substitute_address_mapper.map_substitute_6to4_async(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
+                except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
+                    self._client_rate_limiter.cancel_new_substitute_addr_assignment(valid_client_ipv4)
+                    raise
         except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
             raise _DNSResolutionFailureInternalExc()
+        except ConnectionError:
+            raise _DNSResolutionFailureInternalExc()
 
         # If the IPv4 address has been successfully acquired, but the client does not ask for it, return None (= send
         #  back an empty NOERROR response)
@@ -181,67 +185,22 @@ class _DNSAuxiliaryNameQueryResolver:
         )
 
     def _resolve_soa_query(self, question_name: dns.name.Name) -> dns.rrset.RRset:
-        return self._generate_soa_rrset_for_auxiliary_name_zone(question_name)
-
-    @DI_NS.inject_dependencies("configuration")
-    def _resolve_ns_query(self, question_name: dns.name.Name, configuration: Configuration) -> dns.rrset.RRset:
-        return dns.rrset.from_rdata(
-            question_name,
-            0,
-            dns.rdtypes.ANY.NS.NS(
-                rdclass=dns.rdataclass.IN,
-                rdtype=dns.rdatatype.NS,
-                target=dns.name.from_text(f"{self.__class__._NS_SUBDOMAIN}.{configuration.dns.auxiliary_names.domain}")
-            )
-        )
+        return dns.rrset.from_rdata(question_name, 0, self._auxiliary_zone.get_soa_rdata())  # We do not want to deal with negative caching
 
-    @DI_NS.inject_dependencies("configuration")
-    def _resolve_query_for_ns_ips(self, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType, configuration: Configuration) -> Optional[dns.rrset.RRset]:
-        rdata_list = []
-        for ip_address in configuration.dns.auxiliary_names.zone_ns_ips:
-            if (question_rdtype == dns.rdatatype.A) and (ip_address.version == 4):
-                rdata_list.append(dns.rdtypes.IN.A.A(
-                    rdclass=dns.rdataclass.IN,
-                    rdtype=dns.rdatatype.A,
-                    address=str(ip_address)
-                ))
-            elif (question_rdtype == dns.rdatatype.AAAA) and (ip_address.version == 6):
-                rdata_list.append(dns.rdtypes.IN.AAAA.AAAA(
-                    rdclass=dns.rdataclass.IN,
-                    rdtype=dns.rdatatype.AAAA,
-                    address=str(ip_address)
-                ))
+    def _resolve_ns_query(self, question_name: dns.name.Name) -> dns.rrset.RRset:
+        return dns.rrset.from_rdata(question_name, 0, self._auxiliary_zone.get_ns_rdata())
 
+    def _resolve_query_for_ns_ips(self, question_name: dns.name.Name, question_rdtype: dns.rdatatype.RdataType) -> Optional[dns.rrset.RRset]:
+        rdata_list = self._auxiliary_zone.get_ns_ip_rdata_list(question_rdtype)
         if len(rdata_list) == 0:
             return None
 
         return dns.rrset.from_rdata_list(question_name, 0, rdata_list)
 
-    @DI_NS.inject_dependencies("configuration")
-    def _generate_empty_response_with_soa_record(self, query_msg: dns.message.Message, response_rcode: dns.rcode.Rcode, configuration: Configuration) -> dns.message.Message:
-        response_rrset = self._generate_soa_rrset_for_auxiliary_name_zone(dns.name.from_text(configuration.dns.auxiliary_names.domain))
-
+    def _generate_empty_response_with_soa_record(self, query_msg: dns.message.Message, response_rcode: dns.rcode.Rcode) -> dns.message.Message:
         response_msg = dns.message.make_response(query_msg, recursion_available=True)
         response_msg.set_rcode(response_rcode)
         response_msg.flags |= dns.flags.AA
-        response_msg.authority.append(response_rrset)
+        response_msg.authority.append(self._auxiliary_zone.get_authority_soa_rrset())
 
         return response_msg
-
-    @DI_NS.inject_dependencies("configuration")
-    def _generate_soa_rrset_for_auxiliary_name_zone(self, name: dns.name.Name, configuration: Configuration) -> dns.rrset.RRset:
-        return dns.rrset.from_rdata(
-            name,
-            0,  # We do not want to deal with negative caching
-            dns.rdtypes.ANY.SOA.SOA(
-                rdclass=dns.rdataclass.IN,
-                rdtype=dns.rdatatype.SOA,
-                mname=dns.name.from_text(f"{self.__class__._NS_SUBDOMAIN}.{configuration.dns.auxiliary_names.domain}"),
-                rname=dns.name.from_text(f"{self.__class__._SOA_EMAIL_PART_BEFORE_DOMAIN}.{configuration.dns.auxiliary_names.domain}"),
-                serial=self.__class__._SOA_SERIAL,
-                refresh=5,  # Zone transfers are not supported, so the value does not matter
-                retry=3,  # Zone transfers are not supported, so the value does not matter; must be less than REFRESH
-                expire=10,  # Zone transfers are not supported, so the value does not matter; must be bigger than REFRESH + RETRY
-                minimum=0  # We do not want to deal with negative caching
-            )
-        )
@@ -0,0 +1,148 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+import dns.name
+import dns.rdata
+import dns.rrset
+import dns.rdataclass
+import dns.rdatatype
+import dns.rdtypes.ANY.SOA
+import dns.rdtypes.ANY.NS
+import dns.rdtypes.IN.A
+import dns.rdtypes.IN.AAAA
+from get4for6.config.AuxiliaryNamesOptions import AuxiliaryNamesOptions
+
+
+class _DNSAuxiliaryZone:
+    """
+    Holds everything about the auxiliary name DNS zone which can be prepared in advance, so that it does not have to
+     be parsed from the configuration and built from scratch each time a query for an auxiliary name is handled.
+    """
+
+    _NS_LABEL: Final[bytes] = b"ns"
+    _4TO6_LABEL: Final[bytes] = b"r"
+    _SOA_EMAIL_LABEL: Final[bytes] = b"nobody"
+    _SOA_SERIAL: Final[int] = 1
+
+    def __init__(self, auxiliary_names_options: AuxiliaryNamesOptions):
+        self._domain: Final[dns.name.Name] = dns.name.from_text(auxiliary_names_options.domain)
+        self._lowercase_domain_labels: Final[tuple[bytes, ...]] = tuple(label.lower() for label in self._domain.labels)
+        self._ns_name: Final[dns.name.Name] = self.make_subdomain(self.__class__._NS_LABEL)
+
+        self._soa_rdata: Final[dns.rdata.Rdata] = dns.rdtypes.ANY.SOA.SOA(
+            rdclass=dns.rdataclass.IN,
+            rdtype=dns.rdatatype.SOA,
+            mname=self._ns_name,
+            rname=self.make_subdomain(self.__class__._SOA_EMAIL_LABEL),
+            serial=self.__class__._SOA_SERIAL,
+            refresh=5,  # Zone transfers are not supported, so the value does not matter
+            retry=3,  # Zone transfers are not supported, so the value does not matter; must be less than REFRESH
+            expire=10,  # Zone transfers are not supported, so the value does not matter; must be bigger than REFRESH + RETRY
+            minimum=0  # We do not want to deal with negative caching
+        )
+        self._ns_rdata: Final[dns.rdata.Rdata] = dns.rdtypes.ANY.NS.NS(
+            rdclass=dns.rdataclass.IN,
+            rdtype=dns.rdatatype.NS,
+            target=self._ns_name
+        )
+        self._ns_ip_rdata_lists: Final[dict[int, list[dns.rdata.Rdata]]] = self._make_ns_ip_rdata_lists(auxiliary_names_options)
+
+        # RRsets are not modified after they have been put into a response message, so the same one can be put into
+        #  the AUTHORITY section of every empty or NXDOMAIN response.
+        self._authority_soa_rrset: Final[dns.rrset.RRset] = dns.rrset.from_rdata(self._domain, 0, self._soa_rdata)  # We do not want to deal with negative caching
+
+    def make_subdomain(self, label: bytes) -> dns.name.Name:
+        """
+        :raises dns.exception.DNSException: If the resulting name is invalid (e.g. too long).
+        """
+
+        return dns.name.Name((label,) + self._domain.labels)
+
+    @staticmethod
+    def _make_ns_ip_rdata_lists(auxiliary_names_options: AuxiliaryNamesOptions) -> dict[int, list[dns.rdata.Rdata]]:
+        ns_ip_rdata_lists = {dns.rdatatype.A: [], dns.rdatatype.AAAA: []}
+
+        for ip_address in auxiliary_names_options.zone_ns_ips:
+            if isinstance(ip_address, ipaddress.IPv4Address):
+                ns_ip_rdata_lists[dns.rdatatype.A].append(dns.rdtypes.IN.A.A(
+                    rdclass=dns.rdataclass.IN,
+                    rdtype=dns.rdatatype.A,
+                    address=str(ip_address)
+                ))
+            else:
+                ns_ip_rdata_lists[dns.rdatatype.AAAA].append(dns.rdtypes.IN.AAAA.AAAA(
+                    rdclass=dns.rdataclass.IN,
+                    rdtype=dns.rdatatype.AAAA,
+                    address=str(ip_address)
+                ))
+
+        return ns_ip_rdata_lists
+
+    def get_subdomain_labels(self, name: dns.name.Name) -> Optional[tuple[bytes, ...]]:
+        """
+        Returns the labels which precede the auxiliary domain in 'name' (an empty tuple if 'name' is equal to the
+         auxiliary domain), or None if 'name' is not the auxiliary domain or a subdomain thereof.
+        """
+
+        name_labels = name.labels
+        subdomain_label_count = (len(name_labels) - len(self._lowercase_domain_labels))
+        if subdomain_label_count < 0:
+            return None
+
+        for label, domain_label in zip(name_labels[subdomain_label_count:], self._lowercase_domain_labels):
+            if label.lower() != domain_label:
+                return None
+
+        return name_labels[:subdomain_label_count]
+
+    def contains_name(self, name: dns.name.Name) -> bool:
+        return self.get_subdomain_labels(name) is not None
+
+    @classmethod
+    def is_ns_label(cls, label: bytes) -> bool:
+        return label.lower() == cls._NS_LABEL
+
+    @classmethod
+    def is_4to6_label(cls, label: bytes) -> bool:
+        return label.lower() == cls._4TO6_LABEL
+
+    def get_soa_rdata(self) -> dns.rdata.Rdata:
+        return self._soa_rdata
+
+    def get_ns_rdata(self) -> dns.rdata.Rdata:
+        return self._ns_rdata
+
+    def get_ns_ip_rdata_list(self, rdtype: int) -> list[dns.rdata.Rdata]:
+        """
+        The returned list must not be modified. It is empty if 'rdtype' is neither A nor AAAA.
+        """
+
+        return self._ns_ip_rdata_lists.get(rdtype, [])
+
+    def get_authority_soa_rrset(self) -> dns.rrset.RRset:
+        """
+        The returned RRset must not be modified.
+        """
+
+        return self._authority_soa_rrset
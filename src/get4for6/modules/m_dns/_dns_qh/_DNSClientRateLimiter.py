@@ -0,0 +1,76 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+from get4for6.config.ClientRateLimitingOptions import ClientRateLimitingOptions
+from get4for6.etc.KeyedTokenBuckets import KeyedTokenBuckets
+
+
+class _DNSClientRateLimiter:
+    """
+    Limits the rate at which individual clients may send queries, and, separately, the rate at which new substitute
+     address assignments may be created for them, so that a single misbehaving client cannot exhaust the resources of
+     the DNS server or churn through its substitute address space.
+    """
+
+    # If more clients than this are tracked, the buckets of some of them are forgotten (see 'KeyedTokenBuckets'), so
+    #  that the memory usage stays bounded even when a huge number of clients is active.
+    _MAX_TRACKED_CLIENTS: Final[int] = 65536
+
+    def __init__(self, options: ClientRateLimitingOptions, limit_new_substitute_addr_assignments: bool):
+        """
+        If 'limit_new_substitute_addr_assignments' is False, new substitute address assignments are always allowed, as
+         they are limited elsewhere (see 'DNSQueryHandlerSharedState').
+        """
+
+        # The buckets are keyed on the integer value of the client's IPv4 address, which is more compact than the
+        #  address object.
+        self._query_buckets: Final[KeyedTokenBuckets] = KeyedTokenBuckets(
+            tokens_per_second=float(options.queries_per_second),
+            burst=options.query_burst,
+            max_tracked_keys=self.__class__._MAX_TRACKED_CLIENTS
+        )
+        self._new_substitute_addr_assignment_buckets: Final[Optional[KeyedTokenBuckets]] = (KeyedTokenBuckets(
+            tokens_per_second=(options.new_substitute_addr_assignments_per_minute / 60.0),
+            burst=options.new_substitute_addr_assignment_burst,
+            max_tracked_keys=self.__class__._MAX_TRACKED_CLIENTS
+        ) if limit_new_substitute_addr_assignments else None)
+
+    def is_query_allowed(self, valid_client_ipv4: ipaddress.IPv4Address) -> bool:
+        return self._query_buckets.take_token(int(valid_client_ipv4))
+
+    def is_new_substitute_addr_assignment_allowed(self, valid_client_ipv4: ipaddress.IPv4Address) -> bool:
+        if self._new_substitute_addr_assignment_buckets is None:
+            return True
+
+        return self._new_substitute_addr_assignment_buckets.take_token(int(valid_client_ipv4))
+
+    def cancel_new_substitute_addr_assignment(self, valid_client_ipv4: ipaddress.IPv4Address) -> None:
+        """
+        Should be called if a new substitute address assignment, which has been allowed by
+         'is_new_substitute_addr_assignment_allowed()', could not be created after all (e.g. because the substitute
+         address space is currently full), so that it does not count towards the client's limit.
+        """
+
+        if self._new_substitute_addr_assignment_buckets is not None:
+            self._new_substitute_addr_assignment_buckets.return_token(int(valid_client_ipv4))
@@ -20,9 +20,9 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+from typing import Final, Optional, TypeVar, Coroutine, Any
 import ipaddress
 import dns.message
-import dns.name
 import dns.rrset
 import dns.rdataclass
 import dns.rdatatype
@@ -35,51 +35,111 @@ from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAd
 from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import SubstituteAssignmentNotFoundExc
 from get4for6.addr_mapper.substitute.exc.IPv6AddressNotSubstitutableExc import IPv6AddressNotSubstitutableExc
 from get4for6.addr_mapper.substitute.exc.SubstituteAddressSpaceCurrentlyFullExc import SubstituteAddressSpaceCurrentlyFullExc
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState
 from get4for6.modules.m_dns._dns_qh._DNSUpstreamQuerier import _DNSUpstreamQuerier
 from get4for6.modules.m_dns._dns_qh._DNSAuxiliaryNameQueryResolver import _DNSAuxiliaryNameQueryResolver
 from get4for6.modules.m_dns._dns_qh._DNSResolutionFailureInternalExc import _DNSResolutionFailureInternalExc
 
 
+_DNSForwardQueryResolver_RunCoroutineWithoutIO_T = TypeVar("_DNSForwardQueryResolver_RunCoroutineWithoutIO_T")
+
+
 class _DNSForwardQueryResolver:
-    @DI_NS.inject_dependencies("configuration")
-    async def resolve_forward_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, configuration: Configuration) -> dns.message.Message:
+    def __init__(self, shared_state: DNSQueryHandlerSharedState):
+        self._shared_state: Final[DNSQueryHandlerSharedState] = shared_state
+
+    async def resolve_forward_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> dns.message.Message:
         """
         CONTEXT: 'query_msg' is a valid DNS query message whose 'question' section contains exactly one question with
          rdclass IN and rdtype other than PTR, and whose 'answer', 'authority' and 'additional' sections are empty.
         """
 
         question = query_msg.question[0]
-        if configuration.dns.auxiliary_names is not None:
-            auxiliary_domain = dns.name.from_text(configuration.dns.auxiliary_names.domain)
-            if (question.name == auxiliary_domain) or question.name.is_subdomain(auxiliary_domain):
-                return _DNSAuxiliaryNameQueryResolver().resolve_auxiliary_name_query(query_msg, valid_client_ipv4)
+        auxiliary_zone = self._shared_state.get_auxiliary_zone()
+        if (auxiliary_zone is not None) and auxiliary_zone.contains_name(question.name):
+            return await _DNSAuxiliaryNameQueryResolver(auxiliary_zone, self._shared_state.get_client_rate_limiter()).resolve_auxiliary_name_query(query_msg, valid_client_ipv4)
 
         if question.rdtype == dns.rdatatype.A:
             return await self._resolve_ipv4_query(query_msg, valid_client_ipv4, over_tcp)
 
-        return await _DNSUpstreamQuerier().perform_upstream_query(query_msg, over_tcp)
+        return await _DNSUpstreamQuerier(self._shared_state).perform_upstream_query(query_msg, over_tcp)
 
-    async def _resolve_ipv4_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> dns.message.Message:
-        upstream_querier = _DNSUpstreamQuerier()
+    def resolve_forward_query_without_io(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool) -> Optional[dns.message.Message]:
+        """
+        Returns the same response as 'resolve_forward_query()' would if it can be determined without performing any I/O,
+         i.e. from the auxiliary zone or from the caches. Otherwise, None is returned.
+
+        CONTEXT: The same as in the case of 'resolve_forward_query()'.
+
+        :raises _DNSResolutionFailureInternalExc
+        """
+
+        # Answering auxiliary names and reusing synthesized answers involves the substitute address mapper, whose
+        #  operations can be carried out without I/O only in the main process.
+        mapping_possible_without_io = self._shared_state.is_substitute_address_mapping_possible_without_io()
+
+        question = query_msg.question[0]
+        auxiliary_zone = self._shared_state.get_auxiliary_zone()
+        if (auxiliary_zone is not None) and auxiliary_zone.contains_name(question.name):
+            if not mapping_possible_without_io:
+                return None
+
+            return self._run_coroutine_without_io(_DNSAuxiliaryNameQueryResolver(auxiliary_zone, self._shared_state.get_client_rate_limiter()).resolve_auxiliary_name_query(query_msg, valid_client_ipv4))
+
+        if question.rdtype == dns.rdatatype.A:
+            if mapping_possible_without_io:
+                cached_response_msg = self._run_coroutine_without_io(self._make_response_from_synthesized_answer_cache(query_msg, valid_client_ipv4))
+                if cached_response_msg is not None:
+                    return cached_response_msg
+
+            # Only the cached responses which would be sent back without any further processing can be used here (see
+            #  '_resolve_ipv4_query()')
+            response_msg = _DNSUpstreamQuerier(self._shared_state).get_cached_upstream_response(query_msg, over_tcp)
+            if (response_msg is not None) and ((response_msg.rcode() != dns.rcode.NOERROR) or self._does_response_contain_ipv4_rrset(response_msg)):
+                return response_msg
+
+            return None
+
+        return _DNSUpstreamQuerier(self._shared_state).get_cached_upstream_response(query_msg, over_tcp)
+
+    def _run_coroutine_without_io(self, coroutine: Coroutine[Any, Any, _DNSForwardQueryResolver_RunCoroutineWithoutIO_T]) -> _DNSForwardQueryResolver_RunCoroutineWithoutIO_T:
+        # The coroutine methods of the main process's substitute address mapper never suspend, so a coroutine which
+        #  does not perform any other I/O runs to completion the first time it is resumed.
+        try:
+            coroutine.send(None)
+        except StopIteration as e:
+            return e.value
+
+        coroutine.close()
+        raise RuntimeError("A coroutine which was supposed to run without I/O has been suspended!")
+
+    @DI_NS.inject_dependencies("configuration")
+    async def _resolve_ipv4_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, configuration: Configuration) -> dns.message.Message:
+        cached_response_msg = await self._make_response_from_synthesized_answer_cache(query_msg, valid_client_ipv4)
+        if cached_response_msg is not None:
+            return cached_response_msg
+
+        upstream_querier = _DNSUpstreamQuerier(self._shared_state)
 
         # Let an upstream server resolve the client's original query for a record of type A.
         response_msg = await upstream_querier.perform_upstream_query(query_msg, over_tcp)  # This response is to the client's original query, so it can be safely sent back any time.
         if response_msg.rcode() != dns.rcode.NOERROR:
             return response_msg  # NXDOMAIN responses are sent back without any further processing.
 
-        for response_rrset in response_msg.answer:
-            if (response_rrset.rdclass == dns.rdataclass.IN) and (response_rrset.rdtype == dns.rdatatype.A):
-                # If a rrset with rdtype A is found in the ANSWER section, it means that the queried domain name has
-                #  an IPv4 address (= the domain is either IPv4-only or dual-stack) which can be sent back to the
-                #  client who asked for it.
-                return response_msg
+        if self._does_response_contain_ipv4_rrset(response_msg):
+            # If a rrset with rdtype A is found in the ANSWER section, it means that the queried domain name has an IPv4
+            #  address (= the domain is either IPv4-only or dual-stack) which can be sent back to the client who asked
+            #  for it.
+            return response_msg
 
         # Otherwise, query an upstream server for the same name, but now for an AAAA record.
         ipv6_query_msg = dns.message.make_query(
             qname=query_msg.question[0].name,
             rdclass=dns.rdataclass.IN,
             rdtype=dns.rdatatype.AAAA,
-            flags=(dns.flags.RD if (dns.flags.RD in query_msg.flags) else 0)
+            flags=(dns.flags.RD if (dns.flags.RD in query_msg.flags) else 0),
+            use_edns=0,
+            payload=configuration.dns.edns_udp_payload_size
         )
         ipv6_response_msg = await upstream_querier.perform_upstream_query(ipv6_query_msg, over_tcp)
         if ipv6_response_msg.rcode() != dns.rcode.NOERROR:
@@ -95,14 +155,20 @@ class _DNSForwardQueryResolver:
                 break  # 'ipv6_rrset' will contain the correct RRset
         else:
             # If the queried domain name exists, but has neither IPv4 nor IPv6 addresses, return the original empty
-            #  NOERROR response.
+            #  NOERROR response. However, since the client might get a synthesized 'A' answer as soon as the name gets
+            #  an IPv6 address, the response must not be negatively cached for longer than the 'AAAA' response may be.
+            self._limit_negative_caching_ttl_of_response(response_msg, self._get_negative_caching_ttl_of_response(ipv6_response_msg))
             return response_msg
 
         # At this point, it has been confirmed that the domain is IPv6-only, so we acquire substitute IPv4 addresses
         #  for the above obtained IPv6 addresses, and add them into the response message.
-        ipv4_rrset = self._generate_ipv4_rrset_by_substituting_ipv6_rrset(ipv6_rrset, valid_client_ipv4)
+        ipv4_rrset, substitutions = await self._generate_ipv4_rrset_by_substituting_ipv6_rrset(ipv6_rrset, valid_client_ipv4)
         response_msg.answer.append(ipv4_rrset)
 
+        if dns.flags.RD in query_msg.flags:
+            # The cache stores its own copy of the list, so the message can be modified later without affecting it
+            self._shared_state.get_synthesized_answer_cache().store_answer(valid_client_ipv4, query_msg.question[0].name, list(response_msg.answer), substitutions)
+
         # NOERROR messages without an appropriate answer contain a SOA record in their AUTHORITY section, which must
         #  be removed, since the message is being transformed into a NOERROR message *with* an appropriate answer
         #  (IPv4 RRset).
@@ -110,8 +176,66 @@ class _DNSForwardQueryResolver:
 
         return response_msg
 
+    def _does_response_contain_ipv4_rrset(self, response_msg: dns.message.Message) -> bool:
+        for response_rrset in response_msg.answer:
+            if (response_rrset.rdclass == dns.rdataclass.IN) and (response_rrset.rdtype == dns.rdatatype.A):
+                return True
+
+        return False
+
+    def _get_negative_caching_ttl_of_response(self, response_msg: dns.message.Message) -> int:
+        # RFC 2308, section 5 - negative responses without a SOA record should not be cached at all
+        for authority_rrset in response_msg.authority:
+            if (authority_rrset.rdclass == dns.rdataclass.IN) and (authority_rrset.rdtype == dns.rdatatype.SOA) and (len(authority_rrset) > 0):
+                return min(authority_rrset.ttl, authority_rrset[0].minimum)
+
+        return 0
+
+    def _limit_negative_caching_ttl_of_response(self, response_msg: dns.message.Message, max_ttl: int) -> None:
+        for authority_rrset in response_msg.authority:
+            authority_rrset.ttl = min(authority_rrset.ttl, max_ttl)
+
+    @DI_NS.inject_dependencies("substitute_address_mapper")
+    async def _make_response_from_synthesized_answer_cache(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Optional[dns.message.Message]:
+        """
+        Returns None if there is no usable cached answer for the client's query.
+        """
+
+        # Queries without the RD flag set are not resolved recursively by the upstream servers, so their answers
+        #  are never cached (see above)
+        if dns.flags.RD not in query_msg.flags:
+            return None
+
+        qname = query_msg.question[0].name
+        synthesized_answer_cache = self._shared_state.get_synthesized_answer_cache()
+
+        cached_answer = synthesized_answer_cache.get_answer(valid_client_ipv4, qname)
+        if cached_answer is None:
+            return None
+        answer, substitutions = cached_answer
+
+        # The substitute assignments the cached answer is based on are looked up again - this keeps them from expiring
+        #  while they are being used by the client (in the same way as if the answer was not cached), and makes sure
+        #  that they have not changed in the meantime (e.g. due to the client's dynamic mapper having been cleared).
+        for ipv6_address, cached_ipv4_address in substitutions:
+            try:
+                ipv4_address, _ = await substitute_address_mapper.map_substitute_6to4_async(ipv6_address, valid_client_ipv4, mapping_creation_allowed=False)
+            except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
+                ipv4_address = None
+            except ConnectionError:  # Raised by the mapper's stand-in in DNS worker processes
+                raise _DNSResolutionFailureInternalExc()
+
+            if ipv4_address != cached_ipv4_address:
+                synthesized_answer_cache.forget_answer(valid_client_ipv4, qname)
+                return None
+
+        response_msg = dns.message.make_response(query_msg, recursion_available=True)
+        response_msg.answer = answer
+
+        return response_msg
+
     @DI_NS.inject_dependencies("configuration", "substitute_address_mapper")
-    def _generate_ipv4_rrset_by_substituting_ipv6_rrset(self, ipv6_rrset: dns.rrset.RRset, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration, substitute_address_mapper: SubstituteAddressMapper) -> dns.rrset.RRset:
+    async def _generate_ipv4_rrset_by_substituting_ipv6_rrset(self, ipv6_rrset: dns.rrset.RRset, valid_client_ipv4: ipaddress.IPv4Address, configuration: Configuration, substitute_address_mapper: SubstituteAddressMapper) -> tuple[dns.rrset.RRset, list[tuple[ipaddress.IPv6Address, ipaddress.IPv4Address]]]:
         # Parse the IPv6 addresses from the RRSet
         ipv6_addresses = []
         for ipv6_rdata in ipv6_rrset:
@@ -122,45 +246,56 @@ class _DNSForwardQueryResolver:
             else:
                 ipv6_addresses.append(ipv6_address)
 
-        ipv4_addresses = []
+        substitutions = []  # (IPv6 address, substitute IPv4 address)
         cache_lifetimes = [ipv6_rrset.ttl]
 
         # Prioritize IPv6 addresses which already have substitute IPv4 assignments, so that the limited address space is not wasted
         unsubstituted_ipv6_addresses = []
         for ipv6_address in ipv6_addresses:
             try:
-                ipv4_address, cache_lifetime = substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=False)
+                ipv4_address, cache_lifetime = await substitute_address_mapper.map_substitute_6to4_async(ipv6_address, valid_client_ipv4, mapping_creation_allowed=False)
             except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
                 unsubstituted_ipv6_addresses.append(ipv6_address)
+            except ConnectionError:  # Raised by the mapper's stand-in in DNS worker processes
+                raise _DNSResolutionFailureInternalExc()
             else:
-                ipv4_addresses.append(ipv4_address)
+                substitutions.append((ipv6_address, ipv4_address))
                 cache_lifetimes.append(cache_lifetime)
 
         # Then, if there is "not enough" substituted addresses yet, attempt to create new mappings
-        remaining_to_substitute = (configuration.dns.max_newly_assigned_substitute_addrs_per_response - len(ipv4_addresses))
+        client_rate_limiter = self._shared_state.get_client_rate_limiter()
+        remaining_to_substitute = (configuration.dns.max_newly_assigned_substitute_addrs_per_response - len(substitutions))
         if remaining_to_substitute > 0:
             for _, ipv6_address in zip(range(remaining_to_substitute), unsubstituted_ipv6_addresses):  # This zip() is there to limit the number of iterations
+                if (client_rate_limiter is not None) and (not client_rate_limiter.is_new_substitute_addr_assignment_allowed(valid_client_ipv4)):
+                    break
+
                 try:
-                    ipv4_address, cache_lifetime = substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
+                    ipv4_address, cache_lifetime = await substitute_address_mapper.map_substitute_6to4_async(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
                 except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
-                    pass
+                    if client_rate_limiter is not None:
+                        client_rate_limiter.cancel_new_substitute_addr_assignment(valid_client_ipv4)
+                except ConnectionError:
+                    raise _DNSResolutionFailureInternalExc()
                 else:
-                    ipv4_addresses.append(ipv4_address)
+                    substitutions.append((ipv6_address, ipv4_address))
                     cache_lifetimes.append(cache_lifetime)
 
-        if len(ipv4_addresses) == 0:
+        if len(substitutions) == 0:
             # The fact that it was not possible to get any substitute IPv4 addresses at this point might be caused by a
             #  temporary error on this translator's side (e.g. the substitute address space is currently full, but in
             #  a few seconds, it might not be), so we cannot send back an empty NOERROR response to the client, because
             #  it could get negatively cached.
             raise _DNSResolutionFailureInternalExc()
 
-        return dns.rrset.from_rdata_list(
+        ipv4_rrset = dns.rrset.from_rdata_list(
             ipv6_rrset.name,
             min(cache_lifetimes),
             [dns.rdtypes.IN.A.A(
                 rdclass=dns.rdataclass.IN,
                 rdtype=dns.rdatatype.A,
                 address=str(ipv4_address)
-            ) for ipv4_address in ipv4_addresses]
+            ) for _, ipv4_address in substitutions]
         )
+
+        return ipv4_rrset, substitutions
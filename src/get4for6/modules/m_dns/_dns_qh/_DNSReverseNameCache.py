@@ -0,0 +1,83 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+import collections
+import dns.name
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.modules.m_dns._dns_qh._DNSReverseNameCacheEntry import _DNSReverseNameCacheEntry
+
+
+class _DNSReverseNameCache:
+    """
+    Caches the PTR names of substituted IPv6 addresses, which have been obtained from upstream servers. Since the names
+     do not depend on the client which is asking for them (unlike the substitute IPv4 addresses), the cache is shared
+     by all clients.
+    """
+
+    # Records with higher TTLs are cached only for this amount of time, as is common among recursive resolvers.
+    _MAX_TTL: Final[int] = 86400
+
+    def __init__(self, max_entries: int):
+        self._max_entries: Final[int] = max_entries
+        self._entries: Final[collections.OrderedDict[ipaddress.IPv6Address, _DNSReverseNameCacheEntry]] = collections.OrderedDict()
+
+    def get_ptr_names(self, ipv6_address: ipaddress.IPv6Address) -> Optional[tuple[list[dns.name.Name], int]]:
+        """
+        Returns None if there are no unexpired PTR names cached for the IPv6 address. Otherwise, the names are returned
+         together with their remaining TTL.
+        """
+
+        entry = self._entries.get(ipv6_address, None)
+        if entry is None:
+            return None
+
+        age = max(0, TimeHelpers.get_monotonic_timestamp_in_whole_seconds() - entry.stored_at)
+        if age >= entry.ttl:
+            del self._entries[ipv6_address]
+            return None
+
+        self._entries.move_to_end(ipv6_address)  # The entry is now the most recently used one
+
+        return list(entry.ptr_names), (entry.ttl - age)
+
+    def store_ptr_names(self, ipv6_address: ipaddress.IPv6Address, ptr_names: list[dns.name.Name], ttl: int) -> None:
+        ttl = min(ttl, self.__class__._MAX_TTL)
+        if (ttl == 0) or (len(ptr_names) == 0):
+            return
+
+        self._entries[ipv6_address] = _DNSReverseNameCacheEntry(
+            ptr_names=tuple(ptr_names),
+            ttl=ttl,
+            stored_at=TimeHelpers.get_monotonic_timestamp_in_whole_seconds()
+        )
+        self._entries.move_to_end(ipv6_address)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def get_entry_count(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
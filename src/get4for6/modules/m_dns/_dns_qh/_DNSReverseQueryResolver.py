@@ -20,7 +20,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Union
+from typing import Final, Union
 import ipaddress
 import dns.message
 import dns.name
@@ -38,12 +38,16 @@ from get4for6.helpers.IPHelpers import IPHelpers
 from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
 from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc import SubstituteIPv4AddressNotAllowedExc
 from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import SubstituteAssignmentNotFoundExc
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState
 from get4for6.modules.m_dns._dns_qh._DNSUpstreamQuerier import _DNSUpstreamQuerier
 from get4for6.modules.m_dns._dns_qh._DNSAuxiliaryNameQueryResolver import _DNSAuxiliaryNameQueryResolver
 from get4for6.modules.m_dns._dns_qh._DNSResolutionFailureInternalExc import _DNSResolutionFailureInternalExc
 
 
 class _DNSReverseQueryResolver:
+    def __init__(self, shared_state: DNSQueryHandlerSharedState):
+        self._shared_state: Final[DNSQueryHandlerSharedState] = shared_state
+
     @DI_NS.inject_dependencies("configuration")
     async def resolve_reverse_query(self, query_msg: dns.message.Message, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, configuration: Configuration) -> dns.message.Message:
         """
@@ -55,7 +59,7 @@ class _DNSReverseQueryResolver:
         if isinstance(reverse_ip, ipaddress.IPv4Address) and IPHelpers.is_ipv4_address_part_of_any_subnet_loose(reverse_ip, configuration.translation.substitute_subnets):
             return await self._perform_reverse_query_for_substituted_ipv6_address(query_msg, reverse_ip, valid_client_ipv4, over_tcp)
 
-        return await _DNSUpstreamQuerier().perform_upstream_query(query_msg, over_tcp)
+        return await _DNSUpstreamQuerier(self._shared_state).perform_upstream_query(query_msg, over_tcp)
 
     def _get_ip_address_from_reverse_query(self, query_msg: dns.message.Message) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
         r_name = query_msg.question[0].name
@@ -73,47 +77,23 @@ class _DNSReverseQueryResolver:
     async def _perform_reverse_query_for_substituted_ipv6_address(self, query_msg: dns.message.Message, substitute_ipv4: ipaddress.IPv4Address, valid_client_ipv4: ipaddress.IPv4Address, over_tcp: bool, configuration: Configuration, substitute_address_mapper: SubstituteAddressMapper) -> dns.message.Message:
         # Get the IPv6 address substituted by the provided IPv4 address
         try:
-            substituted_ipv6, cache_lifetime = substitute_address_mapper.map_substitute_4to6(substitute_ipv4, valid_client_ipv4)
+            substituted_ipv6, cache_lifetime = await substitute_address_mapper.map_substitute_4to6_async(substitute_ipv4, valid_client_ipv4)
         except (SubstituteAssignmentNotFoundExc, SubstituteIPv4AddressNotAllowedExc):
             raise _DNSResolutionFailureInternalExc()
+        except ConnectionError:  # Raised by the mapper's stand-in in DNS worker processes
+            raise _DNSResolutionFailureInternalExc()
 
-        if (configuration.dns.auxiliary_names is not None) and configuration.dns.auxiliary_names.use_for_rdns:
+        auxiliary_zone = self._shared_state.get_auxiliary_zone()
+        if (auxiliary_zone is not None) and configuration.dns.auxiliary_names.use_for_rdns:
             # If auxiliary names are enabled, and it is desired to use them for reverse DNS, let the auxiliary name
             #  resolver generate an PTR name for the substituted IPv6 address, and mark the DNS answer sent back to the
             #  client as authoritative.
-            ptr_names = [_DNSAuxiliaryNameQueryResolver().generate_ipv6_ptr_name(substituted_ipv6)]
+            ptr_names = [_DNSAuxiliaryNameQueryResolver(auxiliary_zone, self._shared_state.get_client_rate_limiter()).generate_ipv6_ptr_name(substituted_ipv6)]
             authoritative_answer = True
         else:
             # Otherwise, try answering the query with the substituted IPv6's "real-world" PTR name.
-            substituted_ipv6_rdns_name = dns.reversename.from_address(str(substituted_ipv6))
-            substitute_query_msg = dns.message.make_query(
-                qname=substituted_ipv6_rdns_name,
-                rdclass=dns.rdataclass.IN,
-                rdtype=dns.rdatatype.PTR,
-                flags=(dns.flags.RD if (dns.flags.RD in query_msg.flags) else 0)
-            )
-            substitute_response_msg = await _DNSUpstreamQuerier().perform_upstream_query(substitute_query_msg, over_tcp)
-            if substitute_response_msg.rcode() != dns.rcode.NOERROR:
-                # We cannot send NXDOMAIN responses back, as we do not have a suitable SOA record for the substitute
-                #  IPv4 address we are resolving - we send back an SERVFAIL response instead.
-                raise _DNSResolutionFailureInternalExc()
-
-            for substitute_response_rrset in substitute_response_msg.answer:
-                # Since it is technically (but certainly not likely) possible that a CNAME record has been received
-                #  (and we want to ignore it in this case), a RRset in the ANSWER section with the wanted class and type
-                #  will be considered the target one (this is obviously not the most intelligent behaviour, but it
-                #  should get the job done).
-                if (substitute_response_rrset.rdclass == dns.rdataclass.IN) and (substitute_response_rrset.rdtype == dns.rdatatype.PTR):
-                    break  # 'substitute_response_rrset' will contain the correct RRset
-            else:
-                # If the response does not contain a PTR record, send back a SERVFAIL for the same reason as above.
-                raise _DNSResolutionFailureInternalExc()
-
-            if len(substitute_response_rrset) == 0:  # Empty RRsets should not exist
-                raise _DNSResolutionFailureInternalExc()
-
-            cache_lifetime = min(cache_lifetime, substitute_response_rrset.ttl)
-            ptr_names = [rdata.target for rdata in substitute_response_rrset]  # It is technically possible for an IP to have more than one PTR record.
+            ptr_names, ptr_ttl = await self._get_ptr_names_of_substituted_ipv6_address(query_msg, substituted_ipv6, over_tcp)
+            cache_lifetime = min(cache_lifetime, ptr_ttl)  # The lifetime of the client's substitute assignment is still honoured
             authoritative_answer = False  # The query is answered by using an upstream server.
 
         response_rrset = dns.rrset.from_rdata_list(
@@ -133,3 +113,54 @@ class _DNSReverseQueryResolver:
         response_msg.answer.append(response_rrset)
 
         return response_msg
+
+    @DI_NS.inject_dependencies("configuration")
+    async def _get_ptr_names_of_substituted_ipv6_address(self, query_msg: dns.message.Message, substituted_ipv6: ipaddress.IPv6Address, over_tcp: bool, configuration: Configuration) -> tuple[list[dns.name.Name], int]:
+        """
+        Returns the PTR names of the IPv6 address, together with their TTL.
+
+        :raises _DNSResolutionFailureInternalExc
+        """
+
+        # The names are cached only for recursive queries, as only such queries are resolved fully by the upstream servers
+        cache_queried_names = (dns.flags.RD in query_msg.flags)
+        reverse_name_cache = self._shared_state.get_reverse_name_cache()
+        if cache_queried_names:
+            cached_ptr_names = reverse_name_cache.get_ptr_names(substituted_ipv6)
+            if cached_ptr_names is not None:
+                return cached_ptr_names
+
+        substituted_ipv6_rdns_name = dns.reversename.from_address(str(substituted_ipv6))
+        substitute_query_msg = dns.message.make_query(
+            qname=substituted_ipv6_rdns_name,
+            rdclass=dns.rdataclass.IN,
+            rdtype=dns.rdatatype.PTR,
+            flags=(dns.flags.RD if (dns.flags.RD in query_msg.flags) else 0),
+            use_edns=0,
+            payload=configuration.dns.edns_udp_payload_size
+        )
+        substitute_response_msg = await _DNSUpstreamQuerier(self._shared_state).perform_upstream_query(substitute_query_msg, over_tcp)
+        if substitute_response_msg.rcode() != dns.rcode.NOERROR:
+            # We cannot send NXDOMAIN responses back, as we do not have a suitable SOA record for the substitute
+            #  IPv4 address we are resolving - we send back an SERVFAIL response instead.
+            raise _DNSResolutionFailureInternalExc()
+
+        for substitute_response_rrset in substitute_response_msg.answer:
+            # Since it is technically (but certainly not likely) possible that a CNAME record has been received
+            #  (and we want to ignore it in this case), a RRset in the ANSWER section with the wanted class and type
+            #  will be considered the target one (this is obviously not the most intelligent behaviour, but it
+            #  should get the job done).
+            if (substitute_response_rrset.rdclass == dns.rdataclass.IN) and (substitute_response_rrset.rdtype == dns.rdatatype.PTR):
+                break  # 'substitute_response_rrset' will contain the correct RRset
+        else:
+            # If the response does not contain a PTR record, send back a SERVFAIL for the same reason as above.
+            raise _DNSResolutionFailureInternalExc()
+
+        if len(substitute_response_rrset) == 0:  # Empty RRsets should not exist
+            raise _DNSResolutionFailureInternalExc()
+
+        ptr_names = [rdata.target for rdata in substitute_response_rrset]  # It is technically possible for an IP to have more than one PTR record.
+        if cache_queried_names:
+            reverse_name_cache.store_ptr_names(substituted_ipv6, ptr_names, substitute_response_rrset.ttl)
+
+        return ptr_names, substitute_response_rrset.ttl
@@ -0,0 +1,100 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+import collections
+import dns.name
+import dns.rrset
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.modules.m_dns._dns_qh._DNSSynthesizedAnswerCacheEntry import _DNSSynthesizedAnswerCacheEntry
+
+
+class _DNSSynthesizedAnswerCache:
+    """
+    Caches the ANSWER sections of responses to 'A' queries for IPv6-only names, into which substitute IPv4 addresses
+     have been synthesized, per client. Since the substitute addresses are client-specific, the cache is keyed on the
+     client's IPv4 address and the queried name.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries: Final[int] = max_entries
+        self._entries: Final[collections.OrderedDict[tuple[ipaddress.IPv4Address, dns.name.Name], _DNSSynthesizedAnswerCacheEntry]] = collections.OrderedDict()
+
+    def get_answer(self, valid_client_ipv4: ipaddress.IPv4Address, qname: dns.name.Name) -> Optional[tuple[list[dns.rrset.RRset], tuple[tuple[ipaddress.IPv6Address, ipaddress.IPv4Address], ...]]]:
+        """
+        Returns None if there is no unexpired answer cached for the client and name. Otherwise, a copy of the answer
+         whose TTLs have been decreased by the entry's age is returned, together with the IPv6 to IPv4 substitutions it
+         is based on - it is up to the caller to make sure that they are still valid.
+        """
+
+        key = (valid_client_ipv4, qname)  # 'dns.name.Name' objects are compared case-insensitively
+
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+
+        age = max(0, TimeHelpers.get_monotonic_timestamp_in_whole_seconds() - entry.stored_at)
+        if age >= entry.min_ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)  # The entry is now the most recently used one
+
+        # Since each TTL is at least 'min_ttl', none of them can go below zero
+        answer = [dns.rrset.from_rdata_list(rrset.name, (rrset.ttl - age), list(rrset)) for rrset in entry.answer]
+
+        return answer, entry.substitutions
+
+    def store_answer(self, valid_client_ipv4: ipaddress.IPv4Address, qname: dns.name.Name, answer: list[dns.rrset.RRset], substitutions: list[tuple[ipaddress.IPv6Address, ipaddress.IPv4Address]]) -> None:
+        """
+        The RRsets in 'answer' must not be modified after they have been stored.
+        """
+
+        if len(answer) == 0:
+            return
+
+        # The synthesized 'A' RRset's TTL is already bounded by the substitute address mapper's external cache lifetime
+        min_ttl = min(rrset.ttl for rrset in answer)
+        if min_ttl == 0:
+            return
+
+        key = (valid_client_ipv4, qname)
+        self._entries[key] = _DNSSynthesizedAnswerCacheEntry(
+            answer=tuple(answer),
+            substitutions=tuple(substitutions),
+            min_ttl=min_ttl,
+            stored_at=TimeHelpers.get_monotonic_timestamp_in_whole_seconds()
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def forget_answer(self, valid_client_ipv4: ipaddress.IPv4Address, qname: dns.name.Name) -> None:
+        self._entries.pop((valid_client_ipv4, qname), None)
+
+    def get_entry_count(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
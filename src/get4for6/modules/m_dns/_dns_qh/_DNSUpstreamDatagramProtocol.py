@@ -0,0 +1,198 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import asyncio
+import dns.message
+import dns.entropy
+import dns.flags
+from get4for6.config.IPPortPair import IPPortPair
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+from get4for6.modules.m_dns._dns_qh._DNSWireHelpers import _DNSWireHelpers
+
+
+class _DNSUpstreamDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Represents one pooled UDP socket, which is connected to an upstream DNS server, and through which multiple queries
+     can be carried out simultaneously. Received responses are demultiplexed using the message IDs of the queries.
+    """
+
+    def __init__(self, ip_port_pair: IPPortPair, max_queries: int):
+        self._ip_port_pair: Final[IPPortPair] = ip_port_pair
+        self._max_queries: Final[int] = max_queries
+
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._open_exc: Optional[Exception] = None
+        self._open_result_available_event: Final[asyncio.Event] = asyncio.Event()
+        self._opening_task: Optional[asyncio.Task] = None
+
+        self._pending_queries: Final[dict[int, tuple[_DNSWireQuery, asyncio.Future]]] = dict()
+        self._queries_sent: int = 0
+        self._queries_in_progress: int = 0
+        self._retired: bool = False
+
+    def open_in_background(self) -> None:
+        assert (self._opening_task is None)
+
+        self._opening_task = asyncio.create_task(self._open())
+
+    async def _open(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        try:
+            # Since the socket is connected to the upstream server, the kernel discards datagrams coming from other
+            #  sources (this is equivalent to the source address check performed by 'dnspython').
+            await loop.create_datagram_endpoint(
+                protocol_factory=lambda: self,
+                remote_addr=(str(self._ip_port_pair.ip_address), self._ip_port_pair.port),
+                allow_broadcast=False
+            )
+        except OSError as e:
+            self._retired = True
+            self._set_open_result(e)
+
+    def accepts_new_queries(self) -> bool:
+        # Once a socket has been used for a certain number of queries, it is replaced by a new one, so that the source
+        #  port used for upstream queries changes from time to time.
+        return (not self._retired) and (self._queries_sent < self._max_queries)
+
+    def get_pending_query_count(self) -> int:
+        return self._queries_in_progress
+
+    def retire(self) -> None:
+        """
+        The socket is closed as soon as there are no pending queries left.
+        """
+
+        self._retired = True
+        self._close_if_retired_and_idle()
+
+    def close(self) -> None:
+        self._retired = True
+
+        if self._transport is not None:
+            self._transport.close()  # 'connection_lost()' takes care of the pending queries
+            return
+
+        if self._opening_task is not None:
+            self._opening_task.cancel()
+        self._set_open_result(ConnectionAbortedError("The upstream socket has been closed before it was opened!"))
+
+    def _close_if_retired_and_idle(self) -> None:
+        if self._retired and (self._queries_in_progress == 0) and (self._transport is not None):
+            self._transport.close()
+
+    async def perform_query(self, wire_query: _DNSWireQuery) -> bytes:
+        """
+        The returned response has the same message ID as 'wire_query'; a different, random one is used on the wire.
+         Apart from the ID and the question, the response is NOT validated.
+
+        :raises dns.message.Truncated
+        :raises OSError
+        """
+
+        assert (self._queries_sent < self._max_queries)  # Callers must check 'accepts_new_queries()' beforehand
+        self._queries_sent += 1
+
+        self._queries_in_progress += 1
+        try:
+            return await self._perform_query(wire_query)
+        finally:
+            self._queries_in_progress -= 1
+            self._close_if_retired_and_idle()
+
+    async def _perform_query(self, wire_query: _DNSWireQuery) -> bytes:
+        await self._open_result_available_event.wait()
+        if self._open_exc is not None:
+            raise self._open_exc
+
+        # The message ID sent to the upstream server is randomized in the same way 'dnspython' does it, so that it is
+        #  not predictable by anyone who could try to spoof the upstream server's responses.
+        upstream_id = self._generate_unused_random_id()
+
+        response_future = asyncio.get_running_loop().create_future()
+        self._pending_queries[upstream_id] = (wire_query, response_future)
+        try:
+            self._transport.sendto(_DNSWireHelpers.replace_id(wire_query.wire, upstream_id))  # Does not raise, 'error_received' is called instead
+            return await response_future
+        finally:
+            del self._pending_queries[upstream_id]
+
+    def _generate_unused_random_id(self) -> int:
+        while True:
+            upstream_id = dns.entropy.random_16()
+            if upstream_id not in self._pending_queries:
+                return upstream_id
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        assert (self._transport is None)
+
+        self._transport = transport
+        self._set_open_result(None)
+        self._close_if_retired_and_idle()  # The socket might have been retired while it was being opened
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        if len(data) < 2:
+            return
+
+        try:
+            wire_query, response_future = self._pending_queries[_DNSWireHelpers.get_id(data)]
+        except KeyError:
+            return  # Unexpected (e.g. late or spoofed) datagrams are ignored
+
+        if response_future.done():
+            return
+
+        # Responses which do not match the question (which might have been spoofed) are ignored as well
+        response_bytes = _DNSWireHelpers.replace_id(data, wire_query.id)
+        if not _DNSWireHelpers.does_response_match_query(response_bytes, wire_query):
+            return
+
+        if _DNSWireHelpers.get_flags(response_bytes) & dns.flags.TC:
+            response_future.set_exception(dns.message.Truncated())  # The caller will fall back to TCP
+            return
+
+        response_future.set_result(response_bytes)
+
+    def error_received(self, exc: Exception) -> None:
+        # Errors reported on connected UDP sockets (e.g. ICMP port unreachable) concern the upstream server as a whole,
+        #  so all the queries pending on this socket are failed, and the socket is not used for new queries anymore.
+        self._retired = True
+        self._fail_pending_queries(exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._retired = True
+        self._fail_pending_queries(exc if (exc is not None) else ConnectionAbortedError("The upstream socket has been closed!"))
+
+    def _fail_pending_queries(self, exc: Exception) -> None:
+        for _, response_future in self._pending_queries.values():
+            if not response_future.done():
+                response_future.set_exception(exc)
+
+        self._set_open_result(exc)
+
+    def _set_open_result(self, open_exc: Optional[Exception]) -> None:
+        if self._open_result_available_event.is_set():
+            return
+
+        self._open_exc = open_exc
+        self._open_result_available_event.set()
@@ -19,19 +19,30 @@
 # WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-
+from typing import Final, Optional, Any
+import asyncio
+import dataclasses
 import dns.message
 import dns.flags
 import dns.exception
-import dns.asyncquery
-import dns.rcode
-import dns.flags
 from get4for6.config.Configuration import Configuration
+from get4for6.config.IPPortPair import IPPortPair
+from get4for6.config.UpstreamServerGroup import UpstreamServerGroup
 from get4for6.di import DI_NS
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
+from get4for6.modules.m_dns._dns_qh.DNSQueryHandlerSharedState import DNSQueryHandlerSharedState
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamResponseCache import _DNSUpstreamResponseCache
+from get4for6.modules.m_dns._dns_qh._DNSWireHelpers import _DNSWireHelpers
 from get4for6.modules.m_dns._dns_qh._DNSResolutionFailureInternalExc import _DNSResolutionFailureInternalExc
 
 
 class _DNSUpstreamQuerier:
+    def __init__(self, shared_state: DNSQueryHandlerSharedState):
+        self._shared_state: Final[DNSQueryHandlerSharedState] = shared_state
+
     async def perform_upstream_query(self, query_msg: dns.message.Message, over_tcp: bool) -> dns.message.Message:
         """
         CONTEXT: 'query_msg' is a valid DNS query message.
@@ -43,58 +54,281 @@ class _DNSUpstreamQuerier:
 
         assert (dns.flags.QR not in query_msg.flags)
 
+        wire_query = _DNSWireHelpers.parse_query(query_msg.to_wire())
+        if wire_query is None:
+            raise _DNSResolutionFailureInternalExc()  # This should never happen
+
+        response_bytes = await self.perform_upstream_wire_query(wire_query, over_tcp)
+
         try:
-            return await self._perform_upstream_query(query_msg, over_tcp)
+            return dns.message.from_wire(response_bytes)
         except dns.exception.DNSException:
             raise _DNSResolutionFailureInternalExc()
 
+    def get_cached_upstream_response(self, query_msg: dns.message.Message, over_tcp: bool) -> Optional[dns.message.Message]:
+        """
+        Returns the same response as 'perform_upstream_query()' would if it can be obtained from the upstream response
+         cache, i.e. without performing any I/O. Otherwise, None is returned.
+
+        CONTEXT: 'query_msg' is a valid DNS query message.
+        """
+
+        assert (dns.flags.QR not in query_msg.flags)
+
+        wire_query = _DNSWireHelpers.parse_query(query_msg.to_wire())
+        if wire_query is None:
+            return None
+
+        response_bytes = self.get_cached_upstream_wire_response(wire_query, over_tcp)
+        if response_bytes is None:
+            return None
+
+        try:
+            return dns.message.from_wire(response_bytes)
+        except dns.exception.DNSException:
+            return None
+
+    async def perform_upstream_wire_query(self, wire_query: _DNSWireQuery, over_tcp: bool) -> bytes:
+        """
+        The response is returned in wire format, without being parsed and re-serialized; its message ID is the same as
+         the query's, and the AA flag is cleared in it. If the upstream response cache is enabled, the response might
+         come from there.
+
+        If an NXDOMAIN or empty NOERROR response is received, it is returned.
+
+        :raises _DNSResolutionFailureInternalExc
+        """
+
+        assert (not (wire_query.flags & dns.flags.QR))
+
+        cached_response_bytes = self.get_cached_upstream_wire_response(wire_query, over_tcp)
+        if cached_response_bytes is not None:
+            return cached_response_bytes
+
+        coalescing_key = self._get_coalescing_key(wire_query)
+        upstream_query_task = self._get_or_start_upstream_query_task(coalescing_key, wire_query, over_tcp)
+
+        # If the client on whose behalf the upstream query has been started goes away (i.e. this coroutine gets
+        #  cancelled), the query must not be cancelled, since other clients might be waiting for its result.
+        shared_response_bytes = await asyncio.shield(upstream_query_task)
+
+        return _DNSWireHelpers.adapt_shared_response_for_query(shared_response_bytes, wire_query)
+
+    def get_cached_upstream_wire_response(self, wire_query: _DNSWireQuery, over_tcp: bool) -> Optional[bytes]:
+        """
+        Returns the same response as 'perform_upstream_wire_query()' would if it can be obtained from the upstream
+         response cache, i.e. without performing any I/O. Otherwise, None is returned.
+        """
+
+        assert (not (wire_query.flags & dns.flags.QR))
+
+        upstream_response_cache = self._get_upstream_response_cache_for_query(wire_query)
+        if upstream_response_cache is None:
+            return None
+
+        coalescing_key = self._get_coalescing_key(wire_query)
+        cached_response = upstream_response_cache.get_fresh_response(coalescing_key)
+        if cached_response is None:
+            return None
+
+        cached_response_bytes, prefetch = cached_response
+        if prefetch:
+            self._get_or_start_upstream_query_task(coalescing_key, wire_query, over_tcp)  # The task's result is put into the cache
+
+        return _DNSWireHelpers.adapt_shared_response_for_query(cached_response_bytes, wire_query)
+
+    def _get_upstream_response_cache_for_query(self, wire_query: _DNSWireQuery) -> Optional[_DNSUpstreamResponseCache]:
+        # Responses to queries carrying EDNS options are neither cached nor served from the cache, since they might be
+        #  specific to the client which has sent the query (e.g. tailored to its subnet sent in an ECS option, or
+        #  containing a server cookie issued to it), and the cache would keep serving them long after the query.
+        if wire_query.edns_options:
+            return None
+
+        return self._shared_state.get_upstream_response_cache()
+
+    def _get_or_start_upstream_query_task(self, coalescing_key: Any, wire_query: _DNSWireQuery, over_tcp: bool) -> asyncio.Task[bytes]:
+        # When multiple clients ask for the same name at the same time (e.g. after a popular record expires from their
+        #  caches), only one upstream query is performed, and its response is shared among all of them.
+        in_flight_upstream_queries = self._shared_state.get_in_flight_upstream_queries()
+
+        upstream_query_task = in_flight_upstream_queries.get(coalescing_key, None)
+        if upstream_query_task is None:
+            upstream_query_task = asyncio.create_task(self._perform_upstream_query(coalescing_key, wire_query, over_tcp))
+            in_flight_upstream_queries[coalescing_key] = upstream_query_task
+            upstream_query_task.add_done_callback(lambda task: self._forget_in_flight_upstream_query(coalescing_key, task))
+
+        return upstream_query_task
+
+    @staticmethod
+    def _get_coalescing_key(wire_query: _DNSWireQuery) -> Any:
+        # Apart from the question and the RD flag, the key also includes the things which may cause the upstream server
+        #  to send back a different response (e.g. with or without DNSSEC records). This includes the EDNS options, as
+        #  the response might be tailored to them (e.g. to the client's subnet sent in an ECS option) or echo them back
+        #  (e.g. a DNS cookie), so it must not be shared with clients which have sent different ones.
+        return (
+            wire_query.qname,  # 'dns.name.Name' objects are compared case-insensitively
+            wire_query.qtype,
+            wire_query.qclass,
+            bool(wire_query.flags & dns.flags.RD),
+            bool(wire_query.flags & dns.flags.CD),
+            wire_query.edns,
+            wire_query.ednsflags,
+            wire_query.edns_options
+        )
+
+    def _forget_in_flight_upstream_query(self, coalescing_key: Any, upstream_query_task: asyncio.Task) -> None:
+        in_flight_upstream_queries = self._shared_state.get_in_flight_upstream_queries()
+        if in_flight_upstream_queries.get(coalescing_key, None) is upstream_query_task:
+            del in_flight_upstream_queries[coalescing_key]
+
+        # The exception is retrieved so that it is not logged by asyncio in case all the waiting clients went away.
+        if not upstream_query_task.cancelled():
+            upstream_query_task.exception()
+
     @DI_NS.inject_dependencies("configuration")
-    async def _perform_upstream_query(self, query_msg: dns.message.Message, over_tcp: bool, configuration: Configuration) -> dns.message.Message:
+    async def _perform_upstream_query(self, coalescing_key: Any, wire_query: _DNSWireQuery, over_tcp: bool, configuration: Configuration) -> bytes:
         # Queries sent to upstream servers must desire recursion.
-        if dns.flags.RD not in query_msg.flags:
+        if not (wire_query.flags & dns.flags.RD):
             raise _DNSResolutionFailureInternalExc()
 
-        # The upstream server sequence might be empty, in which case the entire for loop is skipped and a SERVFAIL
-        #  response is sent back to the client on whose behalf the query is performed.
-        for ip_port_pair in configuration.dns.upstream_servers:
-            try:
-                if over_tcp:
-                    response_msg = await dns.asyncquery.tcp(
-                        q=query_msg,
-                        where=str(ip_port_pair.ip_address),
-                        port=ip_port_pair.port,
-                        timeout=configuration.dns.upstream_query_timeout
-                    )
-                else:
-                    response_msg, _ = await dns.asyncquery.udp_with_fallback(
-                        q=query_msg,
-                        where=str(ip_port_pair.ip_address),
-                        port=ip_port_pair.port,
-                        timeout=configuration.dns.upstream_query_timeout
-                    )
-            except dns.exception.DNSException:
-                continue
-
-            # Some of these *basic* (i.e. the response is not guaranteed to be *completely* valid, but the basics should
-            #  be OK) checks are not necessary, as the 'dnspython' library checks whether the response responds to the
-            #  question asked (and raises 'dns.query.BadResponse' if not), but we perform them anyway to make sure that
-            #  the code which later works with the response will not receive completely wrong data
-            if (
-                (response_msg.rcode() not in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN)) or
-                (response_msg.id != query_msg.id) or
-                (response_msg.opcode() != query_msg.opcode()) or
-                (dns.flags.QR not in response_msg.flags) or
-                (dns.flags.TC in response_msg.flags) or
-                ((dns.flags.RD in response_msg.flags) != (dns.flags.RD in query_msg.flags)) or
-                (dns.flags.RA not in response_msg.flags) or  # The upstream server must support recursion
-                (response_msg.xfr != query_msg.xfr) or
-                (len(response_msg.question) != len(query_msg.question))
-            ):
-                continue
+        # The UDP payload size advertised by the client is replaced with the configured one, as it is this translator
+        #  that receives the response from the upstream server - a larger buffer means that fewer responses get
+        #  truncated and have to be re-queried over TCP (the responses are truncated for clients with smaller buffers
+        #  by 'DNSQueryHandler').
+        if (wire_query.edns >= 0) and (wire_query.payload != configuration.dns.edns_udp_payload_size):
+            wire_query = dataclasses.replace(
+                wire_query,
+                wire=_DNSWireHelpers.replace_edns_payload_size(wire_query.wire, configuration.dns.edns_udp_payload_size),
+                payload=configuration.dns.edns_udp_payload_size
+            )
+
+        upstream_response_cache = self._get_upstream_response_cache_for_query(wire_query)
 
+        upstream_server_group = self._shared_state.get_upstream_server_group(wire_query.qname)
+        if (upstream_server_group.upstream_query_hedging_delay > 0.0) and (len(upstream_server_group.upstream_servers) > 1):
+            response_bytes = await self._query_upstream_server_group_with_hedging(wire_query, over_tcp, upstream_server_group)
+        else:
+            response_bytes = await self._query_upstream_server_group_sequentially(wire_query, over_tcp, upstream_server_group)
+
+        if response_bytes is not None:
             # From the client's perspective, the response is no longer authoritative, since it is forwarded to it.
-            response_msg.flags &= (~dns.flags.AA)
+            response_bytes = _DNSWireHelpers.clear_flags(response_bytes, dns.flags.AA)
+
+            if upstream_response_cache is not None:
+                upstream_response_cache.store_response(coalescing_key, response_bytes)
 
-            return response_msg
+            return response_bytes
+
+        # If no upstream server is able to answer the query, an expired cached response might be served instead, as
+        #  described in RFC 8767.
+        if upstream_response_cache is not None:
+            stale_response_bytes = upstream_response_cache.get_stale_response(coalescing_key)
+            if stale_response_bytes is not None:
+                return stale_response_bytes
 
         raise _DNSResolutionFailureInternalExc()
+
+    async def _query_upstream_server_group_sequentially(self, wire_query: _DNSWireQuery, over_tcp: bool, upstream_server_group: UpstreamServerGroup) -> Optional[bytes]:
+        # The upstream server sequence might be empty, in which case the entire for loop is skipped and a SERVFAIL
+        #  response is sent back to the client on whose behalf the query is performed.
+        for ip_port_pair in upstream_server_group.upstream_servers:
+            response_bytes = await self._query_upstream_server(wire_query, over_tcp, ip_port_pair, upstream_server_group.upstream_query_timeout)
+            if response_bytes is not None:
+                return response_bytes
+
+        return None
+
+    async def _query_upstream_server_group_with_hedging(self, wire_query: _DNSWireQuery, over_tcp: bool, upstream_server_group: UpstreamServerGroup) -> Optional[bytes]:
+        # The next upstream server in the sequence is queried if the previous ones have not answered within the hedging
+        #  delay (or immediately, if all of them have failed), while the queries sent to the previous ones are left
+        #  running. The first acceptable response is used, and the queries which are still in flight are cancelled.
+        upstream_servers = upstream_server_group.upstream_servers
+        next_server_index = 0
+        pending_tasks: set[asyncio.Task[Optional[bytes]]] = set()
+
+        try:
+            while (next_server_index < len(upstream_servers)) or pending_tasks:
+                if next_server_index < len(upstream_servers):
+                    pending_tasks.add(asyncio.create_task(self._query_upstream_server(wire_query, over_tcp, upstream_servers[next_server_index], upstream_server_group.upstream_query_timeout)))
+                    next_server_index += 1
+
+                done_tasks, pending_tasks = await asyncio.wait(
+                    pending_tasks,
+                    timeout=(upstream_server_group.upstream_query_hedging_delay if (next_server_index < len(upstream_servers)) else None),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for done_task in done_tasks:
+                    response_bytes = done_task.result()
+                    if response_bytes is not None:
+                        return response_bytes
+        finally:
+            for pending_task in pending_tasks:
+                pending_task.cancel()
+
+        return None
+
+    @DI_NS.inject_dependencies("metrics_registry")
+    async def _query_upstream_server(self, wire_query: _DNSWireQuery, over_tcp: bool, ip_port_pair: IPPortPair, timeout: float, metrics_registry: MetricsRegistry) -> Optional[bytes]:
+        """
+        Returns None if the upstream server fails to answer the query or sends back an unacceptable response.
+        """
+
+        started_at = TimeHelpers.get_monotonic_timestamp()
+        response_bytes = await self._query_upstream_server_without_measuring(wire_query, over_tcp, ip_port_pair, timeout)
+        metrics_registry.observe_histogram(
+            MetricNames.DNS_UPSTREAM_QUERY_DURATION,
+            (TimeHelpers.get_monotonic_timestamp() - started_at),
+            (("tcp" if over_tcp else "udp"), ("failure" if (response_bytes is None) else "success"))
+        )
+
+        return response_bytes
+
+    async def _query_upstream_server_without_measuring(self, wire_query: _DNSWireQuery, over_tcp: bool, ip_port_pair: IPPortPair, timeout: float) -> Optional[bytes]:
+        try:
+            if over_tcp:
+                response_bytes = await self._perform_upstream_query_via_tcp(wire_query, ip_port_pair, timeout)
+            else:
+                response_bytes = await self._perform_upstream_query_via_udp_with_fallback(wire_query, ip_port_pair, timeout)
+        except (dns.exception.DNSException, OSError):
+            return None
+
+        if not _DNSWireHelpers.is_upstream_response_acceptable(response_bytes, wire_query):
+            return None
+
+        return response_bytes
+
+    async def _perform_upstream_query_via_udp_with_fallback(self, wire_query: _DNSWireQuery, ip_port_pair: IPPortPair, timeout: float) -> bytes:
+        # Unlike 'dns.asyncquery.udp_with_fallback()', which creates and tears down a new UDP socket for each query,
+        #  one of the upstream server's pooled sockets is used.
+        upstream_socket_pool = self._shared_state.get_upstream_socket_pool(ip_port_pair)
+
+        try:
+            return await asyncio.wait_for(upstream_socket_pool.perform_query(wire_query), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise dns.exception.Timeout()
+        except dns.message.Truncated:
+            return await self._perform_upstream_query_via_tcp(wire_query, ip_port_pair, timeout)
+
+    async def _perform_upstream_query_via_tcp(self, wire_query: _DNSWireQuery, ip_port_pair: IPPortPair, timeout: float) -> bytes:
+        try:
+            return await asyncio.wait_for(self._exchange_messages_over_tcp(wire_query, ip_port_pair), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise dns.exception.Timeout()
+        except asyncio.IncompleteReadError:
+            raise dns.exception.UnexpectedEnd()
+
+    async def _exchange_messages_over_tcp(self, wire_query: _DNSWireQuery, ip_port_pair: IPPortPair) -> bytes:
+        reader, writer = await asyncio.open_connection(host=str(ip_port_pair.ip_address), port=ip_port_pair.port)
+        try:
+            writer.write(len(wire_query.wire).to_bytes(2, byteorder="big", signed=False) + wire_query.wire)
+            await writer.drain()
+
+            response_length = int.from_bytes(await reader.readexactly(2), byteorder="big", signed=False)
+            response_bytes = await reader.readexactly(response_length)
+        finally:
+            writer.close()
+
+        if not _DNSWireHelpers.does_response_match_query(response_bytes, wire_query):
+            raise dns.exception.FormError()
+
+        return response_bytes
@@ -0,0 +1,161 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Any
+import collections
+import dns.rcode
+from get4for6.helpers.TimeHelpers import TimeHelpers
+from get4for6.config.UpstreamResponseCacheOptions import UpstreamResponseCacheOptions
+from get4for6.modules.m_dns._dns_qh._DNSWireHelpers import _DNSWireHelpers
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamResponseCacheEntry import _DNSUpstreamResponseCacheEntry
+
+
+class _DNSUpstreamResponseCache:
+    """
+    Caches positive and negative (RFC 2308) responses received from upstream servers in wire format, and keeps them for
+     some time after they expire, so that they can be served when no upstream server is able to answer (RFC 8767).
+     Entries are evicted in the least-recently-used order when the cache is full.
+    """
+
+    # Records with higher TTLs are cached only for this amount of time, as is common among recursive resolvers.
+    _MAX_TTL: Final[int] = 86400
+    # RFC 2308, section 5: "Values of one to three hours have been found to work well"
+    _MAX_NEGATIVE_TTL: Final[int] = 3600
+    # RFC 8767, section 4: "a value of 30 seconds is RECOMMENDED"
+    _STALE_RESPONSE_TTL: Final[int] = 30
+
+    def __init__(self, options: UpstreamResponseCacheOptions):
+        self._options: Final[UpstreamResponseCacheOptions] = options
+        self._entries: Final[collections.OrderedDict[Any, _DNSUpstreamResponseCacheEntry]] = collections.OrderedDict()
+
+    def get_fresh_response(self, key: Any) -> Optional[tuple[bytes, bool]]:
+        """
+        Returns None if there is no unexpired response cached under the key. Otherwise, the response is returned
+         together with a boolean indicating whether it should be refreshed ahead of its expiry (prefetched) - 'True' is
+         returned at most once per cached response.
+        """
+
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+
+        age = self._get_entry_age(entry)
+        if age >= entry.min_ttl:
+            if age >= (entry.min_ttl + self._options.serve_stale_for):
+                del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)  # The entry is now the most recently used one
+        entry.hits += 1
+
+        # Responses for names which have been asked for often enough during their TTL are re-queried in the background
+        #  when only a certain fraction of their TTL is left, so that the clients do not have to wait for an upstream
+        #  query to finish once they expire.
+        prefetch = bool(
+            (not entry.prefetch_started) and
+            (entry.hits > self._options.prefetch_after_hits) and
+            ((entry.min_ttl - age) <= (entry.min_ttl * self._options.prefetch_when_remaining_ttl_fraction))
+        )
+        if prefetch:
+            entry.prefetch_started = True
+
+        return self._make_response_from_entry(entry, age), prefetch
+
+    def get_stale_response(self, key: Any) -> Optional[bytes]:
+        """
+        Meant to be called when no upstream server has been able to answer a query. Returns None if there is no
+         response which is allowed to be served cached under the key.
+        """
+
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+
+        age = self._get_entry_age(entry)
+        if age >= (entry.min_ttl + self._options.serve_stale_for):
+            del self._entries[key]
+            return None
+
+        return self._make_response_from_entry(entry, age)
+
+    def _make_response_from_entry(self, entry: _DNSUpstreamResponseCacheEntry, age: int) -> bytes:
+        if age >= entry.min_ttl:
+            new_ttls = [self.__class__._STALE_RESPONSE_TTL] * len(entry.ttls)
+        else:
+            new_ttls = [(ttl - age) for ttl in entry.ttls]  # Since each TTL is at least 'min_ttl', none of them can go below zero
+
+        return _DNSWireHelpers.replace_ttls(entry.response_bytes, entry.ttl_offsets, new_ttls)
+
+    def store_response(self, key: Any, response_bytes: bytes) -> None:
+        """
+        CONTEXT: 'response_bytes' is a response which has been accepted from an upstream server.
+        """
+
+        rcode = dns.rcode.from_flags(_DNSWireHelpers.get_flags(response_bytes), 0)
+        if rcode not in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+            return
+
+        ttl_offsets = _DNSWireHelpers.find_ttl_offsets(response_bytes)
+        if (ttl_offsets is None) or (len(ttl_offsets) == 0):
+            return
+
+        ttls = _DNSWireHelpers.get_ttls(response_bytes, ttl_offsets)
+        if (rcode == dns.rcode.NXDOMAIN) or (_DNSWireHelpers.get_answer_count(response_bytes) == 0):
+            # Negative responses are cached for the time given by the 'SOA' record in their AUTHORITY section; as per
+            #  RFC 2308, section 5, they are not cached at all if there is no such record. The TTLs of all the records
+            #  in the response (including the 'SOA' record itself) are capped to this time.
+            negative_ttl = _DNSWireHelpers.get_negative_caching_ttl(response_bytes)
+            if negative_ttl is None:
+                return
+
+            negative_ttl = min(negative_ttl, self.__class__._MAX_NEGATIVE_TTL)
+            ttls = [min(ttl, negative_ttl) for ttl in ttls]
+        else:
+            ttls = [min(ttl, self.__class__._MAX_TTL) for ttl in ttls]
+
+        min_ttl = min(ttls)
+        if min_ttl == 0:
+            self._entries.pop(key, None)  # The previously cached response must not be used anymore either
+            return
+
+        self._entries[key] = _DNSUpstreamResponseCacheEntry(
+            response_bytes=response_bytes,
+            ttl_offsets=ttl_offsets,
+            ttls=ttls,
+            min_ttl=min_ttl,
+            stored_at=TimeHelpers.get_monotonic_timestamp_in_whole_seconds(),
+            hits=0,
+            prefetch_started=False
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._options.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_entry_count(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _get_entry_age(self, entry: _DNSUpstreamResponseCacheEntry) -> int:
+        return max(0, TimeHelpers.get_monotonic_timestamp_in_whole_seconds() - entry.stored_at)
@@ -0,0 +1,82 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import dns.name
+from get4for6.config.Configuration import Configuration
+from get4for6.config.UpstreamServerGroup import UpstreamServerGroup
+from get4for6.di import DI_NS
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamServerGroupTrieNode import _DNSUpstreamServerGroupTrieNode
+
+
+class _DNSUpstreamServerGroupTrie:
+    """
+    Finds the upstream server group which queries for a name should be forwarded to. The domains of the conditional
+     forwarding groups are stored in a trie keyed by their labels in reverse order (i.e. starting from the TLD), so
+     the lookup takes time proportional to the number of labels in the queried name, regardless of the number of
+     configured domains. If no domain matches, the default group (made of the global upstream server options) is used.
+    """
+
+    @DI_NS.inject_dependencies("configuration")
+    def __init__(self, configuration: Configuration):
+        self._root_node: Final[_DNSUpstreamServerGroupTrieNode] = _DNSUpstreamServerGroupTrieNode()
+        self._root_node.upstream_server_group = UpstreamServerGroup(
+            domains=tuple(),
+            upstream_servers=configuration.dns.upstream_servers,
+            upstream_query_timeout=configuration.dns.upstream_query_timeout,
+            upstream_query_hedging_delay=configuration.dns.upstream_query_hedging_delay
+        )
+
+        for upstream_server_group in configuration.dns.conditional_forwarding:
+            for domain in upstream_server_group.domains:
+                self._insert_domain(domain, upstream_server_group)
+
+    def get_upstream_server_group(self, qname: dns.name.Name) -> UpstreamServerGroup:
+        # The group of the longest matching domain wins; the root node always has the default group assigned.
+        node = self._root_node
+        upstream_server_group = node.upstream_server_group
+        for label in self._get_reversed_lowercase_labels(qname):
+            node = node.children.get(label, None)
+            if node is None:
+                break
+
+            if node.upstream_server_group is not None:
+                upstream_server_group = node.upstream_server_group
+
+        assert (upstream_server_group is not None)
+        return upstream_server_group
+
+    def _insert_domain(self, domain: str, upstream_server_group: UpstreamServerGroup) -> None:
+        node = self._root_node
+        for label in self._get_reversed_lowercase_labels(dns.name.from_text(domain)):
+            next_node = node.children.get(label, None)
+            if next_node is None:
+                next_node = _DNSUpstreamServerGroupTrieNode()
+                node.children[label] = next_node
+            node = next_node
+
+        node.upstream_server_group = upstream_server_group
+
+    @staticmethod
+    def _get_reversed_lowercase_labels(name: dns.name.Name) -> list[bytes]:
+        # The empty root label at the end of absolute names is skipped.
+        return [label.lower() for label in reversed(name.labels) if label]
@@ -0,0 +1,86 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import secrets
+from get4for6.config.IPPortPair import IPPortPair
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+from get4for6.modules.m_dns._dns_qh._DNSUpstreamDatagramProtocol import _DNSUpstreamDatagramProtocol
+
+
+class _DNSUpstreamSocketPool:
+    """
+    Manages a bounded pool of UDP sockets connected to a single upstream DNS server, so that a new socket does not have
+     to be created and torn down for each upstream query. The sockets are opened lazily - a pool slot gets a new socket
+     when a query is assigned to it while it is empty or while its socket is not accepting new queries anymore.
+    """
+
+    _POOL_SIZE: Final[int] = 8
+    # Each socket is replaced after carrying out this number of queries, which makes the source port of upstream
+    #  queries harder to guess for anyone who could try to spoof the upstream server's responses. The number is kept
+    #  low, so that the source port still changes every few queries (as it would without the pool), while the cost of
+    #  opening a socket is spread over several queries.
+    _MAX_QUERIES_PER_SOCKET: Final[int] = 16
+
+    def __init__(self, ip_port_pair: IPPortPair):
+        self._ip_port_pair: Final[IPPortPair] = ip_port_pair
+        self._sockets: Final[list[Optional[_DNSUpstreamDatagramProtocol]]] = [None] * self.__class__._POOL_SIZE
+
+    async def perform_query(self, wire_query: _DNSWireQuery) -> bytes:
+        """
+        Timeouts are not handled by this method - it is up to the caller to cancel it.
+
+        :raises dns.message.Truncated
+        :raises OSError
+        """
+
+        return await self._get_socket_accepting_new_queries().perform_query(wire_query)
+
+    def _get_socket_accepting_new_queries(self) -> _DNSUpstreamDatagramProtocol:
+        # Queries are spread randomly among the sockets in the pool, so that it is not predictable from which source
+        #  port the next query will be sent.
+        socket_index = secrets.randbelow(len(self._sockets))
+
+        upstream_socket = self._sockets[socket_index]
+        if (upstream_socket is not None) and upstream_socket.accepts_new_queries():
+            return upstream_socket
+
+        if upstream_socket is not None:
+            upstream_socket.retire()
+
+        new_upstream_socket = _DNSUpstreamDatagramProtocol(self._ip_port_pair, self.__class__._MAX_QUERIES_PER_SOCKET)
+        new_upstream_socket.open_in_background()
+        self._sockets[socket_index] = new_upstream_socket
+
+        return new_upstream_socket
+
+    def get_socket_count(self) -> int:
+        return sum(1 for upstream_socket in self._sockets if (upstream_socket is not None))
+
+    def get_pending_query_count(self) -> int:
+        return sum(upstream_socket.get_pending_query_count() for upstream_socket in self._sockets if (upstream_socket is not None))
+
+    def close(self) -> None:
+        for socket_index, upstream_socket in enumerate(self._sockets):
+            if upstream_socket is not None:
+                upstream_socket.close()
+                self._sockets[socket_index] = None
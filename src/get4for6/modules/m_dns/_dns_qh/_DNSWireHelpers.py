@@ -0,0 +1,446 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import struct
+import dns.name
+import dns.flags
+import dns.opcode
+import dns.rcode
+import dns.rdatatype
+import dns.exception
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+from get4for6.modules.m_dns._dns_qh._DNSWireQuery import _DNSWireQuery
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class _DNSWireHelpers(UninstantiableClassMixin):
+    # These functions work directly with DNS messages in wire format (RFC 1035, section 4.1), so that messages which do
+    #  not need to be modified in any complicated way do not have to be parsed and re-serialized using 'dnspython'.
+
+    _HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!HHHHHH")  # ID, flags, QDCOUNT, ANCOUNT, NSCOUNT, ARCOUNT
+    _QUESTION_TAIL_STRUCT: Final[struct.Struct] = struct.Struct("!HH")  # QTYPE, QCLASS
+    _OPT_RECORD_TAIL_STRUCT: Final[struct.Struct] = struct.Struct("!HHIH")  # TYPE, CLASS (= payload size), TTL (= extended RCODE, version & flags), RDLENGTH
+    _RECORD_TAIL_STRUCT: Final[struct.Struct] = struct.Struct("!HHIH")  # TYPE, CLASS, TTL, RDLENGTH
+    _TTL_STRUCT: Final[struct.Struct] = struct.Struct("!I")
+    _SOA_MINIMUM_STRUCT: Final[struct.Struct] = struct.Struct("!I")  # The last field of 'SOA' RDATA
+    _MIN_SOA_RDATA_LENGTH: Final[int] = 22  # Two root domain names & five 32-bit integers
+    _TTL_OFFSET_IN_RECORD_TAIL: Final[int] = 4
+    _HEADER_SIZE: Final[int] = 12
+    _MAX_LABEL_LENGTH: Final[int] = 63
+
+    @classmethod
+    def parse_query(cls, query_bytes: bytes) -> Optional[_DNSWireQuery]:
+        """
+        Returns 'None' if the message is not a query with exactly one question, no records apart from an optional EDNS0
+         'OPT' pseudo-record, and an uncompressed qname. The header flags are NOT validated by this method.
+        """
+
+        if len(query_bytes) < cls._HEADER_SIZE:
+            return None
+
+        msg_id, flags, qdcount, ancount, nscount, arcount = cls._HEADER_STRUCT.unpack_from(query_bytes, 0)
+        if (qdcount != 1) or (ancount != 0) or (nscount != 0) or (arcount > 1):
+            return None
+
+        parsed_qname = cls._parse_uncompressed_name(query_bytes, cls._HEADER_SIZE)
+        if parsed_qname is None:
+            return None
+        qname, qname_end = parsed_qname
+
+        offset = (qname_end + cls._QUESTION_TAIL_STRUCT.size)
+        if len(query_bytes) < offset:
+            return None
+        qtype, qclass = cls._QUESTION_TAIL_STRUCT.unpack_from(query_bytes, qname_end)
+
+        edns, ednsflags, payload, edns_options = -1, 0, 0, b""
+        if arcount == 1:
+            # The only record a query may contain is an 'OPT' pseudo-record, whose owner name is the root domain
+            if (len(query_bytes) < (offset + 1 + cls._OPT_RECORD_TAIL_STRUCT.size)) or (query_bytes[offset] != 0):
+                return None
+
+            rrtype, payload, ttl, rdlength = cls._OPT_RECORD_TAIL_STRUCT.unpack_from(query_bytes, offset + 1)
+            if rrtype != dns.rdatatype.OPT:
+                return None
+
+            edns, ednsflags = ((ttl >> 16) & 0xff), (ttl & 0xffff)
+            offset += (1 + cls._OPT_RECORD_TAIL_STRUCT.size)
+            edns_options = query_bytes[offset:(offset + rdlength)]
+            offset += rdlength
+
+        if offset != len(query_bytes):
+            return None  # Either the message has been cut off, or there is trailing junk after it
+
+        return _DNSWireQuery(
+            wire=query_bytes,
+            id=msg_id,
+            flags=flags,
+            qname=qname,
+            qname_end=qname_end,
+            qtype=qtype,
+            qclass=qclass,
+            edns=edns,
+            ednsflags=ednsflags,
+            payload=payload,
+            edns_options=edns_options
+        )
+
+    @classmethod
+    def _parse_uncompressed_name(cls, msg_bytes: bytes, offset: int) -> Optional[tuple[dns.name.Name, int]]:
+        labels = []
+        while True:
+            if offset >= len(msg_bytes):
+                return None
+
+            label_length = msg_bytes[offset]
+            if label_length > cls._MAX_LABEL_LENGTH:
+                return None  # Compression pointers and extended label types are not supported
+
+            label_end = (offset + 1 + label_length)
+            if label_end > len(msg_bytes):
+                return None
+
+            labels.append(msg_bytes[(offset + 1):label_end])
+            offset = label_end
+
+            if label_length == 0:
+                break
+
+        try:
+            return dns.name.Name(labels), offset
+        except dns.exception.DNSException:  # e.g. the name is too long
+            return None
+
+    @classmethod
+    def _skip_possibly_compressed_name(cls, msg_bytes: bytes, offset: int) -> Optional[int]:
+        while True:
+            if offset >= len(msg_bytes):
+                return None
+
+            label_length = msg_bytes[offset]
+            if label_length == 0:
+                return offset + 1
+
+            if (label_length & 0xc0) == 0xc0:
+                return offset + 2  # A compression pointer always ends the name
+
+            if label_length > cls._MAX_LABEL_LENGTH:
+                return None  # Extended label types are not supported
+
+            offset += (1 + label_length)
+
+    @classmethod
+    def find_ttl_offsets(cls, msg_bytes: bytes) -> Optional[list[int]]:
+        """
+        Returns the offsets of the TTL fields of all the records in the message's ANSWER, AUTHORITY and ADDITIONAL
+         sections, except for the EDNS0 'OPT' pseudo-record, whose TTL field has a different meaning. Returns None if
+         the message is malformed.
+        """
+
+        if len(msg_bytes) < cls._HEADER_SIZE:
+            return None
+
+        _, _, qdcount, ancount, nscount, arcount = cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)
+
+        offset = cls._HEADER_SIZE
+        for _ in range(qdcount):
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if offset is None:
+                return None
+            offset += cls._QUESTION_TAIL_STRUCT.size
+
+        ttl_offsets = []
+        for _ in range(ancount + nscount + arcount):
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if (offset is None) or (len(msg_bytes) < (offset + cls._RECORD_TAIL_STRUCT.size)):
+                return None
+
+            rrtype, _, _, rdlength = cls._RECORD_TAIL_STRUCT.unpack_from(msg_bytes, offset)
+            if rrtype != dns.rdatatype.OPT:
+                ttl_offsets.append(offset + cls._TTL_OFFSET_IN_RECORD_TAIL)
+
+            offset += (cls._RECORD_TAIL_STRUCT.size + rdlength)
+
+        if offset != len(msg_bytes):
+            return None
+
+        return ttl_offsets
+
+    @classmethod
+    def get_negative_caching_ttl(cls, msg_bytes: bytes) -> Optional[int]:
+        """
+        Returns the TTL for which a negative (NXDOMAIN or NODATA) response may be cached as per RFC 2308, section 5, i.e.
+         the minimum of the TTL of the 'SOA' record in the AUTHORITY section and its MINIMUM field. Returns None if the
+         message is malformed or if there is no 'SOA' record in its AUTHORITY section.
+        """
+
+        if len(msg_bytes) < cls._HEADER_SIZE:
+            return None
+
+        _, _, qdcount, ancount, nscount, _ = cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)
+
+        offset = cls._HEADER_SIZE
+        for _ in range(qdcount):
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if offset is None:
+                return None
+            offset += cls._QUESTION_TAIL_STRUCT.size
+
+        for record_index in range(ancount + nscount):
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if (offset is None) or (len(msg_bytes) < (offset + cls._RECORD_TAIL_STRUCT.size)):
+                return None
+
+            rrtype, _, ttl, rdlength = cls._RECORD_TAIL_STRUCT.unpack_from(msg_bytes, offset)
+            offset += (cls._RECORD_TAIL_STRUCT.size + rdlength)
+            if len(msg_bytes) < offset:
+                return None
+
+            if (record_index >= ancount) and (rrtype == dns.rdatatype.SOA) and (rdlength >= cls._MIN_SOA_RDATA_LENGTH):
+                soa_minimum = cls._SOA_MINIMUM_STRUCT.unpack_from(msg_bytes, offset - cls._SOA_MINIMUM_STRUCT.size)[0]
+                return min(ttl, soa_minimum)
+
+        return None
+
+    @classmethod
+    def _find_opt_record(cls, msg_bytes: bytes) -> Optional[tuple[int, int]]:  # (start offset, end offset)
+        # Returns None if the message is malformed or if there is no EDNS0 'OPT' pseudo-record in its ADDITIONAL section
+        if len(msg_bytes) < cls._HEADER_SIZE:
+            return None
+
+        _, _, qdcount, ancount, nscount, arcount = cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)
+
+        offset = cls._HEADER_SIZE
+        for _ in range(qdcount):
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if offset is None:
+                return None
+            offset += cls._QUESTION_TAIL_STRUCT.size
+
+        for record_index in range(ancount + nscount + arcount):
+            record_start = offset
+            offset = cls._skip_possibly_compressed_name(msg_bytes, offset)
+            if (offset is None) or (len(msg_bytes) < (offset + cls._RECORD_TAIL_STRUCT.size)):
+                return None
+
+            rrtype, _, _, rdlength = cls._RECORD_TAIL_STRUCT.unpack_from(msg_bytes, offset)
+            offset += (cls._RECORD_TAIL_STRUCT.size + rdlength)
+            if len(msg_bytes) < offset:
+                return None
+
+            # The owner name of an 'OPT' pseudo-record is always the root domain, i.e. a single zero byte
+            if (record_index >= (ancount + nscount)) and (rrtype == dns.rdatatype.OPT) and ((offset - record_start) == (1 + cls._OPT_RECORD_TAIL_STRUCT.size + rdlength)):
+                return record_start, offset
+
+        return None
+
+    @classmethod
+    def replace_edns_payload_size(cls, msg_bytes: bytes, new_payload: int) -> bytes:
+        """
+        Replaces the UDP payload size advertised in the message's EDNS0 'OPT' pseudo-record. If the message does not
+         contain such record (or if it is malformed), it is returned unchanged.
+        """
+
+        opt_record = cls._find_opt_record(msg_bytes)
+        if opt_record is None:
+            return msg_bytes
+
+        payload_offset = (opt_record[0] + 1 + 2)  # Root domain name, TYPE
+
+        return msg_bytes[0:payload_offset] + new_payload.to_bytes(2, byteorder="big", signed=False) + msg_bytes[(payload_offset + 2):]
+
+    @classmethod
+    def truncate_response(cls, response_bytes: bytes, max_size: int) -> Optional[bytes]:
+        """
+        If the response is larger than 'max_size' bytes, a response with the TC flag set, which contains only the
+         header, the question and the EDNS0 'OPT' pseudo-record (if there is one), is made from it, so that the client
+         retries the query over TCP (RFC 1035, section 4.2.1 and RFC 6891, section 7). Returns None if the response is
+         malformed.
+
+        CONTEXT: 'max_size' is at least 512 bytes.
+        """
+
+        if len(response_bytes) <= max_size:
+            return response_bytes
+
+        msg_id, flags, qdcount, _, _, _ = cls._HEADER_STRUCT.unpack_from(response_bytes, 0)
+        if qdcount != 1:
+            return None
+
+        question_end = cls._skip_possibly_compressed_name(response_bytes, cls._HEADER_SIZE)
+        if (question_end is None) or (len(response_bytes) < (question_end + cls._QUESTION_TAIL_STRUCT.size)):
+            return None
+        question_end += cls._QUESTION_TAIL_STRUCT.size
+
+        opt_record = cls._find_opt_record(response_bytes)
+        opt_record_bytes = (response_bytes[opt_record[0]:opt_record[1]] if (opt_record is not None) else b"")
+
+        truncated_response_bytes = (
+            cls._HEADER_STRUCT.pack(msg_id, (flags | dns.flags.TC), 1, 0, 0, (1 if opt_record_bytes else 0)) +
+            response_bytes[cls._HEADER_SIZE:question_end] +
+            opt_record_bytes
+        )
+        if len(truncated_response_bytes) > max_size:
+            return None  # This should never happen - the 'OPT' record would have to contain huge options
+
+        return truncated_response_bytes
+
+    @classmethod
+    def get_ttls(cls, msg_bytes: bytes, ttl_offsets: list[int]) -> list[int]:
+        """
+        CONTEXT: 'ttl_offsets' has been obtained using 'find_ttl_offsets()'.
+        """
+
+        return [cls._TTL_STRUCT.unpack_from(msg_bytes, ttl_offset)[0] for ttl_offset in ttl_offsets]
+
+    @classmethod
+    def replace_ttls(cls, msg_bytes: bytes, ttl_offsets: list[int], new_ttls: list[int]) -> bytes:
+        """
+        CONTEXT: 'ttl_offsets' has been obtained using 'find_ttl_offsets()', and 'new_ttls' has the same length.
+        """
+
+        msg_buffer = bytearray(msg_bytes)
+        for ttl_offset, new_ttl in zip(ttl_offsets, new_ttls):
+            cls._TTL_STRUCT.pack_into(msg_buffer, ttl_offset, new_ttl)
+
+        return bytes(msg_buffer)
+
+    @classmethod
+    def get_id(cls, msg_bytes: bytes) -> int:
+        """
+        CONTEXT: 'msg_bytes' is at least as long as a DNS message header.
+        """
+
+        return cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)[0]
+
+    @classmethod
+    def get_flags(cls, msg_bytes: bytes) -> int:
+        """
+        CONTEXT: 'msg_bytes' is at least as long as a DNS message header.
+        """
+
+        return cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)[1]
+
+    @classmethod
+    def get_rcode(cls, msg_bytes: bytes) -> int:
+        """
+        Unlike 'dns.rcode.from_flags(flags, 0)', takes the extended RCODE bits stored in the EDNS0 'OPT' pseudo-record
+         (if there is one) into account as well (RFC 6891, section 6.1.3).
+
+        CONTEXT: 'msg_bytes' is at least as long as a DNS message header.
+        """
+
+        opt_record = cls._find_opt_record(msg_bytes)
+        opt_ttl = (cls._TTL_STRUCT.unpack_from(msg_bytes, (opt_record[0] + 1 + cls._TTL_OFFSET_IN_RECORD_TAIL))[0] if (opt_record is not None) else 0)  # Root domain name, TYPE, CLASS
+
+        return dns.rcode.from_flags(cls.get_flags(msg_bytes), opt_ttl)
+
+    @classmethod
+    def get_answer_count(cls, msg_bytes: bytes) -> int:
+        """
+        CONTEXT: 'msg_bytes' is at least as long as a DNS message header.
+        """
+
+        return cls._HEADER_STRUCT.unpack_from(msg_bytes, 0)[3]
+
+    @staticmethod
+    def replace_id(msg_bytes: bytes, new_id: int) -> bytes:
+        return new_id.to_bytes(2, byteorder="big", signed=False) + msg_bytes[2:]
+
+    @classmethod
+    def clear_flags(cls, msg_bytes: bytes, cleared_flags: int) -> bytes:
+        """
+        CONTEXT: 'msg_bytes' is at least as long as a DNS message header.
+        """
+
+        new_flags = (cls.get_flags(msg_bytes) & (~cleared_flags) & 0xffff)
+
+        return msg_bytes[0:2] + new_flags.to_bytes(2, byteorder="big", signed=False) + msg_bytes[4:]
+
+    @classmethod
+    def does_response_match_query(cls, response_bytes: bytes, wire_query: _DNSWireQuery) -> bool:
+        """
+        Checks whether the message is a response to the query, i.e. whether it has got the same ID, opcode and question.
+         The contents of the response are NOT validated.
+        """
+
+        if len(response_bytes) < cls._HEADER_SIZE:
+            return False
+
+        msg_id, flags, qdcount, _, _, _ = cls._HEADER_STRUCT.unpack_from(response_bytes, 0)
+        if (
+            (msg_id != wire_query.id) or
+            (not (flags & dns.flags.QR)) or
+            (dns.opcode.from_flags(flags) != dns.opcode.from_flags(wire_query.flags)) or
+            (qdcount != 1)
+        ):
+            return False
+
+        parsed_qname = cls._parse_uncompressed_name(response_bytes, cls._HEADER_SIZE)
+        if parsed_qname is None:
+            return False
+        qname, qname_end = parsed_qname
+
+        if len(response_bytes) < (qname_end + cls._QUESTION_TAIL_STRUCT.size):
+            return False
+        qtype, qclass = cls._QUESTION_TAIL_STRUCT.unpack_from(response_bytes, qname_end)
+
+        return (qname == wire_query.qname) and (qtype == wire_query.qtype) and (qclass == wire_query.qclass)  # 'dns.name.Name' objects are compared case-insensitively
+
+    @classmethod
+    def is_upstream_response_acceptable(cls, response_bytes: bytes, wire_query: _DNSWireQuery) -> bool:
+        """
+        CONTEXT: 'does_response_match_query()' returned 'True' for the response and the query.
+        """
+
+        flags = cls.get_flags(response_bytes)
+
+        # Some of these *basic* (i.e. the response is not guaranteed to be *completely* valid, but the basics should be
+        #  OK) checks are performed to make sure that the code which later works with the response (be it this program
+        #  or the client) will not receive completely wrong data.
+        return bool(
+            (cls.get_rcode(response_bytes) in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN)) and
+            (not (flags & dns.flags.TC)) and
+            (bool(flags & dns.flags.RD) == bool(wire_query.flags & dns.flags.RD)) and
+            (flags & dns.flags.RA)  # The upstream server must support recursion
+        )
+
+    @classmethod
+    def adapt_shared_response_for_query(cls, shared_response_bytes: bytes, wire_query: _DNSWireQuery) -> bytes:
+        """
+        Makes a response, which might have been obtained for another client's identical query, usable as a response to
+         'wire_query' - its ID is replaced, and the question is copied from 'wire_query', so that the letter case of the
+         queried name is preserved (some resolvers randomize it and check that it has not changed in the response).
+
+        CONTEXT: 'does_response_match_query()' returned 'True' for the response and a query with the same question.
+        """
+
+        question_bytes = wire_query.wire[cls._HEADER_SIZE:wire_query.qname_end]
+        if shared_response_bytes[cls._HEADER_SIZE:wire_query.qname_end].lower() != question_bytes.lower():
+            question_bytes = shared_response_bytes[cls._HEADER_SIZE:wire_query.qname_end]  # This should never happen
+
+        return (
+            wire_query.wire[0:2] +
+            shared_response_bytes[2:cls._HEADER_SIZE] +
+            question_bytes +
+            shared_response_bytes[wire_query.qname_end:]
+        )
@@ -0,0 +1,44 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import dataclasses
+import dns.name
+
+
+@dataclasses.dataclass(frozen=True)
+class _DNSWireQuery:
+    """
+    The result of a minimal parse of a DNS query message in wire format, which is performed by
+     '_DNSWireHelpers.parse_query()'. Only the header, the question and the EDNS0 'OPT' pseudo-record are looked at.
+    """
+
+    wire: bytes
+    id: int
+    flags: int
+    qname: dns.name.Name
+    qname_end: int  # The offset in 'wire' at which the (uncompressed) qname ends
+    qtype: int
+    qclass: int
+    edns: int  # -1 if the query does not contain an 'OPT' record, like in 'dns.message.Message'
+    ednsflags: int
+    payload: int  # The UDP payload size advertised by the client in the 'OPT' record; 0 if there is no such record
+    edns_options: bytes  # The raw RDATA (i.e. the EDNS options) of the 'OPT' record; empty if there is no such record
@@ -0,0 +1,117 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import asyncio
+import multiprocessing
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.modules.ModuleIface import ModuleIface
+from get4for6.modules.m_dns._dns_qh._DNSClientRateLimiter import _DNSClientRateLimiter  # noqa
+from get4for6.modules.m_dnsworkers._DNSWorkerProcessMain import _DNSWorkerProcessMain
+from get4for6.modules.m_dnsworkers._SubstituteAddressMapperIPCServer import _SubstituteAddressMapperIPCServer
+from get4for6.modules.m_dnsworkers._DNSWorkerControlIPCServer import _DNSWorkerControlIPCServer
+
+
+# This module is run only if the DNS module is configured to use more than one worker process. The main process's DNS
+#  module acts as the first worker, so this module spawns 'workers - 1' additional processes, each of which binds its
+#  own DNS sockets using SO_REUSEPORT and forwards substitute address mapping operations to the main process.
+class DNSWorkersModule(ModuleIface):
+    # Forking a process which is running an event loop and a logger thread is not safe, so a fresh interpreter is
+    #  started for each worker instead.
+    _MULTIPROCESSING_START_METHOD: Final[str] = "spawn"
+    _WORKER_TERMINATION_TIMEOUT: Final[float] = 5.0
+
+    def __init__(self, client_rate_limiter: Optional[_DNSClientRateLimiter]):
+        # The main process's DNS module's rate limiter, which limits the new substitute address assignments requested
+        #  by the worker processes too
+        self._client_rate_limiter: Final[Optional[_DNSClientRateLimiter]] = client_rate_limiter
+
+    async def run(self) -> None:
+        await self._run()
+
+    @DI_NS.inject_dependencies("termination_event")  # The 'run()' method has no arguments in 'ModuleIface'
+    async def _run(self, termination_event: asyncio.Event) -> None:
+        workers = []
+        try:
+            self._start_workers(workers)
+
+            await termination_event.wait()
+        finally:
+            await self._stop_workers(workers)
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    def _start_workers(self, workers: list[tuple[multiprocessing.Process, _SubstituteAddressMapperIPCServer, _DNSWorkerControlIPCServer]], configuration: Configuration, logger: Logger) -> None:
+        multiprocessing_context = multiprocessing.get_context(self.__class__._MULTIPROCESSING_START_METHOD)
+
+        for worker_number in range(2, configuration.dns.workers + 1):
+            main_process_connection, worker_process_connection = multiprocessing_context.Pipe(duplex=True)
+
+            # The workers' statuses (metrics and cache sizes) and the admin commands affecting the workers are sent over
+            #  a separate connection, so that they do not get in the way of the time-critical substitute address
+            #  mapping requests.
+            main_process_control_connection, worker_process_control_connection = multiprocessing_context.Pipe(duplex=True)
+
+            process = multiprocessing_context.Process(
+                target=_DNSWorkerProcessMain(configuration, worker_process_connection, worker_process_control_connection, worker_number).main,
+                name=f"get4for6-dns-worker-{worker_number}",
+                daemon=True
+            )
+            process.start()
+            worker_process_connection.close()  # The worker process has got its own copy of the connections
+            worker_process_control_connection.close()
+
+            worker_description = f"DNS worker process #{worker_number} (PID: {process.pid})"
+
+            ipc_server = _SubstituteAddressMapperIPCServer(main_process_connection, worker_description, self._client_rate_limiter)
+            ipc_server.start()
+
+            control_server = _DNSWorkerControlIPCServer(main_process_control_connection, worker_number, worker_description)
+            control_server.start()
+
+            workers.append((process, ipc_server, control_server))
+            logger.debug(f"DNS worker process #{worker_number} has been started (PID: {process.pid}).", LogFacilities.DNS_WORKER_START)
+
+    @DI_NS.inject_dependencies("logger")
+    async def _stop_workers(self, workers: list[tuple[multiprocessing.Process, _SubstituteAddressMapperIPCServer, _DNSWorkerControlIPCServer]], logger: Logger) -> None:
+        loop = asyncio.get_running_loop()
+
+        # The workers are asked to terminate all at once, so that they can shut down in parallel
+        for process, _, _ in workers:
+            if process.is_alive():
+                process.terminate()
+
+        for process, ipc_server, control_server in workers:
+            pid = process.pid
+            await loop.run_in_executor(None, process.join, self.__class__._WORKER_TERMINATION_TIMEOUT)
+            if process.is_alive():
+                logger.warning(f"The DNS worker process {pid} has not terminated in time - killing it!", LogFacilities.DNS_WORKER_STOP)
+                process.kill()
+                await loop.run_in_executor(None, process.join)
+
+            ipc_server.stop()
+            control_server.stop()
+            process.close()
+
+            logger.debug(f"The DNS worker process {pid} has been stopped.", LogFacilities.DNS_WORKER_STOP)
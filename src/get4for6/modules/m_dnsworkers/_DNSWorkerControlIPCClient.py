@@ -0,0 +1,89 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import asyncio
+import multiprocessing.connection
+from get4for6.di import DI_NS
+from get4for6.config.Configuration import Configuration
+from get4for6.logger.Logger import Logger
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
+from get4for6.modules.m_dnsworkers._DNSWorkerControlIPCMessages import _DNSWorkerControlIPCMessages
+
+
+class _DNSWorkerControlIPCClient:
+    """
+    Periodically sends the status of a DNS worker process (the sizes of its caches and, if the metrics are exposed,
+     a snapshot of its metrics registry) to the main process, and carries out the commands which the main process sends
+     on behalf of the 'admin' module (see '_DNSWorkerControlIPCServer').
+    """
+
+    _STATUS_INTERVAL: Final[float] = 1.0
+
+    def __init__(self, ipc_connection: multiprocessing.connection.Connection):
+        self._ipc_connection: Final[multiprocessing.connection.Connection] = ipc_connection
+        self._status_acknowledged: Final[asyncio.Event] = asyncio.Event()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self._ipc_connection.fileno(), self._handle_pending_messages)
+        try:
+            await self._send_statuses()
+        finally:
+            loop.remove_reader(self._ipc_connection.fileno())
+
+    @DI_NS.inject_dependencies("configuration", "metrics_registry", "cache_registry")
+    async def _send_statuses(self, configuration: Configuration, metrics_registry: MetricsRegistry, cache_registry: CacheRegistry) -> None:
+        self._status_acknowledged.set()
+        while True:
+            # A new status is sent only after the main process has received the previous one, so there is at most one
+            #  status in the connection's buffer at any time, and sending it never blocks the event loop.
+            await self._status_acknowledged.wait()
+            self._status_acknowledged.clear()
+
+            metrics_snapshot = (metrics_registry.take_snapshot() if (configuration.metrics is not None) else None)
+            self._ipc_connection.send_bytes(_DNSWorkerControlIPCMessages.encode_status(metrics_snapshot, cache_registry.get_entry_counts()))
+
+            await asyncio.sleep(self.__class__._STATUS_INTERVAL)
+
+    def _handle_pending_messages(self) -> None:
+        try:
+            while self._ipc_connection.poll(0):
+                self._handle_message(self._ipc_connection.recv_bytes())
+        except (EOFError, OSError):
+            # The main process has gone away - the worker process gets terminated by the substitute address mapper's
+            #  IPC client, which watches for the same situation.
+            asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+
+    @DI_NS.inject_dependencies("cache_registry", "logger")
+    def _handle_message(self, message_bytes: bytes, cache_registry: CacheRegistry, logger: Logger) -> None:
+        message = _DNSWorkerControlIPCMessages.decode(message_bytes)
+        if message is None:
+            return  # Should never happen, as the message comes from this program's main process
+
+        if message["type"] == _DNSWorkerControlIPCMessages.TYPE_STATUS_ACKNOWLEDGEMENT:
+            self._status_acknowledged.set()
+        elif message["type"] == _DNSWorkerControlIPCMessages.TYPE_FLUSH_CACHE:
+            cache_registry.flush_cache(message["cache_name"])
+        elif message["type"] == _DNSWorkerControlIPCMessages.TYPE_SET_DEBUG_MESSAGES_FROM:
+            logger.set_debug_messages_from(frozenset(message["facilities"]))
@@ -0,0 +1,73 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Any
+import json
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class _DNSWorkerControlIPCMessages(UninstantiableClassMixin):
+    # Unlike the substitute address mapping messages, the control messages are exchanged only occasionally, so they are
+    #  encoded as JSON objects for simplicity (each of them is carried by a single 'send_bytes()' call).
+
+    TYPE_STATUS: Final[str] = "status"  # Worker process -> main process
+    TYPE_STATUS_ACKNOWLEDGEMENT: Final[str] = "status_acknowledgement"  # Main process -> worker process
+    TYPE_FLUSH_CACHE: Final[str] = "flush_cache"  # Main process -> worker process
+    TYPE_SET_DEBUG_MESSAGES_FROM: Final[str] = "set_debug_messages_from"  # Main process -> worker process
+
+    @classmethod
+    def encode_status(cls, metrics_snapshot: Optional[dict[str, list[tuple[tuple[str, ...], Any]]]], cache_entry_counts: list[tuple[str, int]]) -> bytes:
+        return cls._encode({"type": cls.TYPE_STATUS, "metrics_snapshot": metrics_snapshot, "cache_entry_counts": cache_entry_counts})
+
+    @classmethod
+    def encode_status_acknowledgement(cls) -> bytes:
+        return cls._encode({"type": cls.TYPE_STATUS_ACKNOWLEDGEMENT})
+
+    @classmethod
+    def encode_flush_cache(cls, cache_name: str) -> bytes:
+        return cls._encode({"type": cls.TYPE_FLUSH_CACHE, "cache_name": cache_name})
+
+    @classmethod
+    def encode_set_debug_messages_from(cls, facilities: frozenset[str]) -> bytes:
+        return cls._encode({"type": cls.TYPE_SET_DEBUG_MESSAGES_FROM, "facilities": sorted(facilities)})
+
+    @staticmethod
+    def _encode(message: dict[str, Any]) -> bytes:
+        return json.dumps(message).encode("utf-8")
+
+    @staticmethod
+    def decode(message_bytes: bytes) -> Optional[dict[str, Any]]:
+        """
+        The returned message always contains the "type" key. Its other keys are not checked, as the messages come from
+         this program's own processes.
+        """
+
+        try:
+            message = json.loads(message_bytes)
+        except ValueError:  # json.JSONDecodeError and UnicodeDecodeError are subclasses of ValueError
+            return None
+
+        if (not isinstance(message, dict)) or (not isinstance(message.get("type"), str)):
+            return None
+
+        return message
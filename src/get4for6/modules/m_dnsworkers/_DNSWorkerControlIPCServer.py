@@ -0,0 +1,118 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Any
+import asyncio
+import functools
+import multiprocessing.connection
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
+from get4for6.modules.m_dnsworkers._DNSWorkerControlIPCMessages import _DNSWorkerControlIPCMessages
+
+
+class _DNSWorkerControlIPCServer:
+    """
+    Receives the statuses sent by a single DNS worker process (see '_DNSWorkerControlIPCClient') - the worker's metrics
+     get merged into the main process's metrics registry, and the worker's caches get registered in the main process's
+     cache registry, so that the 'admin' module can inspect and flush them. Changes of the debug message facilities
+     made in the main process are forwarded to the worker as well.
+    """
+
+    def __init__(self, ipc_connection: multiprocessing.connection.Connection, worker_number: int, worker_description: str):
+        self._ipc_connection: Final[multiprocessing.connection.Connection] = ipc_connection
+        self._worker_number: Final[int] = worker_number
+        self._worker_description: Final[str] = worker_description
+        self._cache_entry_counts: Final[dict[str, int]] = dict()  # The worker's cache name -> the last reported number of its entries
+        self._started: bool = False
+        self._reading: bool = False
+
+    @DI_NS.inject_dependencies("logger")
+    def start(self, logger: Logger) -> None:
+        assert (not self._started)
+
+        asyncio.get_running_loop().add_reader(self._ipc_connection.fileno(), self._handle_pending_messages)
+        logger.add_debug_messages_from_listener(self._send_debug_messages_from)
+        self._started = True
+        self._reading = True
+
+    @DI_NS.inject_dependencies("cache_registry", "logger")
+    def stop(self, cache_registry: CacheRegistry, logger: Logger) -> None:
+        if self._started:
+            if self._reading:
+                asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+                self._reading = False
+
+            logger.remove_debug_messages_from_listener(self._send_debug_messages_from)
+            for cache_name in self._cache_entry_counts:
+                cache_registry.unregister_cache(self._get_registered_cache_name(cache_name))
+
+            self._started = False
+
+        self._ipc_connection.close()
+
+    def _handle_pending_messages(self) -> None:
+        try:
+            while self._ipc_connection.poll(0):
+                message = _DNSWorkerControlIPCMessages.decode(self._ipc_connection.recv_bytes())
+                if (message is None) or (message["type"] != _DNSWorkerControlIPCMessages.TYPE_STATUS):
+                    continue  # Should never happen, as the message comes from this program's own worker process
+
+                self._handle_status(message)
+                self._send_message(_DNSWorkerControlIPCMessages.encode_status_acknowledgement())
+        except (EOFError, OSError):
+            # The worker's disconnection is reported by its substitute address mapper's IPC server
+            asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+            self._reading = False
+
+    @DI_NS.inject_dependencies("metrics_registry", "cache_registry")
+    def _handle_status(self, message: dict[str, Any], metrics_registry: MetricsRegistry, cache_registry: CacheRegistry) -> None:
+        if message["metrics_snapshot"] is not None:
+            metrics_registry.set_foreign_snapshot(self._worker_description, message["metrics_snapshot"])
+
+        for cache_name, entry_count in message["cache_entry_counts"]:
+            if cache_name not in self._cache_entry_counts:
+                cache_registry.register_cache(
+                    self._get_registered_cache_name(cache_name),
+                    functools.partial(self._cache_entry_counts.__getitem__, cache_name),
+                    functools.partial(self._flush_cache, cache_name)
+                )
+
+            self._cache_entry_counts[cache_name] = entry_count
+
+    def _flush_cache(self, cache_name: str) -> None:
+        # The worker reports the new size of the cache in its next status; until then, the cache is considered empty
+        self._cache_entry_counts[cache_name] = 0
+        self._send_message(_DNSWorkerControlIPCMessages.encode_flush_cache(cache_name))
+
+    def _send_debug_messages_from(self, facilities: frozenset[str]) -> None:
+        self._send_message(_DNSWorkerControlIPCMessages.encode_set_debug_messages_from(facilities))
+
+    def _send_message(self, message_bytes: bytes) -> None:
+        try:
+            self._ipc_connection.send_bytes(message_bytes)
+        except OSError:
+            pass  # The worker's disconnection is reported by its substitute address mapper's IPC server
+
+    def _get_registered_cache_name(self, cache_name: str) -> str:
+        return f"{cache_name} (DNS worker #{self._worker_number})"
@@ -0,0 +1,129 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, NoReturn
+import sys
+import os
+import dataclasses
+import asyncio
+import multiprocessing.connection
+from get4for6.Get4For6Constants import Get4For6Constants
+from get4for6.config.Configuration import Configuration
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.logger.exc.LoggerBaseExc import LoggerBaseExc
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.caches.CacheRegistry import CacheRegistry
+from get4for6.di import DI_NS
+from get4for6.di.Get4For6DependencyProvider import Get4For6DependencyProvider
+from get4for6.exc.Get4For6BaseExc import Get4For6BaseExc
+from get4for6.addr_mapper.client.ClientAddressMapper import ClientAddressMapper
+from get4for6.modules.m_dns.DNSModule import DNSModule
+from get4for6.modules.m_dnsworkers._SubstituteAddressMapperIPCClient import _SubstituteAddressMapperIPCClient
+from get4for6.modules.m_dnsworkers._DNSWorkerControlIPCClient import _DNSWorkerControlIPCClient
+
+
+class _DNSWorkerProcessMain:
+    """
+    The entry point of a DNS worker process - it runs its own instance of the DNS module, whose substitute address
+     mapping operations are forwarded to the main process over an IPC connection.
+    """
+
+    _CRASH_MESSAGE_BANNER: Final[str] = "! ERROR (DNS worker):"
+    _CRASH_EXIT_CODE: Final[int] = 1
+
+    def __init__(self, configuration: Configuration, ipc_connection: multiprocessing.connection.Connection, control_ipc_connection: multiprocessing.connection.Connection, worker_number: int):
+        # This object gets pickled and passed to the newly spawned process
+        self._configuration: Final[Configuration] = configuration
+        self._ipc_connection: Final[multiprocessing.connection.Connection] = ipc_connection
+        self._control_ipc_connection: Final[multiprocessing.connection.Connection] = control_ipc_connection
+        self._worker_number: Final[int] = worker_number
+
+    def main(self) -> None:
+        asyncio.run(self._async_main())
+
+    async def _async_main(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        termination_event = asyncio.Event()
+        for signal in Get4For6Constants.TERMINATION_SIGNALS:
+            loop.add_signal_handler(signal, termination_event.set)
+        for signal in Get4For6Constants.PRINT_MAP_SIGNALS:
+            loop.add_signal_handler(signal, lambda: None)  # The address mappings are printed out by the main process
+
+        substitute_address_mapper = _SubstituteAddressMapperIPCClient(self._ipc_connection)
+        substitute_address_mapper.start(disconnection_callback=termination_event.set)
+
+        with self._create_logger_instance() as logger:
+            DI_NS.set_dependency_provider(Get4For6DependencyProvider(
+                configuration=self._configuration,
+                logger=logger,
+                metrics_registry=MetricsRegistry(),  # Sent to the main process, which runs the metrics module
+                cache_registry=CacheRegistry(),  # Controlled by the main process, which runs the admin module
+                termination_event=termination_event,
+                print_map_event=asyncio.Event(),  # Never set
+                client_address_mapper=ClientAddressMapper(
+                    client_allowed_subnets=self._configuration.translation.client_allowed_subnets,
+                    map_client_addrs_into=self._configuration.translation.map_client_addrs_into
+                ),
+                substitute_address_mapper=substitute_address_mapper  # noqa - Provides the mapping methods the DNS module uses
+            ))
+
+            logger.debug(f"DNS worker process #{self._worker_number} is running; PID: {os.getpid()}", LogFacilities.DNS_WORKER_START)
+
+            await self._run_dns_module()
+
+            logger.debug(f"DNS worker process #{self._worker_number} will now terminate.", LogFacilities.DNS_WORKER_STOP)
+
+    def _create_logger_instance(self) -> Logger:
+        # Each worker process writes its own log record file, as the files are rotated independently of each other.
+        record_file = self._configuration.general.log_record_file
+        if record_file is not None:
+            record_file = dataclasses.replace(record_file, path=f"{record_file.path}.dnsworker{self._worker_number}")
+
+        try:
+            return Logger(
+                log_to=Get4For6Constants.LOG_OUTPUT_STREAM,
+                log_debug_messages_from=self._configuration.general.print_debug_messages_from,
+                flush_interval=self._configuration.general.log_flush_interval,
+                flush_after_bytes=self._configuration.general.log_flush_after_bytes,
+                summary_interval=self._configuration.general.log_summary_interval,
+                rate_limiting=self._configuration.general.log_rate_limiting,
+                record_file=record_file
+            )
+        except LoggerBaseExc as e:
+            self._crash_on_exception(e)
+
+    async def _run_dns_module(self) -> None:
+        control_client_task = asyncio.create_task(_DNSWorkerControlIPCClient(self._control_ipc_connection).run())
+
+        try:
+            await DNSModule().run()
+        except Get4For6BaseExc as e:
+            self._crash_on_exception(e)
+        finally:
+            control_client_task.cancel()
+            await asyncio.gather(control_client_task, return_exceptions=True)
+
+    def _crash_on_exception(self, exception: Get4For6BaseExc) -> NoReturn:
+        print(self.__class__._CRASH_MESSAGE_BANNER, str(exception), f"<{exception.__class__.__name__}>", file=sys.stderr, flush=True)
+        sys.exit(self.__class__._CRASH_EXIT_CODE)
@@ -0,0 +1,140 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Union, Optional, Callable
+import asyncio
+import ipaddress
+import multiprocessing.connection
+from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import SubstituteAssignmentNotFoundExc
+from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc import SubstituteIPv4AddressNotAllowedExc
+from get4for6.addr_mapper.substitute.exc.IPv6AddressNotSubstitutableExc import IPv6AddressNotSubstitutableExc
+from get4for6.addr_mapper.substitute.exc.SubstituteAddressSpaceCurrentlyFullExc import SubstituteAddressSpaceCurrentlyFullExc
+from get4for6.modules.m_dnsworkers._SubstituteAddressMapperIPCMessages import _SubstituteAddressMapperIPCMessages
+
+
+class _SubstituteAddressMapperIPCClient:
+    """
+    Stands in for 'SubstituteAddressMapper' in DNS worker processes - the mapping operations (the only methods of the
+     mapper the DNS module uses) are forwarded to the main process, which owns the actual mapper.
+
+    The requests do not block the worker's event loop - the responses are received by a reader callback, which passes
+     them to the coroutines waiting for them, so many requests may be in flight at once.
+    """
+
+    # The main process handles the requests right from its event loop, so it should respond almost instantly - if it
+    #  does not, something is seriously wrong, and the DNS query being resolved is failed.
+    _RESPONSE_TIMEOUT: Final[float] = 1.0
+
+    def __init__(self, ipc_connection: multiprocessing.connection.Connection):
+        self._ipc_connection: Final[multiprocessing.connection.Connection] = ipc_connection
+        self._next_sequence_number: int = 0
+        self._pending_responses: Final[dict[int, asyncio.Future]] = dict()  # Sequence number -> future of the decoded response
+        self._disconnection_callback: Optional[Callable[[], None]] = None
+        self._disconnected: bool = False
+
+    def start(self, disconnection_callback: Callable[[], None]) -> None:
+        """
+        Starts receiving responses from the main process. Once the main process closes the IPC connection (e.g. when it
+         crashes), 'disconnection_callback' gets called, so that the worker process does not outlive it.
+        """
+
+        assert (self._disconnection_callback is None)
+
+        self._disconnection_callback = disconnection_callback
+        asyncio.get_running_loop().add_reader(self._ipc_connection.fileno(), self._handle_pending_responses)
+
+    async def map_substitute_4to6_async(self, ipv4_address: ipaddress.IPv4Address, valid_client_ipv4: ipaddress.IPv4Address) -> tuple[ipaddress.IPv6Address, int]:  # (IPv6 address, external cache lifetime)
+        """
+        :raises SubstituteAssignmentNotFoundExc
+        :raises SubstituteIPv4AddressNotAllowedExc
+        :raises ConnectionError
+        """
+
+        return await self._perform_request(_SubstituteAddressMapperIPCMessages.OPERATION_MAP_4TO6, ipv4_address, valid_client_ipv4)
+
+    async def map_substitute_6to4_async(self, ipv6_address: ipaddress.IPv6Address, valid_client_ipv4: ipaddress.IPv4Address, mapping_creation_allowed: bool) -> tuple[ipaddress.IPv4Address, int]:  # (IPv4 address, external cache lifetime)
+        """
+        :raises SubstituteAssignmentNotFoundExc
+        :raises IPv6AddressNotSubstitutableExc
+        :raises SubstituteAddressSpaceCurrentlyFullExc
+        :raises ConnectionError
+        """
+
+        operation = (_SubstituteAddressMapperIPCMessages.OPERATION_MAP_6TO4_WITH_CREATION if mapping_creation_allowed else _SubstituteAddressMapperIPCMessages.OPERATION_MAP_6TO4)
+
+        return await self._perform_request(operation, ipv6_address, valid_client_ipv4)
+
+    async def _perform_request(self, operation: int, address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address], valid_client_ipv4: ipaddress.IPv4Address) -> tuple[Union[ipaddress.IPv4Address, ipaddress.IPv6Address], int]:
+        if self._disconnected:
+            raise ConnectionError("The IPC connection to the main process has been closed!")
+
+        sequence_number = self._next_sequence_number
+        self._next_sequence_number = (sequence_number + 1) & 0xffffffff
+
+        response_future = asyncio.get_running_loop().create_future()
+        self._pending_responses[sequence_number] = response_future
+        try:
+            self._ipc_connection.send_bytes(_SubstituteAddressMapperIPCMessages.encode_request(sequence_number, operation, valid_client_ipv4, address))
+            decoded_response = await asyncio.wait_for(response_future, timeout=self.__class__._RESPONSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ConnectionError("The main process has not responded to a substitute address mapping request in time!")
+        finally:
+            # Late responses to requests which have already timed out are discarded by '_handle_pending_responses()'
+            self._pending_responses.pop(sequence_number, None)
+
+        _, status, mapped_address, external_cache_lifetime = decoded_response
+        if status == _SubstituteAddressMapperIPCMessages.STATUS_ASSIGNMENT_NOT_FOUND:
+            raise SubstituteAssignmentNotFoundExc(address)
+        if status == _SubstituteAddressMapperIPCMessages.STATUS_IPV4_ADDRESS_NOT_ALLOWED:
+            raise SubstituteIPv4AddressNotAllowedExc(address)
+        if status == _SubstituteAddressMapperIPCMessages.STATUS_IPV6_ADDRESS_NOT_SUBSTITUTABLE:
+            raise IPv6AddressNotSubstitutableExc(address)
+        if status == _SubstituteAddressMapperIPCMessages.STATUS_ADDRESS_SPACE_CURRENTLY_FULL:
+            raise SubstituteAddressSpaceCurrentlyFullExc()
+        if (status != _SubstituteAddressMapperIPCMessages.STATUS_SUCCESS) or (mapped_address is None) or (mapped_address.version == address.version):
+            raise ConnectionError("The main process has sent an invalid response to a substitute address mapping request!")
+
+        return mapped_address, external_cache_lifetime
+
+    def _handle_pending_responses(self) -> None:
+        try:
+            while self._ipc_connection.poll(0):
+                decoded_response = _SubstituteAddressMapperIPCMessages.decode_response(self._ipc_connection.recv_bytes())
+                if decoded_response is None:
+                    continue
+
+                response_future = self._pending_responses.pop(decoded_response[0], None)
+                if (response_future is not None) and (not response_future.done()):
+                    response_future.set_result(decoded_response)
+        except (EOFError, OSError):
+            self._handle_disconnection()
+
+    def _handle_disconnection(self) -> None:
+        asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+        self._disconnected = True
+
+        for response_future in self._pending_responses.values():
+            if not response_future.done():
+                response_future.set_exception(ConnectionError("The IPC connection to the main process has been closed!"))
+        self._pending_responses.clear()
+
+        self._disconnection_callback()
@@ -0,0 +1,73 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Union
+import struct
+import ipaddress
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class _SubstituteAddressMapperIPCMessages(UninstantiableClassMixin):
+    # The messages exchanged between the DNS worker processes and the main process are kept as simple as possible, so
+    #  that they can be encoded and decoded quickly (each of them is carried by a single 'send_bytes()' call).
+
+    OPERATION_MAP_4TO6: Final[int] = 1
+    OPERATION_MAP_6TO4: Final[int] = 2
+    OPERATION_MAP_6TO4_WITH_CREATION: Final[int] = 3
+
+    STATUS_SUCCESS: Final[int] = 0
+    STATUS_ASSIGNMENT_NOT_FOUND: Final[int] = 1
+    STATUS_IPV4_ADDRESS_NOT_ALLOWED: Final[int] = 2
+    STATUS_IPV6_ADDRESS_NOT_SUBSTITUTABLE: Final[int] = 3
+    STATUS_ADDRESS_SPACE_CURRENTLY_FULL: Final[int] = 4
+
+    _REQUEST_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!IB4s")  # Sequence number, operation, client IPv4 address
+    _RESPONSE_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!IBI")  # Sequence number, status, external cache lifetime
+
+    @classmethod
+    def encode_request(cls, sequence_number: int, operation: int, valid_client_ipv4: ipaddress.IPv4Address, address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> bytes:
+        return cls._REQUEST_HEADER_STRUCT.pack(sequence_number, operation, valid_client_ipv4.packed) + address.packed
+
+    @classmethod
+    def decode_request(cls, request_bytes: bytes) -> Optional[tuple[int, int, ipaddress.IPv4Address, Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]:  # (sequence number, operation, client IPv4 address, address)
+        header_size = cls._REQUEST_HEADER_STRUCT.size
+        if len(request_bytes) not in ((header_size + 4), (header_size + 16)):
+            return None
+
+        sequence_number, operation, client_ipv4_bytes = cls._REQUEST_HEADER_STRUCT.unpack_from(request_bytes, 0)
+        return sequence_number, operation, ipaddress.IPv4Address(client_ipv4_bytes), ipaddress.ip_address(request_bytes[header_size:])
+
+    @classmethod
+    def encode_response(cls, sequence_number: int, status: int, address: Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]] = None, external_cache_lifetime: int = 0) -> bytes:
+        return cls._RESPONSE_HEADER_STRUCT.pack(sequence_number, status, external_cache_lifetime) + (address.packed if (address is not None) else b"")
+
+    @classmethod
+    def decode_response(cls, response_bytes: bytes) -> Optional[tuple[int, int, Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]], int]]:  # (sequence number, status, address, external cache lifetime)
+        header_size = cls._RESPONSE_HEADER_STRUCT.size
+        if len(response_bytes) not in (header_size, (header_size + 4), (header_size + 16)):
+            return None
+
+        sequence_number, status, external_cache_lifetime = cls._RESPONSE_HEADER_STRUCT.unpack_from(response_bytes, 0)
+        address = (ipaddress.ip_address(response_bytes[header_size:]) if (len(response_bytes) > header_size) else None)
+
+        return sequence_number, status, address, external_cache_lifetime
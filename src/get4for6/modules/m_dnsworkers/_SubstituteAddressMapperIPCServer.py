@@ -0,0 +1,135 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+import asyncio
+import multiprocessing.connection
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
+from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import SubstituteAssignmentNotFoundExc
+from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc import SubstituteIPv4AddressNotAllowedExc
+from get4for6.addr_mapper.substitute.exc.IPv6AddressNotSubstitutableExc import IPv6AddressNotSubstitutableExc
+from get4for6.addr_mapper.substitute.exc.SubstituteAddressSpaceCurrentlyFullExc import SubstituteAddressSpaceCurrentlyFullExc
+from get4for6.modules.m_dns._dns_qh._DNSClientRateLimiter import _DNSClientRateLimiter  # noqa
+from get4for6.modules.m_dnsworkers._SubstituteAddressMapperIPCMessages import _SubstituteAddressMapperIPCMessages
+
+
+class _SubstituteAddressMapperIPCServer:
+    """
+    Carries out the substitute address mapping operations requested by a single DNS worker process, using the main
+     process's 'SubstituteAddressMapper' instance - this way, all the processes see the same address assignments.
+    """
+
+    def __init__(self, ipc_connection: multiprocessing.connection.Connection, worker_description: str, client_rate_limiter: Optional[_DNSClientRateLimiter]):
+        self._ipc_connection: Final[multiprocessing.connection.Connection] = ipc_connection
+        self._worker_description: Final[str] = worker_description
+        self._client_rate_limiter: Final[Optional[_DNSClientRateLimiter]] = client_rate_limiter
+        self._started: bool = False
+
+    def start(self) -> None:
+        assert (not self._started)
+
+        # The requests are handled synchronously right from the event loop's reader callback, as the mapping
+        #  operations themselves do not block and a coroutine in the worker process is waiting for the response.
+        asyncio.get_running_loop().add_reader(self._ipc_connection.fileno(), self._handle_pending_requests)
+        self._started = True
+
+    def stop(self) -> None:
+        if self._started:
+            asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+            self._started = False
+
+        self._ipc_connection.close()
+
+    def _handle_pending_requests(self) -> None:
+        try:
+            while self._ipc_connection.poll(0):
+                response_bytes = self._handle_request(self._ipc_connection.recv_bytes())
+                if response_bytes is not None:
+                    self._ipc_connection.send_bytes(response_bytes)
+        except (EOFError, OSError):
+            self._handle_worker_disconnection()
+
+    @DI_NS.inject_dependencies("termination_event", "logger")
+    def _handle_worker_disconnection(self, termination_event: asyncio.Event, logger: Logger) -> None:
+        asyncio.get_running_loop().remove_reader(self._ipc_connection.fileno())
+        self._started = False
+
+        if not termination_event.is_set():
+            logger.warning(f"The {self._worker_description} has terminated unexpectedly!", LogFacilities.DNS_WORKER_STOP)
+
+    @DI_NS.inject_dependencies("substitute_address_mapper")
+    def _handle_request(self, request_bytes: bytes, substitute_address_mapper: SubstituteAddressMapper) -> Optional[bytes]:
+        decoded_request = _SubstituteAddressMapperIPCMessages.decode_request(request_bytes)
+        if decoded_request is None:
+            return None
+        sequence_number, operation, valid_client_ipv4, address = decoded_request
+
+        try:
+            if (operation == _SubstituteAddressMapperIPCMessages.OPERATION_MAP_4TO6) and (address.version == 4):
+                mapped_address, external_cache_lifetime = substitute_address_mapper.map_substitute_4to6(address, valid_client_ipv4)
+            elif (operation == _SubstituteAddressMapperIPCMessages.OPERATION_MAP_6TO4) and (address.version == 6):
+                mapped_address, external_cache_lifetime = substitute_address_mapper.map_substitute_6to4(address, valid_client_ipv4, mapping_creation_allowed=False)
+            elif (operation == _SubstituteAddressMapperIPCMessages.OPERATION_MAP_6TO4_WITH_CREATION) and (address.version == 6):
+                mapped_address, external_cache_lifetime = self._map_substitute_6to4_with_creation(address, valid_client_ipv4)
+            else:
+                return None
+        except SubstituteAssignmentNotFoundExc:
+            return _SubstituteAddressMapperIPCMessages.encode_response(sequence_number, _SubstituteAddressMapperIPCMessages.STATUS_ASSIGNMENT_NOT_FOUND)
+        except SubstituteIPv4AddressNotAllowedExc:
+            return _SubstituteAddressMapperIPCMessages.encode_response(sequence_number, _SubstituteAddressMapperIPCMessages.STATUS_IPV4_ADDRESS_NOT_ALLOWED)
+        except IPv6AddressNotSubstitutableExc:
+            return _SubstituteAddressMapperIPCMessages.encode_response(sequence_number, _SubstituteAddressMapperIPCMessages.STATUS_IPV6_ADDRESS_NOT_SUBSTITUTABLE)
+        except SubstituteAddressSpaceCurrentlyFullExc:
+            return _SubstituteAddressMapperIPCMessages.encode_response(sequence_number, _SubstituteAddressMapperIPCMessages.STATUS_ADDRESS_SPACE_CURRENTLY_FULL)
+
+        return _SubstituteAddressMapperIPCMessages.encode_response(sequence_number, _SubstituteAddressMapperIPCMessages.STATUS_SUCCESS, mapped_address, external_cache_lifetime)
+
+    @DI_NS.inject_dependencies("substitute_address_mapper")
+    def _map_substitute_6to4_with_creation(self, ipv6_address: ipaddress.IPv6Address, valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> tuple[ipaddress.IPv4Address, int]:
+        """
+        The worker processes do not limit the rate of new substitute address assignments themselves - it is done here,
+         using the same rate limiter as the main process's DNS module, so that the limit is shared by all the processes.
+
+        :raises SubstituteAssignmentNotFoundExc
+        :raises IPv6AddressNotSubstitutableExc
+        :raises SubstituteAddressSpaceCurrentlyFullExc
+        """
+
+        if self._client_rate_limiter is None:
+            return substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
+
+        # An already existing assignment can always be used, and does not count towards the client's limit
+        try:
+            return substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=False)
+        except SubstituteAssignmentNotFoundExc:
+            if not self._client_rate_limiter.is_new_substitute_addr_assignment_allowed(valid_client_ipv4):
+                raise
+
+        try:
+            return substitute_address_mapper.map_substitute_6to4(ipv6_address, valid_client_ipv4, mapping_creation_allowed=True)
+        except (SubstituteAssignmentNotFoundExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc):
+            self._client_rate_limiter.cancel_new_substitute_addr_assignment(valid_client_ipv4)
+            raise
@@ -0,0 +1,74 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import asyncio
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.modules.m_export._MappingExportSnapshotTaker import _MappingExportSnapshotTaker
+from get4for6.modules.m_export._MappingExportEncoder import _MappingExportEncoder
+
+
+class _MappingExportClientHandler:
+    # Each client connecting to an export socket is sent all the mappings, after which the connection is closed.
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader: Final[asyncio.StreamReader] = reader
+        self._writer: Final[asyncio.StreamWriter] = writer
+
+    @DI_NS.inject_dependencies("logger")
+    async def handle_client(self, logger: Logger) -> None:
+        try:
+            await self._handle_client()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"An unexpected exception occurred while handling a mapping export client --> {e.__class__.__name__}: {str(e)}", LogFacilities.EXPORT_CLIENT_UNEXPECTED_EXCEPTION)
+
+    async def _handle_client(self) -> None:
+        try:
+            await self._send_mappings()
+        except (OSError, EOFError):  # If an error occurs, the client will be disconnected
+            pass
+        finally:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except (OSError, EOFError):  # If an error occurs, assume that the connection has already been closed
+                pass
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    async def _send_mappings(self, configuration: Configuration, logger: Logger) -> None:
+        mappings = _MappingExportSnapshotTaker().take_snapshot()
+
+        encoded_chunks = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: list(_MappingExportEncoder.encode_mappings(mappings, configuration.mapping_export.format))
+        )
+
+        for encoded_chunk in encoded_chunks:
+            self._writer.write(encoded_chunk)
+            await self._writer.drain()
+
+        logger.debug(f"{len(mappings)} mappings have been exported to a Unix socket client.", LogFacilities.EXPORT_SUCCESS)
@@ -0,0 +1,103 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Iterator
+import struct
+import json
+import ipaddress
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+from get4for6.exc.ThisShouldNeverHappenExc import ThisShouldNeverHappenExc
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class _MappingExportEncoder(UninstantiableClassMixin):
+    # The encoding is CPU-bound, and it is therefore performed in a worker thread, so that the event loop is not held
+    #  up while a huge map is being exported. The encoded records are grouped into chunks, so that they can be written
+    #  using a small number of bulk writes.
+    # The binary format consists of a header (magic bytes, format version, number of records) followed by fixed-size
+    #  records (kind - 0 = static, 1 = dynamic; client IPv4 - all zeros for static mappings; substitute IPv4; IPv6;
+    #  remaining guaranteed lifetime in seconds - 0 for static mappings). All integers are in network byte order.
+
+    _RECORDS_PER_CHUNK: Final[int] = 4096
+
+    _CSV_HEADER: Final[str] = "kind,client_ipv4,substitute_ipv4,ipv6,remaining_guaranteed_lifetime\n"
+
+    _BINARY_MAGIC: Final[bytes] = b"G46M"
+    _BINARY_VERSION: Final[int] = 1
+    _BINARY_HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!4sBI")  # Magic bytes, format version, number of records
+    _BINARY_RECORD_STRUCT: Final[struct.Struct] = struct.Struct("!B4s4s16sI")  # Kind, client IPv4, substitute IPv4, IPv6, remaining guaranteed lifetime
+    _BINARY_KIND_STATIC: Final[int] = 0
+    _BINARY_KIND_DYNAMIC: Final[int] = 1
+
+    # This method might run in a worker thread!
+    @classmethod
+    def encode_mappings(cls, mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]], export_format: str) -> Iterator[bytes]:
+        if export_format == "jsonl":
+            yield from cls._encode_mappings_as_jsonl(mappings)
+        elif export_format == "csv":
+            yield from cls._encode_mappings_as_csv(mappings)
+        elif export_format == "binary":
+            yield from cls._encode_mappings_as_binary(mappings)
+        else:
+            raise ThisShouldNeverHappenExc(f"Invalid mapping export format: {repr(export_format)}")
+
+    @classmethod
+    def _encode_mappings_as_jsonl(cls, mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]) -> Iterator[bytes]:
+        for chunk_start in range(0, len(mappings), cls._RECORDS_PER_CHUNK):
+            yield "".join(
+                json.dumps({
+                    "kind": ("static" if (client_ipv4 is None) else "dynamic"),
+                    "client_ipv4": (str(client_ipv4) if (client_ipv4 is not None) else None),
+                    "substitute_ipv4": str(mapping_ipv4),
+                    "ipv6": str(mapping_ipv6),
+                    "remaining_guaranteed_lifetime": remaining_guaranteed_lifetime
+                }) + "\n"
+                for client_ipv4, mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime in mappings[chunk_start:(chunk_start + cls._RECORDS_PER_CHUNK)]
+            ).encode("ascii")
+
+    @classmethod
+    def _encode_mappings_as_csv(cls, mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]) -> Iterator[bytes]:
+        # None of the values can contain a comma or a quote, so no quoting is needed.
+        yield cls._CSV_HEADER.encode("ascii")
+
+        for chunk_start in range(0, len(mappings), cls._RECORDS_PER_CHUNK):
+            yield "".join(
+                f"{'static' if (client_ipv4 is None) else 'dynamic'},{client_ipv4 if (client_ipv4 is not None) else ''},{mapping_ipv4},{mapping_ipv6},{remaining_guaranteed_lifetime if (remaining_guaranteed_lifetime is not None) else ''}\n"
+                for client_ipv4, mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime in mappings[chunk_start:(chunk_start + cls._RECORDS_PER_CHUNK)]
+            ).encode("ascii")
+
+    @classmethod
+    def _encode_mappings_as_binary(cls, mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]) -> Iterator[bytes]:
+        yield cls._BINARY_HEADER_STRUCT.pack(cls._BINARY_MAGIC, cls._BINARY_VERSION, len(mappings))
+
+        zero_ipv4_packed = bytes(4)
+        for chunk_start in range(0, len(mappings), cls._RECORDS_PER_CHUNK):
+            yield b"".join(
+                cls._BINARY_RECORD_STRUCT.pack(
+                    (cls._BINARY_KIND_STATIC if (client_ipv4 is None) else cls._BINARY_KIND_DYNAMIC),
+                    (client_ipv4.packed if (client_ipv4 is not None) else zero_ipv4_packed),
+                    mapping_ipv4.packed,
+                    mapping_ipv6.packed,
+                    (remaining_guaranteed_lifetime if (remaining_guaranteed_lifetime is not None) else 0)
+                )
+                for client_ipv4, mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime in mappings[chunk_start:(chunk_start + cls._RECORDS_PER_CHUNK)]
+            )
@@ -0,0 +1,58 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import os
+import ipaddress
+from get4for6.modules.m_export._MappingExportEncoder import _MappingExportEncoder
+
+
+class _MappingExportFileWriter:
+    _BUFFER_SIZE: Final[int] = (1024 * 1024)
+
+    def __init__(self, path: str, export_format: str):
+        self._path: Final[str] = path
+        self._export_format: Final[str] = export_format
+
+    # This method runs in a worker thread!
+    def write_mappings(self, mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]) -> None:
+        """
+        The mappings are written into a temporary file, which then replaces the target file, so that readers of the
+         target file never see an incomplete export.
+
+        :raises OSError
+        """
+
+        temporary_path = f"{self._path}.tmp"
+        try:
+            with open(temporary_path, "wb", buffering=self.__class__._BUFFER_SIZE) as temporary_file:
+                for encoded_chunk in _MappingExportEncoder.encode_mappings(mappings, self._export_format):
+                    temporary_file.write(encoded_chunk)
+
+            os.replace(temporary_path, self._path)
+        except OSError:
+            try:
+                os.unlink(temporary_path)
+            except OSError:
+                pass
+
+            raise
@@ -0,0 +1,44 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Optional
+import ipaddress
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
+
+
+class _MappingExportSnapshotTaker:
+    @DI_NS.inject_dependencies("configuration", "substitute_address_mapper")
+    def take_snapshot(self, configuration: Configuration, substitute_address_mapper: SubstituteAddressMapper) -> list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]]:
+        """
+        Returns the static and dynamic mappings as (client IPv4, substitute IPv4, IPv6, remaining guaranteed lifetime)
+         tuples; the client IPv4 and the lifetime are None for static mappings.
+
+        The snapshot is consistent even though the mappings are encoded and written in the background (see
+         'SubstituteAddressMapper.take_snapshot_of_dynamic_mappings()').
+        """
+
+        mappings: list[tuple[Optional[ipaddress.IPv4Address], ipaddress.IPv4Address, ipaddress.IPv6Address, Optional[int]]] = [(None, mapping_ipv4, mapping_ipv6, None) for mapping_ipv4, mapping_ipv6 in configuration.translation.static_substitute_addr_assignments]
+        mappings.extend(substitute_address_mapper.take_snapshot_of_dynamic_mappings())
+
+        return mappings
@@ -0,0 +1,108 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final
+import asyncio
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+
+
+class _MetricsHTTPClientHandler:
+    # A minimal HTTP/1.0-style server is implemented here, as it is all Prometheus (or e.g. 'curl --unix-socket') needs:
+    #  each connection carries exactly one request, and is closed after the response has been sent.
+
+    _METRICS_PATH: Final[str] = "/metrics"
+    _MAX_REQUEST_HEAD_SIZE: Final[int] = 8192
+    _REQUEST_HEAD_TIMEOUT: Final[float] = 10.0
+    _CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader: Final[asyncio.StreamReader] = reader
+        self._writer: Final[asyncio.StreamWriter] = writer
+
+    @DI_NS.inject_dependencies("logger")
+    async def handle_client(self, logger: Logger) -> None:
+        try:
+            await self._handle_client()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"An unexpected exception occurred while handling a metrics client --> {e.__class__.__name__}: {str(e)}", LogFacilities.METRICS_CLIENT_UNEXPECTED_EXCEPTION)
+
+    async def _handle_client(self) -> None:
+        try:
+            await self._handle_request()
+        except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):  # If an error occurs, the client will be disconnected
+            pass
+        finally:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except (OSError, EOFError):  # If an error occurs, assume that the connection has already been closed
+                pass
+
+    @DI_NS.inject_dependencies("metrics_registry")
+    async def _handle_request(self, metrics_registry: MetricsRegistry) -> None:
+        request_head = await asyncio.wait_for(self._read_request_head(), timeout=self.__class__._REQUEST_HEAD_TIMEOUT)
+
+        request_line_parts = request_head.split(b"\r\n", 1)[0].split(b" ")
+        if len(request_line_parts) != 3:
+            await self._send_response("400 Bad Request", "Bad request\n")
+            return
+
+        method, target, _ = request_line_parts
+        if method not in (b"GET", b"HEAD"):
+            await self._send_response("405 Method Not Allowed", "Method not allowed\n")
+            return
+
+        if target.split(b"?", 1)[0].decode("ascii", errors="replace") != self.__class__._METRICS_PATH:
+            await self._send_response("404 Not Found", "Not found\n")
+            return
+
+        await self._send_response("200 OK", metrics_registry.render_prometheus_text(), send_body=(method == b"GET"))
+
+    async def _read_request_head(self) -> bytes:
+        """
+        :raises asyncio.IncompleteReadError
+        :raises asyncio.LimitOverrunError
+        """
+
+        request_head = await self._reader.readuntil(b"\r\n\r\n")
+        if len(request_head) > self.__class__._MAX_REQUEST_HEAD_SIZE:
+            raise asyncio.LimitOverrunError("The request head is too long!", len(request_head))
+
+        return request_head
+
+    async def _send_response(self, status: str, body: str, send_body: bool = True) -> None:
+        encoded_body = body.encode("utf-8")
+        encoded_head = (
+            f"HTTP/1.0 {status}\r\n"
+            f"Content-Type: {self.__class__._CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(encoded_body)}\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("ascii")
+
+        self._writer.write((encoded_head + encoded_body) if send_body else encoded_head)
+        await self._writer.drain()
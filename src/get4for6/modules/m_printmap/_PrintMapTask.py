@@ -20,26 +20,26 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Final, Generator
+from typing import Final, Iterator
 import ipaddress
 import asyncio
 from get4for6.config.Configuration import Configuration
 from get4for6.di import DI_NS
+from get4for6.helpers.MappingFormatHelpers import MappingFormatHelpers
 from get4for6.addr_mapper.substitute.SubstituteAddressMapper import SubstituteAddressMapper
 from get4for6.logger.Logger import Logger
 
 
 class _PrintMapTask:
     _STATIC_MAPPINGS_BANNER: Final[str] = "--- Static mappings ---"
-    _STATIC_MAPPING_PATTERN: Final[str] = "{mapping_ipv4} <-> {mapping_ipv6}"
-
     _DYNAMIC_MAPPINGS_BANNER_PATTERN: Final[str] = "--- Dynamic mappings for {client_ipv4} ---"
-    _DYNAMIC_MAPPING_PATTERN: Final[str] = "{mapping_ipv4} <-> {mapping_ipv6} ... {lifetime_info}"
-    _LIFETIME_INFO_REMAINING_PATTERN: Final[str] = "remaining guaranteed lifetime: {remaining_guaranteed_lifetime} seconds"
-    _LIFETIME_INFO_MAY_BE_REPLACED: Final[str] = "may be replaced"
 
     _SECTION_SPACING: Final[int] = 2
 
+    # The mappings are printed in chunks of this many lines, and control is yielded back to the event loop after each of
+    #  them, so that translation and DNS queries are not held up while a huge map is being printed.
+    _LINES_PER_CHUNK: Final[int] = 256
+
     @DI_NS.inject_dependencies("logger")
     def __init__(self, logger: Logger):
         # The logger is called frequently, so it is saved in the instance to save some CPU cycles
@@ -57,51 +57,48 @@ class _PrintMapTask:
             await print_map_event.wait()
             print_map_event.clear()
 
-            self._print_mappings()
+            await self._print_mappings()
 
     @DI_NS.inject_dependencies("substitute_address_mapper")
-    def _print_mappings(self, substitute_address_mapper: SubstituteAddressMapper) -> None:
-        self._print_static_mappings()
+    async def _print_mappings(self, substitute_address_mapper: SubstituteAddressMapper) -> None:
+        # The snapshot is consistent even though the map's printing is interleaved with the handling of queries
+        dynamic_mappings = substitute_address_mapper.take_snapshot_of_dynamic_mappings()
+
+        lines_iterator = self._generate_lines(dynamic_mappings)
+        while True:
+            chunk = [line for _, line in zip(range(self.__class__._LINES_PER_CHUNK), lines_iterator)]
+            if not chunk:
+                break
 
-        print_dynamic_mappings_generator = self._print_dynamic_mappings()
-        next(print_dynamic_mappings_generator)  # Get to the 'yield'
-        substitute_address_mapper.send_dynamic_mappings_to_generator(print_dynamic_mappings_generator)
-        del print_dynamic_mappings_generator
+            await self._logger.write_lines_async(chunk)
+            await asyncio.sleep(0)
 
-        self._write_section_spacing()
+    def _generate_lines(self, dynamic_mappings: list[tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int]]) -> Iterator[str]:
+        yield from self._generate_static_mapping_lines()
+        yield from self._generate_dynamic_mapping_lines(dynamic_mappings)
+        yield from self._generate_section_spacing_lines()
 
     @DI_NS.inject_dependencies("configuration")
-    def _print_static_mappings(self, configuration: Configuration) -> None:
+    def _generate_static_mapping_lines(self, configuration: Configuration) -> Iterator[str]:
         if not configuration.translation.static_substitute_addr_assignments:
             return
 
-        self._write_section_spacing()
-        self._write_line(self.__class__._STATIC_MAPPINGS_BANNER)
+        yield from self._generate_section_spacing_lines()
+        yield self.__class__._STATIC_MAPPINGS_BANNER
         for mapping_ipv4, mapping_ipv6 in configuration.translation.static_substitute_addr_assignments:
-            self._write_line(self.__class__._STATIC_MAPPING_PATTERN.format(mapping_ipv4=mapping_ipv4, mapping_ipv6=mapping_ipv6))
+            yield MappingFormatHelpers.format_static_mapping(mapping_ipv4, mapping_ipv6)
 
-    def _print_dynamic_mappings(self) -> Generator[None, tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int], None]:
+    def _generate_dynamic_mapping_lines(self, dynamic_mappings: list[tuple[ipaddress.IPv4Address, ipaddress.IPv4Address, ipaddress.IPv6Address, int]]) -> Iterator[str]:
         last_client_ipv4 = None
 
-        while True:
-            client_ipv4, mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime = yield
-
+        for client_ipv4, mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime in dynamic_mappings:
             if client_ipv4 != last_client_ipv4:
-                self._write_section_spacing()
-                self._write_line(self.__class__._DYNAMIC_MAPPINGS_BANNER_PATTERN.format(client_ipv4=client_ipv4))
+                yield from self._generate_section_spacing_lines()
+                yield self.__class__._DYNAMIC_MAPPINGS_BANNER_PATTERN.format(client_ipv4=client_ipv4)
                 last_client_ipv4 = client_ipv4
 
-            lifetime_info = (self.__class__._LIFETIME_INFO_REMAINING_PATTERN.format(remaining_guaranteed_lifetime=remaining_guaranteed_lifetime) if (remaining_guaranteed_lifetime > 0) else self.__class__._LIFETIME_INFO_MAY_BE_REPLACED)
-            self._write_line(self.__class__._DYNAMIC_MAPPING_PATTERN.format(
-                mapping_ipv4=mapping_ipv4,
-                mapping_ipv6=mapping_ipv6,
-                lifetime_info=lifetime_info
-            ))
+            yield MappingFormatHelpers.format_dynamic_mapping(mapping_ipv4, mapping_ipv6, remaining_guaranteed_lifetime)
 
-    def _write_section_spacing(self) -> None:
+    def _generate_section_spacing_lines(self) -> Iterator[str]:
         for _ in range(self.__class__._SECTION_SPACING):
-            self._write_line("")
-
-    def _write_line(self, written_line: str) -> None:
-        # For future extension.
-        self._logger.write_line_block(written_line)
+            yield ""
@@ -22,6 +22,7 @@
 
 from typing import Final
 import asyncio
+import threading
 from get4for6.config.Configuration import Configuration
 from get4for6.config.IPPortPair import IPPortPair
 from get4for6.di import DI_NS
@@ -30,22 +31,30 @@ from get4for6.logger.LogFacilities import LogFacilities
 from get4for6.modules.ModuleIface import ModuleIface
 from get4for6.modules.exc.FailedToStartServerExc import FailedToStartServerExc
 from get4for6.modules.exc.FailedToStopServerExc import FailedToStopServerExc
+from get4for6.modules.udp.DrainingDatagramTransport import DrainingDatagramTransport
 from get4for6.modules.m_saq._SAQDatagramProtocol import _SAQDatagramProtocol
+from get4for6.modules.m_saq._SAQStreamClientHandler import _SAQStreamClientHandler
 
 
 class SimpleAddrQueryModule(ModuleIface):
     _SERVICE: Final[str] = "simple_addr_query"
 
+    @DI_NS.inject_dependencies("configuration")
+    def __init__(self, configuration: Configuration):
+        self._max_simultaneous_connections_semaphore: Final[threading.BoundedSemaphore] = threading.BoundedSemaphore(value=configuration.simple_addr_query.max_simultaneous_connections)
+
     async def run(self) -> None:
         await self._run()
 
     @DI_NS.inject_dependencies("termination_event", "logger")  # The 'run()' method has no arguments in 'ModuleIface'
     async def _run(self, termination_event: asyncio.Event, logger: Logger) -> None:
         servers = await self._start_servers()
+        unix_servers, tcp_servers = await self._start_stream_servers()
 
-        logger.info(f"Listening on UDP {repr([server[2].to_printable_tuple() for server in servers if not server[3]])} for binary requests and on UDP {repr([server[2].to_printable_tuple() for server in servers if server[3]])} for plaintext requests.", LogFacilities.SAQ)
+        logger.info(f"Listening on UDP {repr([server[2].to_printable_tuple() for server in servers if not server[3]])} for binary requests, on UDP {repr([server[2].to_printable_tuple() for server in servers if server[3]])} for plaintext requests, and on Unix sockets {repr([unix_path for _, unix_path in unix_servers])} and TCP {repr([ip_port_pair.to_printable_tuple() for _, ip_port_pair in tcp_servers])} for length-prefixed binary requests.", LogFacilities.SAQ)
         await termination_event.wait()
 
+        await self._stop_stream_servers(unix_servers, tcp_servers)
         await self._stop_servers(servers)
 
     @DI_NS.inject_dependencies("configuration")
@@ -64,15 +73,11 @@ class SimpleAddrQueryModule(ModuleIface):
 
     @DI_NS.inject_dependencies("logger")
     async def _start_server(self, ip_port_pair: IPPortPair, is_plaintext: bool, logger: Logger) -> tuple[asyncio.DatagramTransport, _SAQDatagramProtocol]:
-        loop = asyncio.get_running_loop()
-        local_addr = (str(ip_port_pair.ip_address), ip_port_pair.port)
-
         try:
-            transport, protocol = await loop.create_datagram_endpoint(
+            transport, protocol = await DrainingDatagramTransport.create_endpoint(
                 protocol_factory=lambda: _SAQDatagramProtocol(is_plaintext),
-                local_addr=local_addr,
-                remote_addr=None,
-                allow_broadcast=False
+                ip_port_pair=ip_port_pair,
+                reuse_port=False
             )
         except OSError as e:
             raise FailedToStartServerExc.udp(self.__class__._SERVICE, ip_port_pair, str(e))
@@ -91,3 +96,74 @@ class SimpleAddrQueryModule(ModuleIface):
                 raise FailedToStopServerExc.udp(self.__class__._SERVICE, ip_port_pair, str(e))
             else:
                 logger.debug(f"UDP {'plaintext' if is_plaintext else 'binary'} server on {repr(ip_port_pair.to_printable_tuple())} has been stopped.", LogFacilities.SAQ_SERVER_STOP)
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    async def _start_stream_servers(self, configuration: Configuration, logger: Logger) -> tuple[list[tuple[asyncio.base_events.Server, str]], list[tuple[asyncio.base_events.Server, IPPortPair]]]:
+        unix_servers = []
+        for unix_path in configuration.simple_addr_query.listen_on_unix:
+            try:
+                new_unix_server = await asyncio.start_unix_server(
+                    client_connected_cb=self._client_connected_via_unix,
+                    path=unix_path,
+                    start_serving=True
+                )
+            except OSError as e:
+                raise FailedToStartServerExc.unix(self.__class__._SERVICE, unix_path, str(e))
+            else:
+                unix_servers.append((new_unix_server, unix_path))
+                logger.debug(f"Unix socket server on {repr(unix_path)} has been started.", LogFacilities.SAQ_SERVER_START)
+
+        tcp_servers = []
+        for ip_port_pair in configuration.simple_addr_query.listen_on_tcp:
+            try:
+                new_tcp_server = await asyncio.start_server(
+                    client_connected_cb=self._client_connected_via_tcp,
+                    host=str(ip_port_pair.ip_address),
+                    port=ip_port_pair.port,
+                    start_serving=True
+                )
+            except OSError as f:
+                raise FailedToStartServerExc.tcp(self.__class__._SERVICE, ip_port_pair, str(f))
+            else:
+                tcp_servers.append((new_tcp_server, ip_port_pair))
+                logger.debug(f"TCP server on {repr(ip_port_pair.to_printable_tuple())} has been started.", LogFacilities.SAQ_SERVER_START)
+
+        return unix_servers, tcp_servers
+
+    @DI_NS.inject_dependencies("logger")
+    async def _stop_stream_servers(self, unix_servers: list[tuple[asyncio.base_events.Server, str]], tcp_servers: list[tuple[asyncio.base_events.Server, IPPortPair]], logger: Logger) -> None:
+        for unix_server, unix_path in unix_servers:
+            try:
+                await self._stop_stream_server_with_exceptions_handled(unix_server)
+            except OSError as e:
+                raise FailedToStopServerExc.unix(self.__class__._SERVICE, unix_path, str(e))
+            else:
+                logger.debug(f"Unix socket server on {repr(unix_path)} has been stopped.", LogFacilities.SAQ_SERVER_STOP)
+
+        for tcp_server, ip_port_pair in tcp_servers:
+            try:
+                await self._stop_stream_server_with_exceptions_handled(tcp_server)
+            except OSError as f:
+                raise FailedToStopServerExc.tcp(self.__class__._SERVICE, ip_port_pair, str(f))
+            else:
+                logger.debug(f"TCP server on {repr(ip_port_pair.to_printable_tuple())} has been stopped.", LogFacilities.SAQ_SERVER_STOP)
+
+    async def _stop_stream_server_with_exceptions_handled(self, server: asyncio.base_events.Server) -> None:
+        server.close()
+        await server.wait_closed()
+
+    async def _client_connected_via_unix(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await _SAQStreamClientHandler(
+            reader=reader,
+            writer=writer,
+            is_tcp=False,
+            max_simultaneous_connections_semaphore=self._max_simultaneous_connections_semaphore
+        ).handle_client()
+
+    async def _client_connected_via_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await _SAQStreamClientHandler(
+            reader=reader,
+            writer=writer,
+            is_tcp=True,
+            max_simultaneous_connections_semaphore=self._max_simultaneous_connections_semaphore
+        ).handle_client()
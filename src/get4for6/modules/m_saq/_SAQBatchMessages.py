@@ -0,0 +1,124 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional, Union
+import struct
+import ipaddress
+from get4for6.etc.UninstantiableClassMixin import UninstantiableClassMixin
+
+
+# This is not really a class as per OOP definition, but rather a collection of independent functions.
+class _SAQBatchMessages(UninstantiableClassMixin):
+    # Binary batch requests consist of a header (magic bytes + the number of items) followed by the items, each of
+    #  which consists of an IP version byte (4 or 6) and the packed IP address. Binary batch responses consist of the
+    #  same header followed by the same number of items, each of which consists of a status byte, an IP version byte
+    #  and the packed translated IP address (if the status is not STATUS_SUCCESS, the IP version byte is 0 and the
+    #  address is omitted).
+    # Since the magic bytes are followed by an item count of at least 1, a binary batch request can never be 4 or 16
+    #  bytes long, and thus cannot be confused with a single-address request.
+    # Plaintext batch requests consist of IP addresses separated by newlines; plaintext batch responses contain one line
+    #  per requested address - either the translated IP address, or an exclamation mark followed by the status code.
+
+    STATUS_SUCCESS: Final[int] = 0
+    STATUS_ASSIGNMENT_NOT_FOUND: Final[int] = 1
+    STATUS_IPV4_ADDRESS_NOT_ALLOWED: Final[int] = 2
+    STATUS_IPV6_ADDRESS_NOT_SUBSTITUTABLE: Final[int] = 3
+    STATUS_ADDRESS_SPACE_CURRENTLY_FULL: Final[int] = 4
+    STATUS_INVALID_ADDRESS: Final[int] = 5  # Used only in plaintext batches; an invalid binary batch is discarded as a whole
+
+    # Limits the size of the responses, so that they fit into a single UDP datagram.
+    MAX_ITEMS: Final[int] = 1024
+
+    _MAGIC: Final[bytes] = b"SB"
+    _HEADER_STRUCT: Final[struct.Struct] = struct.Struct("!2sH")  # Magic bytes, number of items
+    _ADDRESS_SIZES: Final[dict[int, int]] = {4: 4, 6: 16}  # IP version -> packed address size
+
+    @classmethod
+    def decode_binary_request(cls, request_bytes: bytes) -> Optional[list[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]:
+        request_length = len(request_bytes)
+        if request_length < cls._HEADER_STRUCT.size:
+            return None
+
+        magic, item_count = cls._HEADER_STRUCT.unpack_from(request_bytes, 0)
+        if (magic != cls._MAGIC) or (item_count < 1) or (item_count > cls.MAX_ITEMS):
+            return None
+
+        addresses = []
+        offset = cls._HEADER_STRUCT.size
+        for _ in range(item_count):
+            if offset >= request_length:
+                return None
+
+            address_size = cls._ADDRESS_SIZES.get(request_bytes[offset], None)
+            offset += 1
+            if (address_size is None) or ((offset + address_size) > request_length):
+                return None
+
+            addresses.append(ipaddress.ip_address(request_bytes[offset:(offset + address_size)]))
+            offset += address_size
+
+        if offset != request_length:
+            return None
+
+        return addresses
+
+    @classmethod
+    def encode_binary_response(cls, results: list[tuple[int, Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]]) -> bytes:
+        response_parts = [cls._HEADER_STRUCT.pack(cls._MAGIC, len(results))]
+        for status, address in results:
+            if address is None:
+                response_parts.append(bytes((status, 0)))
+            else:
+                response_parts.append(bytes((status, address.version)))
+                response_parts.append(address.packed)
+
+        return b"".join(response_parts)
+
+    @classmethod
+    def is_plaintext_batch_request(cls, request_bytes: bytes) -> bool:
+        return b"\n" in request_bytes.strip()
+
+    @classmethod
+    def decode_plaintext_request(cls, request_bytes: bytes) -> Optional[list[Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]]:
+        # Invalid addresses are represented by None, so that each line of the response corresponds to a line of the request.
+        try:
+            lines = request_bytes.decode("ascii").strip().splitlines()
+        except UnicodeError:
+            return None
+
+        if len(lines) > cls.MAX_ITEMS:
+            return None
+
+        addresses = []
+        for line in lines:
+            try:
+                addresses.append(ipaddress.ip_address(line.strip()))
+            except ValueError:
+                addresses.append(None)
+
+        return addresses
+
+    @classmethod
+    def encode_plaintext_response(cls, results: list[tuple[int, Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]]) -> bytes:
+        return "\n".join(
+            (str(address) if (address is not None) else f"!{status}") for status, address in results
+        ).encode("ascii")
@@ -20,7 +20,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
-from typing import Optional, Union
+from typing import Final, Optional, Union
 import ipaddress
 from get4for6.di import DI_NS
 from get4for6.exc.ThisShouldNeverHappenExc import ThisShouldNeverHappenExc
@@ -31,11 +31,28 @@ from get4for6.addr_mapper.substitute.exc.SubstituteAssignmentNotFoundExc import
 from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc import SubstituteIPv4AddressNotAllowedExc
 from get4for6.addr_mapper.substitute.exc.IPv6AddressNotSubstitutableExc import IPv6AddressNotSubstitutableExc
 from get4for6.addr_mapper.substitute.exc.SubstituteAddressSpaceCurrentlyFullExc import SubstituteAddressSpaceCurrentlyFullExc
+from get4for6.modules.m_saq._SAQBatchMessages import _SAQBatchMessages
 
 
 class _SAQQueryHandler:
+    _BATCH_ITEM_STATUSES: Final[dict[type, int]] = {
+        SubstituteAssignmentNotFoundExc: _SAQBatchMessages.STATUS_ASSIGNMENT_NOT_FOUND,
+        SubstituteIPv4AddressNotAllowedExc: _SAQBatchMessages.STATUS_IPV4_ADDRESS_NOT_ALLOWED,
+        IPv6AddressNotSubstitutableExc: _SAQBatchMessages.STATUS_IPV6_ADDRESS_NOT_SUBSTITUTABLE,
+        SubstituteAddressSpaceCurrentlyFullExc: _SAQBatchMessages.STATUS_ADDRESS_SPACE_CURRENTLY_FULL
+    }
+
+    def handle_query(self, data: bytes, valid_client_ipv4: ipaddress.IPv4Address, is_plaintext: bool) -> Optional[bytes]:
+        if is_plaintext:
+            if _SAQBatchMessages.is_plaintext_batch_request(data):
+                return self._handle_plaintext_batch_query(data, valid_client_ipv4)
+        elif len(data) not in (4, 16):
+            return self._handle_binary_batch_query(data, valid_client_ipv4)
+
+        return self._handle_single_query(data, valid_client_ipv4, is_plaintext)
+
     @DI_NS.inject_dependencies("logger")
-    def handle_query(self, data: bytes, valid_client_ipv4: ipaddress.IPv4Address, is_plaintext: bool, logger: Logger) -> Optional[bytes]:
+    def _handle_single_query(self, data: bytes, valid_client_ipv4: ipaddress.IPv4Address, is_plaintext: bool, logger: Logger) -> Optional[bytes]:
         address_to_translate = (self._parse_plaintext_address_to_translate(data) if is_plaintext else self._parse_binary_address_to_translate(data))
         if address_to_translate is None:
             logger.debug(f"An invalid SAQ message has been received from {valid_client_ipv4}!", LogFacilities.SAQ_CLIENT_INVALID_MESSAGE)
@@ -50,6 +67,46 @@ class _SAQQueryHandler:
         logger.debug(f"Query SUCCESS: '{address_to_translate}' -> '{translated_address}' {{client: {valid_client_ipv4}}}", LogFacilities.SAQ_QUERY_SUCCESS)
         return str(translated_address).encode("ascii") if is_plaintext else translated_address.packed
 
+    @DI_NS.inject_dependencies("logger")
+    def _handle_binary_batch_query(self, data: bytes, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> Optional[bytes]:
+        addresses_to_translate = _SAQBatchMessages.decode_binary_request(data)
+        if addresses_to_translate is None:
+            logger.debug(f"An invalid SAQ message has been received from {valid_client_ipv4}!", LogFacilities.SAQ_CLIENT_INVALID_MESSAGE)
+            return None
+
+        return _SAQBatchMessages.encode_binary_response(self._perform_batch_address_translation(addresses_to_translate, valid_client_ipv4))
+
+    @DI_NS.inject_dependencies("logger")
+    def _handle_plaintext_batch_query(self, data: bytes, valid_client_ipv4: ipaddress.IPv4Address, logger: Logger) -> Optional[bytes]:
+        addresses_to_translate = _SAQBatchMessages.decode_plaintext_request(data)
+        if addresses_to_translate is None:
+            logger.debug(f"An invalid SAQ message has been received from {valid_client_ipv4}!", LogFacilities.SAQ_CLIENT_INVALID_MESSAGE)
+            return None
+
+        return _SAQBatchMessages.encode_plaintext_response(self._perform_batch_address_translation(addresses_to_translate, valid_client_ipv4))
+
+    @DI_NS.inject_dependencies("logger", "substitute_address_mapper")
+    def _perform_batch_address_translation(self, addresses_to_translate: list[Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]], valid_client_ipv4: ipaddress.IPv4Address, logger: Logger, substitute_address_mapper: SubstituteAddressMapper) -> list[tuple[int, Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]]]:
+        # The dependencies are resolved only once per batch, and the outcome of the batch is logged as a whole, so that
+        #  large batches can be processed in a single pass without much overhead.
+        results = []
+        for address_to_translate in addresses_to_translate:
+            if address_to_translate is None:
+                results.append((_SAQBatchMessages.STATUS_INVALID_ADDRESS, None))
+                continue
+
+            try:
+                translated_address = self._translate_address(address_to_translate, valid_client_ipv4, substitute_address_mapper)
+            except (SubstituteAssignmentNotFoundExc, SubstituteIPv4AddressNotAllowedExc, IPv6AddressNotSubstitutableExc, SubstituteAddressSpaceCurrentlyFullExc) as e:
+                results.append((self.__class__._BATCH_ITEM_STATUSES[e.__class__], None))
+            else:
+                results.append((_SAQBatchMessages.STATUS_SUCCESS, translated_address))
+
+        successful_count = sum(1 for status, _ in results if status == _SAQBatchMessages.STATUS_SUCCESS)
+        logger.debug(f"Batch query: {successful_count} out of {len(results)} addresses translated {{client: {valid_client_ipv4}}}", LogFacilities.SAQ_QUERY_SUCCESS)
+
+        return results
+
     def _parse_binary_address_to_translate(self, data: bytes) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
         data_len = len(data)
 
@@ -76,6 +133,10 @@ class _SAQQueryHandler:
 
     @DI_NS.inject_dependencies("substitute_address_mapper")
     def _perform_address_translation(self, address_to_translate: Union[ipaddress.IPv4Address, ipaddress.IPv6Address], valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+        return self._translate_address(address_to_translate, valid_client_ipv4, substitute_address_mapper)
+
+    @staticmethod
+    def _translate_address(address_to_translate: Union[ipaddress.IPv4Address, ipaddress.IPv6Address], valid_client_ipv4: ipaddress.IPv4Address, substitute_address_mapper: SubstituteAddressMapper) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
         if isinstance(address_to_translate, ipaddress.IPv4Address):
             return substitute_address_mapper.map_substitute_4to6(address_to_translate, valid_client_ipv4)[0]
 
@@ -0,0 +1,153 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Optional
+import ipaddress
+import asyncio
+import threading
+from get4for6.config.Configuration import Configuration
+from get4for6.di import DI_NS
+from get4for6.logger.Logger import Logger
+from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
+from get4for6.helpers.IPHelpers import IPHelpers
+from get4for6.modules.m_saq._SAQQueryHandler import _SAQQueryHandler
+
+
+class _SAQStreamClientHandler:
+    # Each request and response is prefixed by its length (16-bit unsigned integer in network byte order). Requests
+    #  received over Unix sockets start with the packed IPv4 address of the client on whose behalf the query is
+    #  performed, as there is no client IPv4 address which could be derived from the connection.
+    # Clients may pipeline their requests; the responses are sent back in the same order, and all the responses to the
+    #  requests received by a single read are sent back using a single write. Since each request must be answered to
+    #  keep the responses in order, an empty response is sent back in cases where UDP queries would be "blackholed".
+
+    _READ_SIZE: Final[int] = 65536
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, is_tcp: bool, max_simultaneous_connections_semaphore: threading.BoundedSemaphore):
+        self._reader: Final[asyncio.StreamReader] = reader
+        self._writer: Final[asyncio.StreamWriter] = writer
+        self._is_tcp: Final[bool] = is_tcp
+        self._max_simultaneous_connections_semaphore: Final[threading.BoundedSemaphore] = max_simultaneous_connections_semaphore
+        self._query_handler: Final[_SAQQueryHandler] = _SAQQueryHandler()
+
+    @DI_NS.inject_dependencies("logger")
+    async def handle_client(self, logger: Logger) -> None:
+        try:
+            await self._handle_client()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"An unexpected exception occurred while handling a SAQ client --> {e.__class__.__name__}: {str(e)}", LogFacilities.SAQ_CLIENT_UNEXPECTED_EXCEPTION)
+
+    async def _handle_client(self) -> None:
+        try:
+            await self._handle_client_with_communication_errors_handled()
+        except (OSError, EOFError):  # If an error occurs, the client will be disconnected
+            pass
+        finally:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except (OSError, EOFError):  # If an error occurs, assume that the connection has already been closed
+                pass
+
+    @DI_NS.inject_dependencies("logger", "metrics_registry")
+    async def _handle_client_with_communication_errors_handled(self, logger: Logger, metrics_registry: MetricsRegistry) -> None:
+        if not self._max_simultaneous_connections_semaphore.acquire(blocking=False, timeout=None):
+            # If it is not possible to serve the client due to the max simultaneous connection limit being reached, disconnect the client
+            metrics_registry.increment_counter(MetricNames.LIMIT_REJECTIONS, ("saq_simultaneous_connections",))
+            logger.debug("It is currently not possible to serve new SAQ clients, as the maximum simultaneous connection limit has been reached!", LogFacilities.SAQ_CLIENT_LIMIT_REACHED)
+            return
+
+        try:
+            await self._handle_client_with_semaphore_acquired()
+        finally:
+            self._max_simultaneous_connections_semaphore.release()
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    async def _handle_client_with_semaphore_acquired(self, configuration: Configuration, logger: Logger) -> None:
+        if self._is_tcp:
+            peer_address = self._writer.get_extra_info("peername", default=None)
+            peer_description = f"TCP {repr(peer_address)}"
+
+            tcp_client_ipv4 = (IPHelpers.parse_client_ipv4_from_string_and_validate_it(peer_address[0], configuration) if peer_address else None)
+            if tcp_client_ipv4 is None:
+                logger.debug(f"{repr(peer_address)} is not a valid client IPv4 address!", LogFacilities.SAQ_CLIENT_INVALID_IP)
+                return
+        else:
+            peer_description = "<Unix socket>"
+            tcp_client_ipv4 = None
+
+        logger.debug(f"A new SAQ client has connected from {peer_description}.", LogFacilities.SAQ_CLIENT_CONNECT)
+        try:
+            await self._handle_client_requests(tcp_client_ipv4)
+        finally:
+            logger.debug(f"The SAQ client on {peer_description} is disconnecting.", LogFacilities.SAQ_CLIENT_DISCONNECT)
+
+    async def _handle_client_requests(self, tcp_client_ipv4: Optional[ipaddress.IPv4Address]) -> None:
+        buffer = bytearray()
+        while True:
+            received_data = await self._reader.read(self.__class__._READ_SIZE)
+            if not received_data:
+                return  # EOF
+            buffer += received_data
+
+            response_parts = []
+            offset = 0
+            while (len(buffer) - offset) >= 2:
+                request_length = int.from_bytes(buffer[offset:(offset + 2)], byteorder="big", signed=False)
+                if (len(buffer) - offset - 2) < request_length:
+                    break  # The rest of the request has not been received yet
+
+                request_data = bytes(buffer[(offset + 2):(offset + 2 + request_length)])
+                offset += (2 + request_length)
+
+                response_data = self._handle_request(request_data, tcp_client_ipv4)
+                response_parts.append(len(response_data).to_bytes(2, byteorder="big", signed=False))
+                response_parts.append(response_data)
+
+            del buffer[:offset]
+
+            if response_parts:
+                self._writer.write(b"".join(response_parts))
+                await self._writer.drain()
+
+    @DI_NS.inject_dependencies("configuration", "logger")
+    def _handle_request(self, request_data: bytes, tcp_client_ipv4: Optional[ipaddress.IPv4Address], configuration: Configuration, logger: Logger) -> bytes:
+        if tcp_client_ipv4 is not None:
+            valid_client_ipv4 = tcp_client_ipv4
+        else:
+            if len(request_data) < 4:
+                logger.debug("An invalid SAQ message has been received from <Unix socket>!", LogFacilities.SAQ_CLIENT_INVALID_MESSAGE)
+                return b""
+
+            valid_client_ipv4 = ipaddress.IPv4Address(request_data[0:4])
+            if not IPHelpers.is_ipv4_address_part_of_any_subnet(valid_client_ipv4, configuration.translation.client_allowed_subnets):
+                logger.debug(f"{repr(str(valid_client_ipv4))} is not a valid client IPv4 address!", LogFacilities.SAQ_CLIENT_INVALID_IP)
+                return b""
+
+            request_data = request_data[4:]
+
+        response_data = self._query_handler.handle_query(request_data, valid_client_ipv4, is_plaintext=False)
+        return (response_data if (response_data is not None) else b"")
@@ -29,6 +29,8 @@ from tundra_xaxlib.v1.RequestMessage import RequestMessage
 from get4for6.di import DI_NS
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
 from get4for6.modules.m_xax._TundraXAXRequestHandler import _TundraXAXRequestHandler
 
 
@@ -61,10 +63,11 @@ class _TundraXAXClientHandler:
             except (OSError, EOFError):  # If an error occurs, assume that the connection has already been closed
                 pass
 
-    @DI_NS.inject_dependencies("logger")
-    async def _handle_client_with_communication_errors_handled(self, logger: Logger) -> None:
+    @DI_NS.inject_dependencies("logger", "metrics_registry")
+    async def _handle_client_with_communication_errors_handled(self, logger: Logger, metrics_registry: MetricsRegistry) -> None:
         if not self._max_simultaneous_connections_semaphore.acquire(blocking=False, timeout=None):
             # If it is not possible to serve the client due to the max simultaneous connection limit being reached, disconnect the client
+            metrics_registry.increment_counter(MetricNames.LIMIT_REJECTIONS, ("xax_simultaneous_connections",))
             logger.debug("It is currently not possible to serve new Tundra-XAX clients, as the maximum simultaneous connection limit has been reached!", LogFacilities.XAX_CLIENT_LIMIT_REACHED)
             return
 
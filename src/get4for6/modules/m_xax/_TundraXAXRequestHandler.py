@@ -30,6 +30,8 @@ from get4for6.exc.ThisShouldNeverHappenExc import ThisShouldNeverHappenExc
 from get4for6.di import DI_NS
 from get4for6.logger.Logger import Logger
 from get4for6.logger.LogFacilities import LogFacilities
+from get4for6.metrics.MetricsRegistry import MetricsRegistry
+from get4for6.metrics.MetricNames import MetricNames
 from get4for6.addr_mapper.client.ClientAddressMapper import ClientAddressMapper
 from get4for6.addr_mapper.client.exc.ClientIPv4AddressNotAllowedExc import ClientIPv4AddressNotAllowedExc
 from get4for6.addr_mapper.client.exc.ClientIPv6PrefixIncorrectExc import ClientIPv6PrefixIncorrectExc
@@ -42,8 +44,8 @@ from get4for6.addr_mapper.substitute.exc.SubstituteIPv4AddressNotAllowedExc impo
 
 
 class _TundraXAXRequestHandler:
-    @DI_NS.inject_dependencies("logger")
-    def handle_request(self, request: RequestMessage, logger: Logger) -> Union[SuccessfulResponseMessage, ErroneousResponseMessage]:
+    @DI_NS.inject_dependencies("logger", "metrics_registry")
+    def handle_request(self, request: RequestMessage, logger: Logger, metrics_registry: MetricsRegistry) -> Union[SuccessfulResponseMessage, ErroneousResponseMessage]:
         try:
             new_source_ip, new_destination_ip, external_cache_lifetime = self._perform_address_translation(
                 message_type=request.message_type,
@@ -53,12 +55,14 @@ class _TundraXAXRequestHandler:
         except (ClientIPv4AddressNotAllowedExc, ClientIPv6PrefixIncorrectExc, ClientIPv6ContainsScopeIDExc, SubstituteIPv4AddressNotAllowedExc, IPv6AddressNotSubstitutableExc) as e:
             # For "security errors", translated packets are silently dropped
             response = request.generate_erroneous_response(icmp_bit=False)
+            outcome = "security_error"
             logger.debug(f"Translation security ERROR: {request.message_type.name}; ('{request.source_ip_address}', '{request.destination_ip_address}') -> {e.__class__.__name__}", LogFacilities.XAX_TRANSLATION_ERROR)
         except (SubstituteAssignmentNotFoundExc, SubstituteAddressSpaceCurrentlyFullExc) as f:
             # For "server errors", translated packets are rejected with ICMP error messages, if possible
             response = request.generate_erroneous_response(
                 icmp_bit=bool(request.message_type in (MessageType.MT_4TO6_MAIN_PACKET, MessageType.MT_6TO4_MAIN_PACKET))
             )
+            outcome = "server_error"
             logger.debug(f"Translation server ERROR: {request.message_type.name}; ('{request.source_ip_address}', '{request.destination_ip_address}') -> {f.__class__.__name__}", LogFacilities.XAX_TRANSLATION_ERROR)
         else:
             response = request.generate_successful_response(
@@ -66,8 +70,11 @@ class _TundraXAXRequestHandler:
                 source_ip_address=new_source_ip,
                 destination_ip_address=new_destination_ip
             )
+            outcome = "success"
             logger.debug(f"Translation SUCCESS: {request.message_type.name}; ('{request.source_ip_address}', '{request.destination_ip_address}') -> ('{response.source_ip_address}', '{response.destination_ip_address}')", LogFacilities.XAX_TRANSLATION_SUCCESS)
 
+        metrics_registry.increment_counter(MetricNames.XAX_REQUESTS, (request.message_type.name, outcome))
+
         return response
 
     def _perform_address_translation(self, message_type: MessageType, old_source_ip: Union[ipaddress.IPv4Address, ipaddress.IPv6Address], old_destination_ip: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> tuple[Union[ipaddress.IPv4Address, ipaddress.IPv6Address], Union[ipaddress.IPv4Address, ipaddress.IPv6Address], int]:
@@ -28,8 +28,12 @@ from get4for6.logger.LogFacilities import LogFacilities
 from get4for6.modules.ModuleIface import ModuleIface
 from get4for6.modules.m_xax.TundraExternalAddrXlatModule import TundraExternalAddrXlatModule
 from get4for6.modules.m_dns.DNSModule import DNSModule
+from get4for6.modules.m_dnsworkers.DNSWorkersModule import DNSWorkersModule
 from get4for6.modules.m_saq.SimpleAddrQueryModule import SimpleAddrQueryModule
 from get4for6.modules.m_printmap.PrintMapModule import PrintMapModule
+from get4for6.modules.m_export.MappingExportModule import MappingExportModule
+from get4for6.modules.m_metrics.MetricsModule import MetricsModule
+from get4for6.modules.m_admin.AdminModule import AdminModule
 from get4for6.modules.manager.exc.ModuleTerminatedPrematurelyExc import ModuleTerminatedPrematurelyExc
 
 
@@ -48,11 +52,24 @@ class ModuleManager:
         ]
 
         if configuration.dns is not None:
-            modules_to_run.append(DNSModule())
+            dns_module = DNSModule()
+            modules_to_run.append(dns_module)
+
+            if configuration.dns.workers > 1:
+                modules_to_run.append(DNSWorkersModule(dns_module.get_client_rate_limiter()))
 
         if configuration.simple_addr_query is not None:
             modules_to_run.append(SimpleAddrQueryModule())
 
+        if configuration.mapping_export is not None:
+            modules_to_run.append(MappingExportModule())
+
+        if configuration.metrics is not None:
+            modules_to_run.append(MetricsModule())
+
+        if configuration.admin is not None:
+            modules_to_run.append(AdminModule())
+
         return modules_to_run
 
     @DI_NS.inject_dependencies("logger")
@@ -0,0 +1,182 @@
+#!/bin/false
+
+# Copyright (c) 2022 Vít Labuda. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification, are permitted provided that the
+# following conditions are met:
+#  1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following
+#     disclaimer.
+#  2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the
+#     following disclaimer in the documentation and/or other materials provided with the distribution.
+#  3. Neither the name of the copyright holder nor the names of its contributors may be used to endorse or promote
+#     products derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES,
+# INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY,
+# WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from typing import Final, Callable, Any
+import socket
+import asyncio
+import collections
+from get4for6.config.IPPortPair import IPPortPair
+
+
+class DrainingDatagramTransport(asyncio.DatagramTransport):
+    """
+    A replacement for the datagram transports created by 'loop.create_datagram_endpoint()' - whenever its socket becomes
+     readable, up to '_MAX_DATAGRAMS_PER_READ' datagrams are received from it at once (instead of one datagram per event
+     loop iteration), using a preallocated buffer, and the responses which are sent while the datagrams are being
+     handled by the protocol are sent in one batch once all of them have been handled.
+    """
+
+    _MAX_DATAGRAMS_PER_READ: Final[int] = 64
+    _RECEIVE_BUFFER_SIZE: Final[int] = 65535  # The maximum size of a UDP datagram's payload
+    _MAX_QUEUED_DATAGRAMS: Final[int] = 4096  # Datagrams which would exceed this limit are dropped
+
+    @classmethod
+    async def create_endpoint(cls, protocol_factory: Callable[[], asyncio.DatagramProtocol], ip_port_pair: IPPortPair, reuse_port: bool) -> tuple[asyncio.DatagramTransport, asyncio.DatagramProtocol]:
+        """
+        Behaves like 'loop.create_datagram_endpoint(protocol_factory, local_addr=..., reuse_port=...)'.
+
+        :raises OSError
+        """
+
+        loop = asyncio.get_running_loop()
+
+        sock = socket.socket((socket.AF_INET6 if (ip_port_pair.ip_address.version == 6) else socket.AF_INET), socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setblocking(False)
+            if reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind(ip_port_pair.to_printable_tuple())
+
+            protocol = protocol_factory()
+            transport = cls(loop, sock, protocol)
+        except BaseException:
+            sock.close()
+            raise
+
+        return transport, protocol
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, sock: socket.socket, protocol: asyncio.DatagramProtocol):
+        super().__init__()
+
+        self._loop: Final[asyncio.AbstractEventLoop] = loop
+        self._sock: Final[socket.socket] = sock
+        self._protocol: Final[asyncio.DatagramProtocol] = protocol
+
+        self._receive_buffer: Final[bytearray] = bytearray(self.__class__._RECEIVE_BUFFER_SIZE)
+        self._receive_buffer_view: Final[memoryview] = memoryview(self._receive_buffer)
+        self._send_queue: Final[collections.deque[tuple[bytes, Any]]] = collections.deque()
+        self._sending_deferred: bool = False
+        self._waiting_for_writability: bool = False
+        self._closing: bool = False
+
+        self._protocol.connection_made(self)
+        self._loop.add_reader(self._sock.fileno(), self._read_ready)
+
+    def _read_ready(self) -> None:
+        # The responses sent while the received datagrams are being handled are only queued, and sent all at once after
+        #  that - this way, receiving and sending do not alternate with each other.
+        self._sending_deferred = True
+        try:
+            self._receive_datagrams()
+        finally:
+            self._sending_deferred = False
+
+        self._send_queued_datagrams()
+
+    def _receive_datagrams(self) -> None:
+        for _ in range(self.__class__._MAX_DATAGRAMS_PER_READ):
+            if self._closing:
+                return
+
+            try:
+                nbytes, _, msg_flags, addr = self._sock.recvmsg_into((self._receive_buffer,))
+            except (BlockingIOError, InterruptedError):
+                return  # All the datagrams available at the moment have been received
+            except OSError as e:
+                self._protocol.error_received(e)
+                return
+
+            if msg_flags & socket.MSG_TRUNC:
+                continue  # Datagrams which do not fit into the buffer cannot be valid anyway
+
+            # The data must be copied, since the buffer is reused for the next datagram
+            self._protocol.datagram_received(bytes(self._receive_buffer_view[0:nbytes]), addr)
+
+    def sendto(self, data: bytes, addr: Any = None) -> None:
+        if self._closing:
+            return
+
+        if len(self._send_queue) >= self.__class__._MAX_QUEUED_DATAGRAMS:
+            return  # As UDP is unreliable, dropping the datagram is acceptable
+
+        self._send_queue.append((bytes(data), addr))
+        if not self._sending_deferred:
+            self._send_queued_datagrams()
+
+    def _send_queued_datagrams(self) -> None:
+        if self._waiting_for_writability:
+            return  # The datagrams will be sent once the socket becomes writable
+
+        while (len(self._send_queue) > 0) and (not self._closing):
+            data, addr = self._send_queue[0]
+            try:
+                self._sock.sendto(data, addr)
+            except (BlockingIOError, InterruptedError):
+                self._waiting_for_writability = True
+                self._loop.add_writer(self._sock.fileno(), self._write_ready)
+                return
+            except OSError as e:
+                self._protocol.error_received(e)
+
+            self._send_queue.popleft()
+
+    def _write_ready(self) -> None:
+        self._loop.remove_writer(self._sock.fileno())
+        self._waiting_for_writability = False
+
+        self._send_queued_datagrams()
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == "socket":
+            return self._sock
+
+        if name == "sockname":
+            try:
+                return self._sock.getsockname()
+            except OSError:
+                return default
+
+        return default
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        if self._closing:
+            return
+        self._closing = True
+
+        self._loop.remove_reader(self._sock.fileno())
+        if self._waiting_for_writability:
+            self._loop.remove_writer(self._sock.fileno())
+        self._send_queue.clear()
+
+        self._loop.call_soon(self._call_connection_lost)
+
+    def abort(self) -> None:
+        self.close()
+
+    def _call_connection_lost(self) -> None:
+        try:
+            self._protocol.connection_lost(None)
+        finally:
+            self._sock.close()